@@ -2,12 +2,29 @@
 Analyzers for extracting style patterns.
 """
 
-from .messaging_analyzer import analyze_messaging_style
-from .documentation_analyzer import analyze_documentation_style
+from .messaging_analyzer import (
+    analyze_messaging_style, build_message_requests, finalize_messaging_analysis,
+)
+from .documentation_analyzer import (
+    analyze_documentation_style, build_note_requests, finalize_documentation_analysis,
+)
+from .parsing import parse_analysis_response
 from .aggregator import aggregate_analyses
+from .incremental import make_run, combine_messaging_runs, combine_documentation_runs
+from ..llm.concurrency import run_concurrently, DEFAULT_CONCURRENCY
 
 __all__ = [
     "analyze_messaging_style",
     "analyze_documentation_style",
+    "build_message_requests",
+    "build_note_requests",
+    "finalize_messaging_analysis",
+    "finalize_documentation_analysis",
+    "parse_analysis_response",
     "aggregate_analyses",
+    "make_run",
+    "combine_messaging_runs",
+    "combine_documentation_runs",
+    "run_concurrently",
+    "DEFAULT_CONCURRENCY",
 ]
@@ -2,17 +2,23 @@
 Analyze clinical notes to extract documentation style patterns.
 """
 
-import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 
 from ..llm import get_llm_client, BaseLLMClient
+from ..loaders.sections import note_sections
+from ..llm.concurrency import DEFAULT_CONCURRENCY
+from .parsing import parse_analysis_response
 
 
 def analyze_documentation_style(
     categorized_samples: Dict[str, List[Dict]],
     llm: str = "claude",
-    verbose: bool = False
+    verbose: bool = False,
+    max_notes: Optional[int] = 20,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    llm_cache: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Analyze sampled clinical notes to extract documentation patterns.
@@ -20,79 +26,148 @@ def analyze_documentation_style(
     Args:
         categorized_samples: Notes grouped by visit type (acute, chronic, etc.)
         llm: Which LLM to use
+        max_notes: Notes per visit type included in the prompt; None sends
+            every sample (e.g. when samples were packed to a token budget)
+        concurrency: Visit types analyzed at the same time (1: one by one)
+        llm_cache: Directory of the LLM response cache to reuse answers
+            from (None: every prompt is sent)
 
     Returns:
         Analysis dictionary with extracted patterns
     """
-    client = get_llm_client(llm)
+    client = get_llm_client(llm, cache_dir=llm_cache)
+
+    # One request per visit type, sent together
+    requests = build_note_requests(categorized_samples, max_notes)
+    if verbose:
+        for visit_type in requests:
+            print(f"  Analyzing {visit_type} ({len(categorized_samples[visit_type])} notes)...")
+
+    responses = client.batch_analyze_with_prefix(list(requests.values()), concurrency)
+    visit_type_analyses = {
+        visit_type: parse_analysis_response(response, visit_type)
+        for visit_type, response in zip(requests, responses)
+    }
 
-    # Load prompt template
-    prompt_path = Path(__file__).parent.parent / "llm" / "prompts" / "documentation_analysis.txt"
-    prompt_template = prompt_path.read_text()
-
-    # Analyze each visit type
-    visit_type_analyses = {}
-    for visit_type, notes in categorized_samples.items():
-        if not notes:
-            continue
-
-        if verbose:
-            print(f"  Analyzing {visit_type} ({len(notes)} notes)...")
-
-        analysis = analyze_note_category(
-            notes=notes,
-            visit_type=visit_type,
-            client=client,
-            prompt_template=prompt_template
-        )
-        visit_type_analyses[visit_type] = analysis
-
-    # Aggregate
-    aggregated = aggregate_documentation_analyses(visit_type_analyses)
-    aggregated["visit_type_analyses"] = visit_type_analyses
-    aggregated["total_notes_analyzed"] = sum(
-        len(notes) for notes in categorized_samples.values()
-    )
+    return finalize_documentation_analysis(visit_type_analyses, categorized_samples)
 
-    return aggregated
+
+def build_note_requests(
+    categorized_samples: Dict[str, List[Dict]],
+    max_notes: Optional[int] = 20
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Build the analysis prompt for every non-empty visit type.
+
+    Args:
+        categorized_samples: Notes grouped by visit type
+        max_notes: Notes per visit type included in the prompt
+
+    Returns:
+        Mapping of visit type to (prefix, data) for analyze_with_prefix()
+    """
+    prompt_template = _prompt_template()
+    return {
+        visit_type: note_category_request(notes, visit_type, prompt_template, max_notes)
+        for visit_type, notes in categorized_samples.items()
+        if notes
+    }
+
+
+def note_category_request(
+    notes: List[Dict],
+    visit_type: str,
+    prompt_template: str,
+    max_notes: Optional[int] = 20
+) -> Tuple[str, str]:
+    """Build the (prefix, data) prompt for notes of one visit type."""
+
+    formatted = format_notes_for_prompt(notes, max_notes)
+
+    # Shared instructions first as a cacheable prefix, then this visit type's notes
+    prefix, _, suffix = prompt_template.partition('{notes}')
+    data = f"""Visit Type: {visit_type.upper()}
+{formatted}{suffix}"""
+
+    return prefix, data
 
 
 def analyze_note_category(
     notes: List[Dict],
     visit_type: str,
     client: BaseLLMClient,
-    prompt_template: str
+    prompt_template: str,
+    max_notes: Optional[int] = 20
 ) -> Dict[str, Any]:
     """Analyze notes of a specific visit type."""
+    prefix, data = note_category_request(notes, visit_type, prompt_template, max_notes)
+    return parse_analysis_response(client.analyze_with_prefix(prefix, data), visit_type)
 
-    formatted = format_notes_for_prompt(notes)
 
-    prompt = f"""Visit Type: {visit_type.upper()}
+def finalize_documentation_analysis(
+    visit_type_analyses: Dict[str, Dict],
+    categorized_samples: Dict[str, List[Dict]]
+) -> Dict[str, Any]:
+    """
+    Aggregate per-visit-type analyses into the documentation analysis.
 
-{prompt_template.replace('{notes}', formatted)}"""
+    Args:
+        visit_type_analyses: Parsed analysis per visit type
+        categorized_samples: The samples the analyses were made from
 
-    response = client.analyze(prompt)
+    Returns:
+        Analysis dictionary with extracted patterns
+    """
+    aggregated = aggregate_documentation_analyses(visit_type_analyses)
+    aggregated["visit_type_analyses"] = visit_type_analyses
+    aggregated["total_notes_analyzed"] = sum(
+        len(notes) for notes in categorized_samples.values()
+    )
 
-    try:
-        return json.loads(response)
-    except json.JSONDecodeError:
-        import re
-        json_match = re.search(r'\{[\s\S]*\}', response)
-        if json_match:
-            return json.loads(json_match.group())
-        raise ValueError(f"Could not parse analysis response for {visit_type}")
+    return aggregated
+
+
+@lru_cache(maxsize=None)
+def _prompt_template() -> str:
+    """Load the documentation analysis prompt template."""
+    prompt_path = Path(__file__).parent.parent / "llm" / "prompts" / "documentation_analysis.txt"
+    return prompt_path.read_text()
+
+
+# Free-text section headings used in prompts, in note order
+_PROMPT_SECTIONS = (
+    ("hpi", "HPI"),
+    ("ros", "Review of Systems"),
+    ("physical_exam", "Physical Exam"),
+    ("assessment", "Assessment"),
+    ("plan", "Plan"),
+)
 
 
-def format_notes_for_prompt(notes: List[Dict], max_notes: int = 20) -> str:
-    """Format clinical notes for inclusion in prompt."""
+def format_notes_for_prompt(notes: List[Dict], max_notes: Optional[int] = 20) -> str:
+    """
+    Format clinical notes for inclusion in prompt.
+
+    Free-text notes are sent as the sections found in them at load time,
+    leaving out text under other headers (medications, vitals, ...); free
+    text without recognizable headers is sent whole.
+    """
     formatted_parts = []
 
-    for i, note in enumerate(notes[:max_notes], 1):
+    for i, note in enumerate(notes if max_notes is None else notes[:max_notes], 1):
         content = note.get("content", {})
         date = note.get("created_at", "")[:10] if note.get("created_at") else ""
         cc = note.get("chief_complaint", "")
 
-        if isinstance(content, dict):
+        if isinstance(content, dict) and set(content) == {"full_text"}:
+            sections = note_sections(note)
+            body = sections.get("full_text") or "\n\n".join(
+                f"{title}:\n{sections[key]}" for key, title in _PROMPT_SECTIONS if key in sections
+            )
+            note_text = f"""Chief Complaint: {cc}
+
+{body}"""
+        elif isinstance(content, dict):
             note_text = f"""Chief Complaint: {cc}
 
 HPI:
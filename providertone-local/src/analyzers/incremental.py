@@ -0,0 +1,88 @@
+"""
+Combine analyses from incremental refresh runs.
+"""
+
+from typing import Dict, List, Any
+
+from .aggregator import aggregate_analyses
+from .messaging_analyzer import aggregate_message_analyses
+from .documentation_analyzer import aggregate_documentation_analyses
+
+
+def make_run(analysis: Dict[str, Any], data_type: str, window: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a full analysis to what needs to be kept between refreshes.
+
+    Args:
+        analysis: Output of analyze_messaging_style/analyze_documentation_style
+        data_type: "messages" or "notes"
+        window: Description of the records covered (e.g. start/end timestamps)
+
+    Returns:
+        Run record to append to the provider's state
+    """
+    if data_type == "messages":
+        return {
+            "window": window,
+            "category_analyses": analysis.get("category_analyses", {}),
+            "total_messages_analyzed": analysis.get("total_messages_analyzed", 0),
+            "confidence": analysis.get("confidence", 0.5),
+        }
+    return {
+        "window": window,
+        "visit_type_analyses": analysis.get("visit_type_analyses", {}),
+        "total_notes_analyzed": analysis.get("total_notes_analyzed", 0),
+        "confidence": analysis.get("confidence", 0.5),
+    }
+
+
+def combine_messaging_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine per-run messaging analyses into one analysis.
+
+    Every (run, category) pair votes in aggregate_message_analyses, so the
+    history keeps its weight as new months are added. The most recent
+    analysis of each category is kept for the generators.
+    """
+    keyed = {}
+    latest = {}
+    for i, run in enumerate(runs):
+        for category, analysis in run.get("category_analyses", {}).items():
+            keyed[f"{category}#{i}"] = analysis
+            latest[category] = analysis
+
+    combined = aggregate_message_analyses(keyed)
+    combined["category_analyses"] = latest
+
+    # Confidence is the mean of the per-run confidences
+    totals = aggregate_analyses(runs)
+    combined["confidence"] = totals.get("confidence", combined["confidence"])
+    combined["total_messages_analyzed"] = sum(
+        r.get("total_messages_analyzed", 0) for r in runs
+    )
+    combined["num_runs"] = len(runs)
+
+    return combined
+
+
+def combine_documentation_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-run documentation analyses into one analysis."""
+    keyed = {}
+    latest = {}
+    for i, run in enumerate(runs):
+        for visit_type, analysis in run.get("visit_type_analyses", {}).items():
+            keyed[f"{visit_type}#{i}"] = analysis
+            latest[visit_type] = analysis
+
+    combined = aggregate_documentation_analyses(keyed)
+    combined["visit_type_analyses"] = latest
+
+    # Confidence is the mean of the per-run confidences
+    totals = aggregate_analyses(runs)
+    combined["confidence"] = totals.get("confidence", combined["confidence"])
+    combined["total_notes_analyzed"] = sum(
+        r.get("total_notes_analyzed", 0) for r in runs
+    )
+    combined["num_runs"] = len(runs)
+
+    return combined
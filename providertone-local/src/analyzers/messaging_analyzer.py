@@ -2,107 +2,159 @@
 Analyze portal messages to extract communication style patterns.
 """
 
-import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 
 from ..llm import get_llm_client, BaseLLMClient
+from ..llm.concurrency import DEFAULT_CONCURRENCY
+from .parsing import parse_analysis_response
 
 
 def analyze_messaging_style(
     categorized_samples: Dict[str, List[Dict]],
     llm: str = "claude",
-    verbose: bool = False
+    verbose: bool = False,
+    max_messages: Optional[int] = 30,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    llm_cache: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Analyze sampled messages to extract style patterns.
 
     Args:
         categorized_samples: Messages grouped by type (anxious, routine, etc.)
-        llm: Which LLM to use ("claude" or "local")
+        llm: Which LLM to use ("claude", "claude-batch" or "local")
         verbose: Print progress
+        max_messages: Messages per category included in the prompt; None
+            sends every sample (e.g. when samples were packed to a token budget)
+        concurrency: Categories analyzed at the same time (1: one by one)
+        llm_cache: Directory of the LLM response cache to reuse answers
+            from (None: every prompt is sent)
 
     Returns:
         Analysis dictionary with extracted patterns
     """
-    client = get_llm_client(llm)
+    client = get_llm_client(llm, cache_dir=llm_cache)
+
+    # One request per category, sent together: concurrently, or as one
+    # submission by batch clients
+    requests = build_message_requests(categorized_samples, max_messages)
+    if verbose:
+        for category in requests:
+            print(f"  Analyzing {category} ({len(categorized_samples[category])} messages)...")
+
+    responses = client.batch_analyze_with_prefix(list(requests.values()), concurrency)
+    category_analyses = {
+        category: parse_analysis_response(response, category)
+        for category, response in zip(requests, responses)
+    }
 
-    # Load prompt template
-    prompt_path = Path(__file__).parent.parent / "llm" / "prompts" / "messaging_analysis.txt"
-    prompt_template = prompt_path.read_text()
-
-    # Analyze each category separately
-    category_analyses = {}
-    for category, messages in categorized_samples.items():
-        if not messages:
-            continue
-
-        if verbose:
-            print(f"  Analyzing {category} ({len(messages)} messages)...")
-
-        analysis = analyze_message_category(
-            messages=messages,
-            category=category,
-            client=client,
-            prompt_template=prompt_template
-        )
-        category_analyses[category] = analysis
-
-    # Aggregate across categories
-    aggregated = aggregate_message_analyses(category_analyses)
-    aggregated["category_analyses"] = category_analyses
-    aggregated["total_messages_analyzed"] = sum(
-        len(msgs) for msgs in categorized_samples.values()
-    )
+    return finalize_messaging_analysis(category_analyses, categorized_samples)
 
-    return aggregated
+
+def build_message_requests(
+    categorized_samples: Dict[str, List[Dict]],
+    max_messages: Optional[int] = 30
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Build the analysis prompt for every non-empty category.
+
+    Args:
+        categorized_samples: Messages grouped by category
+        max_messages: Messages per category included in the prompt
+
+    Returns:
+        Mapping of category to (prefix, data) for analyze_with_prefix()
+    """
+    prompt_template = _prompt_template()
+    return {
+        category: message_category_request(messages, category, prompt_template, max_messages)
+        for category, messages in categorized_samples.items()
+        if messages
+    }
+
+
+def message_category_request(
+    messages: List[Dict],
+    category: str,
+    prompt_template: str,
+    max_messages: Optional[int] = 30
+) -> Tuple[str, str]:
+    """Build the (prefix, data) prompt for one category of messages."""
+
+    # Format messages for prompt
+    formatted = format_messages_for_prompt(messages, max_messages)
+
+    # Instructions up to the placeholder are the same for every category
+    # and provider, so they go first as a cacheable prefix; the data follows
+    prefix, _, suffix = prompt_template.partition('{messages}')
+    data = f"""Category: {category.upper()} messages
+{formatted}{suffix}"""
+
+    return prefix, data
 
 
 def analyze_message_category(
     messages: List[Dict],
     category: str,
     client: BaseLLMClient,
-    prompt_template: str
+    prompt_template: str,
+    max_messages: Optional[int] = 30
 ) -> Dict[str, Any]:
     """Analyze a single category of messages."""
+    prefix, data = message_category_request(messages, category, prompt_template, max_messages)
+    return parse_analysis_response(client.analyze_with_prefix(prefix, data), category)
 
-    # Format messages for prompt
-    formatted = format_messages_for_prompt(messages)
 
-    # Build prompt
-    prompt = f"""Category: {category.upper()} messages
+def finalize_messaging_analysis(
+    category_analyses: Dict[str, Dict],
+    categorized_samples: Dict[str, List[Dict]]
+) -> Dict[str, Any]:
+    """
+    Aggregate per-category analyses into the messaging analysis.
+
+    Args:
+        category_analyses: Parsed analysis per category
+        categorized_samples: The samples the analyses were made from
+
+    Returns:
+        Analysis dictionary with extracted patterns
+    """
+    aggregated = aggregate_message_analyses(category_analyses)
+    aggregated["category_analyses"] = category_analyses
+    aggregated["total_messages_analyzed"] = sum(
+        len(msgs) for msgs in categorized_samples.values()
+    )
 
-{prompt_template.replace('{messages}', formatted)}"""
+    return aggregated
 
-    # Get analysis
-    response = client.analyze(prompt)
 
-    # Parse JSON response
-    try:
-        return json.loads(response)
-    except json.JSONDecodeError:
-        # Try to extract JSON from response
-        import re
-        json_match = re.search(r'\{[\s\S]*\}', response)
-        if json_match:
-            return json.loads(json_match.group())
-        raise ValueError(f"Could not parse analysis response for {category}")
+@lru_cache(maxsize=None)
+def _prompt_template() -> str:
+    """Load the messaging analysis prompt template."""
+    prompt_path = Path(__file__).parent.parent / "llm" / "prompts" / "messaging_analysis.txt"
+    return prompt_path.read_text()
 
 
-def format_messages_for_prompt(messages: List[Dict], max_messages: int = 30) -> str:
+def format_messages_for_prompt(messages: List[Dict], max_messages: Optional[int] = 30) -> str:
     """Format messages for inclusion in prompt."""
     formatted_parts = []
 
-    for i, msg in enumerate(messages[:max_messages], 1):
+    for i, msg in enumerate(messages if max_messages is None else messages[:max_messages], 1):
         body = msg.get("body", msg.get("content", ""))
         subject = msg.get("subject", "")
         date = msg.get("sent_at", "")[:10] if msg.get("sent_at") else ""
 
+        # Set by near-duplicate suppression: this text stands for a template
+        copies = msg.get("duplicate_count", 1)
+        sent = f"Sent: {copies} near-identical times\n" if copies > 1 else ""
+
         formatted_parts.append(f"""
 --- Message {i} ---
 Date: {date}
 Subject: {subject}
-
+{sent}
 {body}
 """)
 
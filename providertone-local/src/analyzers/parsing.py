@@ -0,0 +1,31 @@
+"""
+Parse LLM analysis responses.
+"""
+
+import json
+import re
+from typing import Dict, Any
+
+
+def parse_analysis_response(response: str, label: str) -> Dict[str, Any]:
+    """
+    Parse the JSON object an analysis prompt asked for.
+
+    Args:
+        response: LLM response text
+        label: Category or visit type, for the error message
+
+    Returns:
+        Parsed analysis
+
+    Raises:
+        ValueError: If the response holds no JSON object
+    """
+    try:
+        return json.loads(response)
+    except json.JSONDecodeError:
+        # Try to extract JSON from response
+        json_match = re.search(r'\{[\s\S]*\}', response)
+        if json_match:
+            return json.loads(json_match.group())
+        raise ValueError(f"Could not parse analysis response for {label}")
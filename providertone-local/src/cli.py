@@ -7,6 +7,9 @@ Usage:
     providertone analyze-notes --input notes/ --provider-id dr-smith
     providertone generate-profile --messaging msg.json --documentation doc.json
     providertone extract --messages msg.csv --notes notes/ --provider-id dr-smith
+    providertone extract-all --messages msg.csv --notes notes/ --output-dir profiles/
+    providertone ingest --input messages.csv --type messages
+    providertone refresh --messages msg.csv --notes notes/ --provider-id dr-smith -o profile.json
 """
 
 import json
@@ -26,6 +29,18 @@ load_dotenv()
 console = Console()
 
 
+def _date_option(ctx, param, value):
+    """Normalize a --start-date/--end-date value to YYYY-MM-DD."""
+    from .loaders.timestamps import date_key, normalize_timestamp
+
+    if not value:
+        return None
+    date = date_key(normalize_timestamp(value))
+    if not date:
+        raise click.BadParameter(f"unrecognized date '{value}' (expected YYYY-MM-DD)")
+    return date
+
+
 @click.group()
 @click.version_option(version="1.0.0", prog_name="providertone")
 def cli():
@@ -45,22 +60,57 @@ def cli():
 @click.option("--sample-size", default=50,
               help="Max messages per category to analyze (default: 50)")
 @click.option("--llm", default="claude",
-              type=click.Choice(["claude", "local"]),
+              type=click.Choice(["claude", "claude-batch", "local"]),
               help="LLM to use for analysis")
-@click.option("--start-date",
+@click.option("--start-date", callback=_date_option,
               help="Filter messages after this date (YYYY-MM-DD)")
-@click.option("--end-date",
+@click.option("--end-date", callback=_date_option,
               help="Filter messages before this date (YYYY-MM-DD)")
+@click.option("--cache-dir", envvar="PROVIDERTONE_CACHE_DIR",
+              type=click.Path(file_okay=False),
+              help="Read from this ingestion cache if the input was ingested")
+@click.option("--index", "use_index", is_flag=True,
+              help="Build/reuse a sidecar provider offset index (CSV, JSONL)")
+@click.option("--file-pattern",
+              help="For text-file directories, only open files matching this glob; "
+                   "{provider_id} is filled in (e.g. '*_{provider_id}_*.txt')")
+@click.option("--workers", default=1, type=int,
+              help="Processes for categorization (0 = all CPUs, default: 1)")
+@click.option("--concurrency", default=8, type=int,
+              help="LLM requests in flight at once, one per category (default: 8)")
+@click.option("--llm-cache", envvar="PROVIDERTONE_LLM_CACHE",
+              type=click.Path(file_okay=False),
+              help="Reuse LLM responses cached in this directory (off by default; "
+                   "the cache holds PHI). Entries expire after "
+                   "PROVIDERTONE_LLM_CACHE_TTL seconds: default one week, 0 never")
+@click.option("--stream", is_flag=True,
+              help="Categorize and sample in one pass instead of loading all records")
+@click.option("--dedupe", is_flag=True,
+              help="Collapse near-duplicate (templated) messages before sampling")
+@click.option("--token-budget", type=int,
+              help="Pack each category's sample up to this many prompt tokens "
+                   "instead of --sample-size records")
+@click.option("--sampling-strategy", default="quartile",
+              type=click.Choice(["quartile", "diversity"]),
+              help="quartile: spread samples over lengths; diversity: one medoid "
+                   "per TF-IDF cluster (needs scipy)")
 @click.option("--verbose", "-v", is_flag=True,
               help="Verbose output")
 def analyze_messages(input_path, provider_id, output, sample_size, llm,
-                     start_date, end_date, verbose):
+                     start_date, end_date, cache_dir, use_index, file_pattern, workers, concurrency,
+                     llm_cache, stream, dedupe, token_budget, sampling_strategy, verbose):
     """Analyze portal messages to extract communication style patterns."""
-    from .loaders import load_data
-    from .preprocessors import preprocess_messages, sample_messages
-    from .preprocessors.message_preprocessor import filter_by_date
+    from .loaders import load_data, iter_data
+    from .preprocessors import preprocess_messages, sample_messages_stream
+    from .preprocessors.dedup import dedupe_messages
+    from .preprocessors.parallel import resolve_workers
     from .analyzers import analyze_messaging_style
 
+    if stream and dedupe:
+        raise click.UsageError("--dedupe needs the categorized messages and cannot be "
+                               "combined with --stream")
+    _check_sampling_options(stream, token_budget, sampling_strategy)
+
     console.print()
     console.print("[bold blue]ProviderTone Local[/] - Message Analysis")
     console.print(f"Provider: [cyan]{provider_id}[/]")
@@ -73,46 +123,97 @@ def analyze_messages(input_path, provider_id, output, sample_size, llm,
         console=console,
         transient=True,
     ) as progress:
-        # Load data
-        task = progress.add_task("Loading messages...", total=None)
-        try:
-            messages = load_data(input_path, data_type="messages")
-        except Exception as e:
-            console.print(f"[red]Error loading data:[/] {e}")
-            sys.exit(1)
-        progress.update(task, description=f"[green]Loaded {len(messages)} messages[/]")
-
-        # Filter by provider
-        task = progress.add_task("Filtering by provider...", total=None)
-        messages = [m for m in messages if m.get("provider_id") == provider_id]
-        if start_date or end_date:
-            messages = filter_by_date(messages, start_date, end_date)
-        progress.update(task, description=f"[green]Found {len(messages)} messages for {provider_id}[/]")
-
-        if len(messages) == 0:
-            console.print(f"[yellow]No messages found for provider {provider_id}[/]")
-            sys.exit(1)
-
-        # Preprocess and categorize
-        task = progress.add_task("Categorizing messages...", total=None)
-        categorized = preprocess_messages(messages)
-        progress.update(task, description="[green]Messages categorized[/]")
-
-        # Show category summary
-        if verbose:
-            console.print()
-            _print_category_summary(categorized)
-
-        # Sample
-        task = progress.add_task("Sampling messages...", total=None)
-        samples = sample_messages(categorized, sample_size)
-        total_sampled = sum(len(msgs) for msgs in samples.values())
-        progress.update(task, description=f"[green]Sampled {total_sampled} messages[/]")
+        if stream:
+            # Load, categorize and sample in one pass
+            task = progress.add_task("Loading and sampling messages...", total=None)
+            counts = {}
+            try:
+                samples = sample_messages_stream(
+                    iter_data(
+                        input_path,
+                        data_type="messages",
+                        provider_id=provider_id,
+                        start_date=start_date,
+                        end_date=end_date,
+                        cache_dir=cache_dir,
+                        use_index=use_index,
+                        name_filter=_name_filter(file_pattern, provider_id),
+                    ),
+                    sample_size,
+                    workers=resolve_workers(workers),
+                    counts=counts,
+                )
+            except Exception as e:
+                console.print(f"[red]Error loading data:[/] {e}")
+                sys.exit(1)
+            total_sampled = sum(len(msgs) for msgs in samples.values())
+            progress.update(task, description=f"[green]Sampled {total_sampled} of "
+                                              f"{sum(counts.values())} messages[/]")
+
+            if not counts:
+                console.print(f"[yellow]No messages found for provider {provider_id}[/]")
+                sys.exit(1)
+
+            if verbose:
+                console.print()
+                _print_category_summary(counts)
+        else:
+            # Load data (provider and date filters are applied while reading)
+            task = progress.add_task("Loading messages...", total=None)
+            try:
+                messages = load_data(
+                    input_path,
+                    data_type="messages",
+                    provider_id=provider_id,
+                    start_date=start_date,
+                    end_date=end_date,
+                    cache_dir=cache_dir,
+                    use_index=use_index,
+                    name_filter=_name_filter(file_pattern, provider_id),
+                )
+            except Exception as e:
+                console.print(f"[red]Error loading data:[/] {e}")
+                sys.exit(1)
+            progress.update(task, description=f"[green]Found {len(messages)} messages for {provider_id}[/]")
+
+            if len(messages) == 0:
+                console.print(f"[yellow]No messages found for provider {provider_id}[/]")
+                sys.exit(1)
+
+            # Preprocess and categorize
+            task = progress.add_task("Categorizing messages...", total=None)
+            categorized = preprocess_messages(messages, workers=resolve_workers(workers))
+            progress.update(task, description="[green]Messages categorized[/]")
+
+            # Show category summary
+            if verbose:
+                console.print()
+                _print_category_summary({c: len(m) for c, m in categorized.items()})
+
+            # Collapse templated messages so they don't use up the sample
+            if dedupe:
+                task = progress.add_task("Removing near-duplicates...", total=None)
+                categorized = dedupe_messages(categorized)
+                unique = sum(len(m) for m in categorized.values())
+                progress.update(task, description=f"[green]{unique} distinct messages[/]")
+
+            # Sample
+            task = progress.add_task("Sampling messages...", total=None)
+            samples = _sample_categorized(
+                categorized, "messages", sample_size, token_budget, sampling_strategy
+            )
+            total_sampled = sum(len(msgs) for msgs in samples.values())
+            progress.update(task, description=f"[green]Sampled {total_sampled} messages[/]")
 
         # Analyze
         task = progress.add_task("Analyzing patterns (this may take a few minutes)...", total=None)
         try:
-            analysis = analyze_messaging_style(samples, llm=llm, verbose=verbose)
+            analysis = analyze_messaging_style(
+                samples, llm=llm, verbose=verbose,
+                max_messages=None if token_budget else 30,
+                concurrency=concurrency,
+                llm_cache=llm_cache,
+            )
         except Exception as e:
             console.print(f"[red]Error during analysis:[/] {e}")
             sys.exit(1)
@@ -121,6 +222,7 @@ def analyze_messages(input_path, provider_id, output, sample_size, llm,
     # Save results
     _save_json(analysis, output)
     console.print(f"\n[green]Analysis saved to {output}[/]")
+    _print_llm_stats(llm_cache)
 
     # Show summary
     _print_messaging_summary(analysis)
@@ -140,15 +242,51 @@ def analyze_messages(input_path, provider_id, output, sample_size, llm,
 @click.option("--sample-size", default=50,
               help="Max notes per visit type to analyze")
 @click.option("--llm", default="claude",
-              type=click.Choice(["claude", "local"]))
+              type=click.Choice(["claude", "claude-batch", "local"]))
+@click.option("--start-date", callback=_date_option,
+              help="Only use notes on or after this date (YYYY-MM-DD)")
+@click.option("--end-date", callback=_date_option,
+              help="Only use notes on or before this date (YYYY-MM-DD)")
+@click.option("--cache-dir", envvar="PROVIDERTONE_CACHE_DIR",
+              type=click.Path(file_okay=False),
+              help="Read from this ingestion cache if the input was ingested")
+@click.option("--index", "use_index", is_flag=True,
+              help="Build/reuse a sidecar provider offset index (CSV, JSONL)")
+@click.option("--file-pattern",
+              help="For text-file directories, only open files matching this glob; "
+                   "{provider_id} is filled in (e.g. '*_{provider_id}_*.txt')")
+@click.option("--workers", default=1, type=int,
+              help="Processes for categorization (0 = all CPUs, default: 1)")
+@click.option("--concurrency", default=8, type=int,
+              help="LLM requests in flight at once, one per category (default: 8)")
+@click.option("--llm-cache", envvar="PROVIDERTONE_LLM_CACHE",
+              type=click.Path(file_okay=False),
+              help="Reuse LLM responses cached in this directory (off by default; "
+                   "the cache holds PHI). Entries expire after "
+                   "PROVIDERTONE_LLM_CACHE_TTL seconds: default one week, 0 never")
+@click.option("--stream", is_flag=True,
+              help="Categorize and sample in one pass instead of loading all records")
+@click.option("--token-budget", type=int,
+              help="Pack each category's sample up to this many prompt tokens "
+                   "instead of --sample-size records")
+@click.option("--sampling-strategy", default="quartile",
+              type=click.Choice(["quartile", "diversity"]),
+              help="quartile: spread samples over lengths; diversity: one medoid "
+                   "per TF-IDF cluster (needs scipy)")
 @click.option("--verbose", "-v", is_flag=True)
-def analyze_notes(input_path, provider_id, output, note_types, sample_size, llm, verbose):
+def analyze_notes(input_path, provider_id, output, note_types, sample_size, llm,
+                  start_date, end_date, cache_dir, use_index, file_pattern, workers, concurrency,
+                  llm_cache,
+                  stream, token_budget, sampling_strategy, verbose):
     """Analyze clinical notes to extract documentation style patterns."""
-    from .loaders import load_data
-    from .preprocessors import preprocess_notes, sample_notes
-    from .preprocessors.note_preprocessor import filter_by_note_type
+    from .loaders import load_data, iter_data
+    from .preprocessors import preprocess_notes, sample_notes_stream
+    from .preprocessors.note_preprocessor import filter_by_note_type, iter_by_note_type
+    from .preprocessors.parallel import resolve_workers
     from .analyzers import analyze_documentation_style
 
+    _check_sampling_options(stream, token_budget, sampling_strategy)
+
     console.print()
     console.print("[bold blue]ProviderTone Local[/] - Documentation Analysis")
     console.print(f"Provider: [cyan]{provider_id}[/]")
@@ -161,47 +299,97 @@ def analyze_notes(input_path, provider_id, output, note_types, sample_size, llm,
         console=console,
         transient=True,
     ) as progress:
-        # Load data
-        task = progress.add_task("Loading notes...", total=None)
-        try:
-            notes = load_data(input_path, data_type="notes")
-        except Exception as e:
-            console.print(f"[red]Error loading data:[/] {e}")
-            sys.exit(1)
-        progress.update(task, description=f"[green]Loaded {len(notes)} notes[/]")
-
-        # Filter by provider
-        task = progress.add_task("Filtering by provider...", total=None)
-        notes = [n for n in notes if n.get("provider_id") == provider_id]
-
-        # Filter by note type
         type_list = [t.strip() for t in note_types.split(",")]
-        notes = filter_by_note_type(notes, type_list)
-        progress.update(task, description=f"[green]Found {len(notes)} notes for {provider_id}[/]")
-
-        if len(notes) == 0:
-            console.print(f"[yellow]No notes found for provider {provider_id}[/]")
-            sys.exit(1)
 
-        # Categorize
-        task = progress.add_task("Categorizing by visit type...", total=None)
-        categorized = preprocess_notes(notes)
-        progress.update(task, description="[green]Notes categorized[/]")
-
-        if verbose:
-            console.print()
-            _print_category_summary(categorized, "visit type")
-
-        # Sample
-        task = progress.add_task("Sampling notes...", total=None)
-        samples = sample_notes(categorized, sample_size)
-        total_sampled = sum(len(n) for n in samples.values())
-        progress.update(task, description=f"[green]Sampled {total_sampled} notes[/]")
+        if stream:
+            # Load, filter, categorize and sample in one pass
+            task = progress.add_task("Loading and sampling notes...", total=None)
+            counts = {}
+            try:
+                samples = sample_notes_stream(
+                    iter_by_note_type(
+                        iter_data(
+                            input_path,
+                            data_type="notes",
+                            provider_id=provider_id,
+                            start_date=start_date,
+                            end_date=end_date,
+                            cache_dir=cache_dir,
+                            use_index=use_index,
+                            name_filter=_name_filter(file_pattern, provider_id),
+                        ),
+                        type_list,
+                    ),
+                    sample_size,
+                    workers=resolve_workers(workers),
+                    counts=counts,
+                )
+            except Exception as e:
+                console.print(f"[red]Error loading data:[/] {e}")
+                sys.exit(1)
+            total_sampled = sum(len(n) for n in samples.values())
+            progress.update(task, description=f"[green]Sampled {total_sampled} of "
+                                              f"{sum(counts.values())} notes[/]")
+
+            if not counts:
+                console.print(f"[yellow]No notes found for provider {provider_id}[/]")
+                sys.exit(1)
+
+            if verbose:
+                console.print()
+                _print_category_summary(counts, "visit type")
+        else:
+            # Load data (provider filter is applied while reading)
+            task = progress.add_task("Loading notes...", total=None)
+            try:
+                notes = load_data(
+                    input_path,
+                    data_type="notes",
+                    provider_id=provider_id,
+                    start_date=start_date,
+                    end_date=end_date,
+                    cache_dir=cache_dir,
+                    use_index=use_index,
+                    name_filter=_name_filter(file_pattern, provider_id),
+                )
+            except Exception as e:
+                console.print(f"[red]Error loading data:[/] {e}")
+                sys.exit(1)
+
+            # Filter by note type
+            notes = filter_by_note_type(notes, type_list)
+            progress.update(task, description=f"[green]Found {len(notes)} notes for {provider_id}[/]")
+
+            if len(notes) == 0:
+                console.print(f"[yellow]No notes found for provider {provider_id}[/]")
+                sys.exit(1)
+
+            # Categorize
+            task = progress.add_task("Categorizing by visit type...", total=None)
+            categorized = preprocess_notes(notes, workers=resolve_workers(workers))
+            progress.update(task, description="[green]Notes categorized[/]")
+
+            if verbose:
+                console.print()
+                _print_category_summary({c: len(n) for c, n in categorized.items()}, "visit type")
+
+            # Sample
+            task = progress.add_task("Sampling notes...", total=None)
+            samples = _sample_categorized(
+                categorized, "notes", sample_size, token_budget, sampling_strategy
+            )
+            total_sampled = sum(len(n) for n in samples.values())
+            progress.update(task, description=f"[green]Sampled {total_sampled} notes[/]")
 
         # Analyze
         task = progress.add_task("Analyzing patterns (this may take a few minutes)...", total=None)
         try:
-            analysis = analyze_documentation_style(samples, llm=llm, verbose=verbose)
+            analysis = analyze_documentation_style(
+                samples, llm=llm, verbose=verbose,
+                max_notes=None if token_budget else 20,
+                concurrency=concurrency,
+                llm_cache=llm_cache,
+            )
         except Exception as e:
             console.print(f"[red]Error during analysis:[/] {e}")
             sys.exit(1)
@@ -210,6 +398,7 @@ def analyze_notes(input_path, provider_id, output, note_types, sample_size, llm,
     # Save
     _save_json(analysis, output)
     console.print(f"\n[green]Analysis saved to {output}[/]")
+    _print_llm_stats(llm_cache)
 
     _print_documentation_summary(analysis)
 
@@ -292,23 +481,54 @@ def generate_profile(messaging, documentation, output, provider_id, redact):
               type=click.Path(),
               help="Output path for final profile JSON")
 @click.option("--llm", default="claude",
-              type=click.Choice(["claude", "local"]))
+              type=click.Choice(["claude", "claude-batch", "local"]))
 @click.option("--sample-size", default=50)
+@click.option("--start-date", callback=_date_option,
+              help="Only use records on or after this date (YYYY-MM-DD)")
+@click.option("--end-date", callback=_date_option,
+              help="Only use records on or before this date (YYYY-MM-DD)")
+@click.option("--cache-dir", envvar="PROVIDERTONE_CACHE_DIR",
+              type=click.Path(file_okay=False),
+              help="Read from this ingestion cache if the inputs were ingested")
+@click.option("--index", "use_index", is_flag=True,
+              help="Build/reuse a sidecar provider offset index (CSV, JSONL)")
+@click.option("--file-pattern",
+              help="For text-file directories, only open files matching this glob; "
+                   "{provider_id} is filled in (e.g. '*_{provider_id}_*.txt')")
+@click.option("--workers", default=1, type=int,
+              help="Processes for categorization (0 = all CPUs, default: 1)")
+@click.option("--concurrency", default=8, type=int,
+              help="LLM requests in flight at once, one per category (default: 8)")
+@click.option("--llm-cache", envvar="PROVIDERTONE_LLM_CACHE",
+              type=click.Path(file_okay=False),
+              help="Reuse LLM responses cached in this directory (off by default; "
+                   "the cache holds PHI). Entries expire after "
+                   "PROVIDERTONE_LLM_CACHE_TTL seconds: default one week, 0 never")
+@click.option("--dedupe", is_flag=True,
+              help="Collapse near-duplicate (templated) messages before sampling")
+@click.option("--token-budget", type=int,
+              help="Pack each category's sample up to this many prompt tokens "
+                   "instead of --sample-size records")
+@click.option("--sampling-strategy", default="quartile",
+              type=click.Choice(["quartile", "diversity"]),
+              help="quartile: spread samples over lengths; diversity: one medoid "
+                   "per TF-IDF cluster (needs scipy)")
 @click.option("--redact", is_flag=True,
               help="Automatically redact detected PHI")
-def extract(messages, notes, provider_id, output, llm, sample_size, redact):
+def extract(messages, notes, provider_id, output, llm, sample_size, start_date, end_date,
+            cache_dir, use_index, file_pattern, workers, concurrency, llm_cache, dedupe,
+            token_budget,
+            sampling_strategy, redact):
     """One-shot extraction: analyze data and generate profile in one command."""
     from .loaders import load_data
-    from .preprocessors import preprocess_messages, preprocess_notes
-    from .preprocessors import sample_messages, sample_notes
-    from .analyzers import analyze_messaging_style, analyze_documentation_style
-    from .generators import generate_messaging_profile, generate_documentation_profile
     from .generators import export_profile
+    from .preprocessors.parallel import resolve_workers
     from .utils import check_phi, report_phi_findings, redact_phi
 
     if not messages and not notes:
         console.print("[red]Error:[/] At least one of --messages or --notes required")
         sys.exit(1)
+    _check_sampling_options(False, token_budget, sampling_strategy)
 
     console.print()
     console.print("[bold blue]ProviderTone Local[/] - Full Extraction")
@@ -316,35 +536,53 @@ def extract(messages, notes, provider_id, output, llm, sample_size, redact):
     console.print()
 
     profile = {}
+    workers = resolve_workers(workers)
 
     # Process messages
     if messages:
         console.print("[bold]Processing messages...[/]")
-        msg_data = load_data(messages, data_type="messages")
-        msg_data = [m for m in msg_data if m.get("provider_id") == provider_id]
+        msg_data = load_data(
+            messages, data_type="messages", provider_id=provider_id,
+            start_date=start_date, end_date=end_date,
+            cache_dir=cache_dir, use_index=use_index,
+            name_filter=_name_filter(file_pattern, provider_id),
+        )
         console.print(f"  Found {len(msg_data)} messages")
 
         if msg_data:
-            categorized = preprocess_messages(msg_data)
-            samples = sample_messages(categorized, sample_size)
-            console.print(f"  Analyzing {sum(len(s) for s in samples.values())} samples...")
-            analysis = analyze_messaging_style(samples, llm=llm)
-            profile['messaging'] = generate_messaging_profile(analysis)
+            profile['messaging'] = _build_messaging_profile(
+                msg_data, llm, sample_size,
+                log=lambda n: console.print(f"  Analyzing {n} samples..."),
+                workers=workers,
+                dedupe=dedupe,
+                token_budget=token_budget,
+                sampling_strategy=sampling_strategy,
+                concurrency=concurrency,
+                llm_cache=llm_cache,
+            )
             console.print("  [green]Messaging profile complete[/]")
 
     # Process notes
     if notes:
         console.print("[bold]Processing notes...[/]")
-        note_data = load_data(notes, data_type="notes")
-        note_data = [n for n in note_data if n.get("provider_id") == provider_id]
+        note_data = load_data(
+            notes, data_type="notes", provider_id=provider_id,
+            start_date=start_date, end_date=end_date,
+            cache_dir=cache_dir, use_index=use_index,
+            name_filter=_name_filter(file_pattern, provider_id),
+        )
         console.print(f"  Found {len(note_data)} notes")
 
         if note_data:
-            categorized = preprocess_notes(note_data)
-            samples = sample_notes(categorized, sample_size)
-            console.print(f"  Analyzing {sum(len(s) for s in samples.values())} samples...")
-            analysis = analyze_documentation_style(samples, llm=llm)
-            profile['documentation'] = generate_documentation_profile(analysis)
+            profile['documentation'] = _build_documentation_profile(
+                note_data, llm, sample_size,
+                log=lambda n: console.print(f"  Analyzing {n} samples..."),
+                workers=workers,
+                token_budget=token_budget,
+                sampling_strategy=sampling_strategy,
+                concurrency=concurrency,
+                llm_cache=llm_cache,
+            )
             console.print("  [green]Documentation profile complete[/]")
 
     if not profile:
@@ -361,10 +599,726 @@ def extract(messages, notes, provider_id, output, llm, sample_size, redact):
     # Export
     export_profile(profile, output, provider_id)
     console.print(f"\n[green]Profile saved to {output}[/]")
+    _print_llm_stats(llm_cache)
+
+
+@cli.command()
+@click.option("--input", "-i", "input_path", required=True,
+              type=click.Path(exists=True),
+              help="Path to export file (CSV, JSON, JSONL) or directory")
+@click.option("--type", "data_type", default="messages",
+              type=click.Choice(["messages", "notes"]),
+              help="Kind of records in the export")
+@click.option("--cache-dir", envvar="PROVIDERTONE_CACHE_DIR",
+              default=".providertone-cache",
+              type=click.Path(file_okay=False),
+              help="Ingestion cache directory (default: .providertone-cache)")
+@click.option("--force", is_flag=True,
+              help="Rebuild the cache even if this export was already ingested")
+def ingest(input_path, data_type, cache_dir, force):
+    """Parse an export once into a provider-partitioned columnar cache."""
+    from .loaders import ingest as ingest_export
+
+    console.print()
+    console.print("[bold blue]ProviderTone Local[/] - Ingest")
+    console.print(f"Input: {input_path}")
+    console.print()
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+        transient=True,
+    ) as progress:
+        task = progress.add_task(f"Ingesting {data_type}...", total=None)
+        try:
+            manifest = ingest_export(input_path, data_type=data_type,
+                                     cache_dir=cache_dir, force=force)
+        except Exception as e:
+            console.print(f"[red]Error ingesting data:[/] {e}")
+            sys.exit(1)
+        progress.update(task, description="[green]Ingest complete[/]")
+
+    providers = manifest["providers"]
+    total = sum(p["count"] for p in providers.values())
+    console.print(f"[green]Cached {total} {data_type} for {len(providers)} providers[/]")
+    console.print(f"Cache: {Path(cache_dir) / manifest['fingerprint'] / data_type}")
+    console.print(f"\nPass [cyan]--cache-dir {cache_dir}[/] to later commands to read from it.")
+
+
+@cli.command("extract-all")
+@click.option("--messages",
+              type=click.Path(exists=True),
+              help="Path to practice-wide messages file")
+@click.option("--notes",
+              type=click.Path(exists=True),
+              help="Path to practice-wide notes file or directory")
+@click.option("--output-dir", "-o", required=True,
+              type=click.Path(file_okay=False),
+              help="Directory to write one profile JSON per provider")
+@click.option("--providers",
+              help="Comma-separated provider IDs to include (default: all)")
+@click.option("--llm", default="claude",
+              type=click.Choice(["claude", "claude-batch", "local"]))
+@click.option("--sample-size", default=50)
+@click.option("--jobs", "-j", default=4,
+              help="Providers processed concurrently (default: 4)")
+@click.option("--concurrency", default=8, type=int,
+              help="LLM requests in flight per provider, one per category (default: 8)")
+@click.option("--llm-cache", envvar="PROVIDERTONE_LLM_CACHE",
+              type=click.Path(file_okay=False),
+              help="Reuse LLM responses cached in this directory (off by default; "
+                   "the cache holds PHI). Entries expire after "
+                   "PROVIDERTONE_LLM_CACHE_TTL seconds: default one week, 0 never")
+@click.option("--start-date", callback=_date_option,
+              help="Only use records on or after this date (YYYY-MM-DD)")
+@click.option("--end-date", callback=_date_option,
+              help="Only use records on or before this date (YYYY-MM-DD)")
+@click.option("--cache-dir", envvar="PROVIDERTONE_CACHE_DIR",
+              type=click.Path(file_okay=False),
+              help="Read from this ingestion cache if the inputs were ingested")
+@click.option("--index", "use_index", is_flag=True,
+              help="With --providers, seek to each provider's records through a "
+                   "sidecar offset index (CSV, JSONL)")
+@click.option("--file-pattern",
+              help="For text-file directories, only open files matching this glob; "
+                   "{provider_id} is filled in for each of --providers")
+@click.option("--workers", default=1, type=int,
+              help="Processes for categorization per provider (0 = all CPUs, default: 1)")
+@click.option("--dedupe", is_flag=True,
+              help="Collapse near-duplicate (templated) messages before sampling")
+@click.option("--token-budget", type=int,
+              help="Pack each category's sample up to this many prompt tokens "
+                   "instead of --sample-size records")
+@click.option("--sampling-strategy", default="quartile",
+              type=click.Choice(["quartile", "diversity"]),
+              help="quartile: spread samples over lengths; diversity: one medoid "
+                   "per TF-IDF cluster (needs scipy)")
+@click.option("--redact", is_flag=True,
+              help="Automatically redact detected PHI")
+def extract_all(messages, notes, output_dir, providers, llm, sample_size, jobs,
+                concurrency, llm_cache, start_date, end_date, cache_dir, use_index,
+                file_pattern, workers, dedupe, token_budget, sampling_strategy, redact):
+    """Build profiles for every provider in an export, loading it only once."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from .preprocessors.parallel import resolve_workers
+
+    if not messages and not notes:
+        console.print("[red]Error:[/] At least one of --messages or --notes required")
+        sys.exit(1)
+    _check_sampling_options(False, token_budget, sampling_strategy)
+
+    allow = {p.strip() for p in providers.split(",") if p.strip()} if providers else None
+    if file_pattern and "{provider_id}" in file_pattern and not allow:
+        raise click.UsageError("--file-pattern with {provider_id} needs --providers")
+    workers = resolve_workers(workers)
+
+    console.print()
+    console.print("[bold blue]ProviderTone Local[/] - Practice-wide Extraction")
+    console.print()
+
+    # Single pass over each export, grouping records by provider as they stream in
+    msg_groups, note_groups = {}, {}
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+        transient=True,
+    ) as progress:
+        try:
+            if messages:
+                task = progress.add_task("Loading messages...", total=None)
+                msg_groups = _load_provider_groups(
+                    messages, "messages", allow, start_date, end_date, cache_dir,
+                    use_index, file_pattern,
+                )
+                progress.update(task, description=f"[green]Messages for {len(msg_groups)} providers[/]")
+            if notes:
+                task = progress.add_task("Loading notes...", total=None)
+                note_groups = _load_provider_groups(
+                    notes, "notes", allow, start_date, end_date, cache_dir,
+                    use_index, file_pattern,
+                )
+                progress.update(task, description=f"[green]Notes for {len(note_groups)} providers[/]")
+        except Exception as e:
+            console.print(f"[red]Error loading data:[/] {e}")
+            sys.exit(1)
+
+    provider_ids = sorted(set(msg_groups) | set(note_groups))
+    if not provider_ids:
+        console.print("[red]No data found for the requested providers[/]")
+        sys.exit(1)
+
+    out_dir = Path(output_dir)
+
+    def run(provider_id: str) -> dict:
+        return _extract_provider(
+            provider_id,
+            msg_groups.pop(provider_id, []),
+            note_groups.pop(provider_id, []),
+            out_dir, llm, sample_size, redact, dedupe,
+            concurrency=concurrency,
+            llm_cache=llm_cache,
+            workers=workers,
+            token_budget=token_budget,
+            sampling_strategy=sampling_strategy,
+        )
+
+    if llm == "claude-batch":
+        # Every provider's prompts go out together instead of per provider
+        console.print(f"Building profiles for [cyan]{len(provider_ids)}[/] providers "
+                      f"with the Message Batches API")
+        results = _extract_all_batched(provider_ids, msg_groups, note_groups, out_dir,
+                                       sample_size, redact, dedupe, llm_cache=llm_cache,
+                                       workers=workers, token_budget=token_budget,
+                                       sampling_strategy=sampling_strategy)
+    else:
+        console.print(f"Building profiles for [cyan]{len(provider_ids)}[/] providers "
+                      f"with {jobs} workers")
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            futures = {pool.submit(run, pid): pid for pid in provider_ids}
+            for future in as_completed(futures):
+                pid = futures[future]
+                try:
+                    results[pid] = future.result()
+                    console.print(f"  [green]✓[/] {pid} -> {results[pid]['output']}")
+                except Exception as e:
+                    results[pid] = {"error": str(e)}
+                    console.print(f"  [red]✗[/] {pid}: {e}")
+
+    _print_extract_all_summary(results)
+    _print_llm_stats(llm_cache)
+
+    if any("error" in r for r in results.values()):
+        sys.exit(1)
+
+
+@cli.command()
+@click.option("--messages",
+              type=click.Path(exists=True),
+              help="Path to messages file")
+@click.option("--notes",
+              type=click.Path(exists=True),
+              help="Path to notes file or directory")
+@click.option("--provider-id", "-p", required=True,
+              help="Provider identifier")
+@click.option("--output", "-o", required=True,
+              type=click.Path(),
+              help="Profile JSON to create or update")
+@click.option("--state-dir", default=".providertone-state", envvar="PROVIDERTONE_STATE_DIR",
+              type=click.Path(file_okay=False),
+              help="Directory holding per-provider watermarks (default: .providertone-state)")
+@click.option("--llm", default="claude",
+              type=click.Choice(["claude", "claude-batch", "local"]))
+@click.option("--sample-size", default=50)
+@click.option("--start-date", callback=_date_option,
+              help="Only use records on or after this date (YYYY-MM-DD)")
+@click.option("--end-date", callback=_date_option,
+              help="Only use records on or before this date (YYYY-MM-DD)")
+@click.option("--cache-dir", envvar="PROVIDERTONE_CACHE_DIR",
+              type=click.Path(file_okay=False),
+              help="Read from this ingestion cache if the inputs were ingested")
+@click.option("--index", "use_index", is_flag=True,
+              help="Build/reuse a sidecar provider offset index (CSV, JSONL)")
+@click.option("--file-pattern",
+              help="For text-file directories, only open files matching this glob; "
+                   "{provider_id} is filled in (e.g. '*_{provider_id}_*.txt')")
+@click.option("--workers", default=1, type=int,
+              help="Processes for categorization (0 = all CPUs, default: 1)")
+@click.option("--concurrency", default=8, type=int,
+              help="LLM requests in flight at once, one per category (default: 8)")
+@click.option("--llm-cache", envvar="PROVIDERTONE_LLM_CACHE",
+              type=click.Path(file_okay=False),
+              help="Reuse LLM responses cached in this directory (off by default; "
+                   "the cache holds PHI). Entries expire after "
+                   "PROVIDERTONE_LLM_CACHE_TTL seconds: default one week, 0 never")
+@click.option("--redact", is_flag=True,
+              help="Automatically redact detected PHI")
+def refresh(messages, notes, provider_id, output, state_dir, llm, sample_size,
+            start_date, end_date, cache_dir, use_index, file_pattern, workers, concurrency,
+            llm_cache, redact):
+    """Incrementally update a profile with records newer than the last run."""
+    from .loaders.watermark import load_state, save_state
+    from .generators import build_export, load_profile, merge_profiles
+    from .preprocessors.parallel import resolve_workers
+    from .utils import check_phi, report_phi_findings, redact_phi
+
+    if not messages and not notes:
+        console.print("[red]Error:[/] At least one of --messages or --notes required")
+        sys.exit(1)
+
+    console.print()
+    console.print("[bold blue]ProviderTone Local[/] - Incremental Refresh")
+    console.print(f"Provider: [cyan]{provider_id}[/]")
+    console.print()
+
+    profile = {}
+    states = []
+
+    for path, data_type in ((messages, "messages"), (notes, "notes")):
+        if not path:
+            continue
+        console.print(f"[bold]Refreshing {data_type}...[/]")
+        state = load_state(state_dir, provider_id, data_type)
+        section = _refresh_section(
+            path, data_type, provider_id, state, llm, sample_size, cache_dir, use_index,
+            file_pattern=file_pattern,
+            workers=resolve_workers(workers),
+            start_date=start_date,
+            end_date=end_date,
+            concurrency=concurrency,
+            llm_cache=llm_cache,
+        )
+        if section is not None:
+            key = "messaging" if data_type == "messages" else "documentation"
+            profile[key] = section
+            states.append(state)
+
+    if not profile:
+        console.print("[yellow]No new data since the last refresh; profile unchanged[/]")
+        return
+
+    # PHI check
+    findings = check_phi(profile)
+    if findings:
+        console.print(report_phi_findings(findings))
+        if redact:
+            profile = redact_phi(profile)
+
+    # Merge into the existing export so untouched sections are kept
+    export_data = build_export(profile, provider_id)
+    if Path(output).exists():
+        export_data = merge_profiles(load_profile(output), export_data)
+    _save_json(export_data, output)
+
+    # Only advance the watermarks once the profile is safely written
+    for state in states:
+        save_state(state_dir, state)
+
+    console.print(f"\n[green]Profile saved to {output}[/]")
+    _print_llm_stats(llm_cache)
 
 
 # Helper functions
 
+def _name_filter(file_pattern: str, provider_id: str):
+    """Fill the provider into a --file-pattern glob (None when not given)."""
+    if not file_pattern:
+        return None
+    return file_pattern.replace("{provider_id}", provider_id)
+
+
+def _load_provider_groups(
+    path: str,
+    data_type: str,
+    allow: set,
+    start_date: str = None,
+    end_date: str = None,
+    cache_dir: str = None,
+    use_index: bool = False,
+    file_pattern: str = None
+) -> dict:
+    """
+    Load an export grouped by provider.
+
+    With an allow-list and --index or a per-provider --file-pattern, each
+    listed provider is loaded on its own so only its records are read;
+    otherwise the export is streamed once and grouped.
+    """
+    from .loaders import group_by_provider, iter_data, load_data
+
+    per_provider = file_pattern and "{provider_id}" in file_pattern
+    if allow and (use_index or per_provider):
+        groups = {}
+        for provider_id in sorted(allow):
+            records = load_data(
+                path, data_type=data_type, provider_id=provider_id,
+                start_date=start_date, end_date=end_date,
+                cache_dir=cache_dir, use_index=use_index,
+                name_filter=_name_filter(file_pattern, provider_id),
+            )
+            if records:
+                groups[provider_id] = records
+        return groups
+
+    return group_by_provider(
+        iter_data(path, data_type=data_type, start_date=start_date, end_date=end_date,
+                  cache_dir=cache_dir, name_filter=file_pattern),
+        allow,
+    )
+
+
+def _check_sampling_options(stream: bool, token_budget: int, sampling_strategy: str):
+    """Reject sampling options that don't combine."""
+    if stream and token_budget:
+        raise click.UsageError("--token-budget cannot be combined with --stream")
+    if stream and sampling_strategy != "quartile":
+        raise click.UsageError("--sampling-strategy diversity cannot be combined with --stream")
+    if token_budget and sampling_strategy != "quartile":
+        raise click.UsageError("--sampling-strategy diversity cannot be combined with "
+                               "--token-budget")
+
+
+def _sample_categorized(categorized: dict, data_type: str, sample_size: int,
+                        token_budget: int = None, sampling_strategy: str = "quartile") -> dict:
+    """Sample categorized messages or notes with the selected strategy."""
+    from .preprocessors import sample_messages, sample_notes
+    from .preprocessors.diversity import sample_messages_diverse, sample_notes_diverse
+    from .preprocessors.token_budget import sample_messages_by_tokens, sample_notes_by_tokens
+
+    if data_type == "messages":
+        if token_budget:
+            return sample_messages_by_tokens(categorized, token_budget)
+        if sampling_strategy == "diversity":
+            return sample_messages_diverse(categorized, sample_size)
+        return sample_messages(categorized, sample_size)
+
+    if token_budget:
+        return sample_notes_by_tokens(categorized, token_budget)
+    if sampling_strategy == "diversity":
+        return sample_notes_diverse(categorized, sample_size)
+    return sample_notes(categorized, sample_size)
+
+
+def _message_samples(msg_data: list, sample_size: int, workers: int = 1,
+                     dedupe: bool = False, token_budget: int = None,
+                     sampling_strategy: str = "quartile") -> dict:
+    """Categorize and sample one provider's messages."""
+    from .preprocessors import preprocess_messages
+    from .preprocessors.dedup import dedupe_messages
+
+    categorized = preprocess_messages(msg_data, workers=workers)
+    if dedupe:
+        categorized = dedupe_messages(categorized)
+    return _sample_categorized(
+        categorized, "messages", sample_size, token_budget, sampling_strategy
+    )
+
+
+def _note_samples(note_data: list, sample_size: int, workers: int = 1,
+                  token_budget: int = None, sampling_strategy: str = "quartile") -> dict:
+    """Categorize and sample one provider's notes."""
+    from .preprocessors import preprocess_notes
+
+    categorized = preprocess_notes(note_data, workers=workers)
+    return _sample_categorized(
+        categorized, "notes", sample_size, token_budget, sampling_strategy
+    )
+
+
+def _build_messaging_profile(msg_data: list, llm: str, sample_size: int, log=None,
+                             workers: int = 1, dedupe: bool = False,
+                             token_budget: int = None,
+                             sampling_strategy: str = "quartile",
+                             concurrency: int = 8, llm_cache: str = None) -> dict:
+    """Categorize, sample, analyze and generate the messaging profile section."""
+    from .analyzers import analyze_messaging_style
+    from .generators import generate_messaging_profile
+
+    samples = _message_samples(msg_data, sample_size, workers, dedupe, token_budget,
+                               sampling_strategy)
+    if log:
+        log(sum(len(s) for s in samples.values()))
+    analysis = analyze_messaging_style(
+        samples, llm=llm, max_messages=None if token_budget else 30,
+        concurrency=concurrency, llm_cache=llm_cache,
+    )
+    return generate_messaging_profile(analysis)
+
+
+def _build_documentation_profile(note_data: list, llm: str, sample_size: int, log=None,
+                                 workers: int = 1, token_budget: int = None,
+                                 sampling_strategy: str = "quartile",
+                                 concurrency: int = 8, llm_cache: str = None) -> dict:
+    """Categorize, sample, analyze and generate the documentation profile section."""
+    from .analyzers import analyze_documentation_style
+    from .generators import generate_documentation_profile
+
+    samples = _note_samples(note_data, sample_size, workers, token_budget, sampling_strategy)
+    if log:
+        log(sum(len(s) for s in samples.values()))
+    analysis = analyze_documentation_style(
+        samples, llm=llm, max_notes=None if token_budget else 20,
+        concurrency=concurrency, llm_cache=llm_cache,
+    )
+    return generate_documentation_profile(analysis)
+
+
+def _extract_provider(
+    provider_id: str,
+    msg_data: list,
+    note_data: list,
+    out_dir: Path,
+    llm: str,
+    sample_size: int,
+    redact: bool,
+    dedupe: bool = False,
+    concurrency: int = 8,
+    llm_cache: str = None,
+    workers: int = 1,
+    token_budget: int = None,
+    sampling_strategy: str = "quartile"
+) -> dict:
+    """Run the full extraction for one provider and write its profile file."""
+    profile = {}
+    if msg_data:
+        profile['messaging'] = _build_messaging_profile(msg_data, llm, sample_size,
+                                                        workers=workers, dedupe=dedupe,
+                                                        token_budget=token_budget,
+                                                        sampling_strategy=sampling_strategy,
+                                                        concurrency=concurrency,
+                                                        llm_cache=llm_cache)
+    if note_data:
+        profile['documentation'] = _build_documentation_profile(note_data, llm, sample_size,
+                                                                workers=workers,
+                                                                token_budget=token_budget,
+                                                                sampling_strategy=sampling_strategy,
+                                                                concurrency=concurrency,
+                                                                llm_cache=llm_cache)
+
+    return _save_provider_profile(provider_id, profile, out_dir, redact,
+                                  len(msg_data), len(note_data))
+
+
+def _save_provider_profile(provider_id: str, profile: dict, out_dir: Path, redact: bool,
+                           messages: int, notes: int) -> dict:
+    """PHI-check a provider's profile, write its file and summarize the result."""
+    from .generators import export_profile
+    from .utils import check_phi, redact_phi
+
+    findings = check_phi(profile)
+    if findings and redact:
+        profile = redact_phi(profile)
+
+    output = out_dir / f"{_safe_filename(provider_id)}.json"
+    export_profile(profile, str(output), provider_id)
+
+    return {
+        "output": str(output),
+        "messages": messages,
+        "notes": notes,
+        "phi_findings": len(findings),
+    }
+
+
+def _extract_all_batched(
+    provider_ids: list,
+    msg_groups: dict,
+    note_groups: dict,
+    out_dir: Path,
+    sample_size: int,
+    redact: bool,
+    dedupe: bool = False,
+    llm_cache: str = None,
+    workers: int = 1,
+    token_budget: int = None,
+    sampling_strategy: str = "quartile"
+) -> dict:
+    """
+    Build every provider's profile from one set of Message Batches.
+
+    Samples all providers first, submits every category prompt of every
+    provider together, then parses, aggregates and writes each profile.
+    A provider whose requests failed is reported with an error.
+    """
+    from .llm import get_llm_client
+    from .analyzers.parsing import parse_analysis_response
+    from .analyzers.messaging_analyzer import build_message_requests, finalize_messaging_analysis
+    from .analyzers.documentation_analyzer import (
+        build_note_requests, finalize_documentation_analysis,
+    )
+    from .generators import generate_messaging_profile, generate_documentation_profile
+
+    # Keys are (provider, data type, category)
+    samples, counts, requests = {}, {}, {}
+    for pid in provider_ids:
+        msg_data = msg_groups.pop(pid, [])
+        note_data = note_groups.pop(pid, [])
+        counts[pid] = (len(msg_data), len(note_data))
+        if msg_data:
+            samples[pid, "messages"] = _message_samples(msg_data, sample_size, workers, dedupe,
+                                                        token_budget, sampling_strategy)
+            built = build_message_requests(samples[pid, "messages"],
+                                           max_messages=None if token_budget else 30)
+            for category, request in built.items():
+                requests[pid, "messages", category] = request
+        if note_data:
+            samples[pid, "notes"] = _note_samples(note_data, sample_size, workers,
+                                                  token_budget, sampling_strategy)
+            built = build_note_requests(samples[pid, "notes"],
+                                        max_notes=None if token_budget else 20)
+            for visit_type, request in built.items():
+                requests[pid, "notes", visit_type] = request
+
+    console.print(f"Analyzing {len(requests)} category prompts via Message Batches...")
+
+    shown = {}
+
+    def show(batch) -> None:
+        # Only report changes; polls repeat every 30s for up to a day
+        c = batch.request_counts
+        line = (f"{batch.processing_status} ({c.succeeded} succeeded, "
+                f"{c.errored + c.expired + c.canceled} failed, {c.processing} processing)")
+        if shown.get(batch.id) != line:
+            shown[batch.id] = line
+            console.print(f"  {batch.id}: {line}")
+
+    client = get_llm_client("claude-batch", cache_dir=llm_cache)
+    responses, errors = client.run_batch(requests, progress=show)
+
+    results = {}
+    for pid in provider_ids:
+        try:
+            failed = sorted(f"{kind}/{label}: {error}"
+                            for (p, kind, label), error in errors.items() if p == pid)
+            if failed:
+                raise RuntimeError(f"{len(failed)} batch requests failed ({failed[0]})")
+
+            profile = {}
+            for kind in ("messages", "notes"):
+                if (pid, kind) not in samples:
+                    continue
+                analyses = {
+                    label: parse_analysis_response(response, label)
+                    for (p, k, label), response in responses.items() if p == pid and k == kind
+                }
+                if kind == "messages":
+                    analysis = finalize_messaging_analysis(analyses, samples[pid, kind])
+                    profile['messaging'] = generate_messaging_profile(analysis)
+                else:
+                    analysis = finalize_documentation_analysis(analyses, samples[pid, kind])
+                    profile['documentation'] = generate_documentation_profile(analysis)
+
+            results[pid] = _save_provider_profile(pid, profile, out_dir, redact, *counts[pid])
+            console.print(f"  [green]✓[/] {pid} -> {results[pid]['output']}")
+        except Exception as e:
+            results[pid] = {"error": str(e)}
+            console.print(f"  [red]✗[/] {pid}: {e}")
+
+    return results
+
+
+def _refresh_section(
+    path: str,
+    data_type: str,
+    provider_id: str,
+    state: dict,
+    llm: str,
+    sample_size: int,
+    cache_dir,
+    use_index: bool,
+    file_pattern: str = None,
+    workers: int = 1,
+    start_date: str = None,
+    end_date: str = None,
+    concurrency: int = 8,
+    llm_cache: str = None
+):
+    """
+    Analyze records past the watermark and rebuild one profile section.
+
+    start_date only applies before the watermark has passed it; end_date
+    holds the watermark back so later days are left for a future refresh.
+    Updates state in place. Returns None when nothing new was found.
+    """
+    from .loaders import load_data
+    from .loaders.watermark import watermark_date, filter_unseen, advance_state, dated_timestamps
+    from .analyzers import make_run, combine_messaging_runs, combine_documentation_runs
+    from .generators import generate_messaging_profile, generate_documentation_profile
+
+    since = watermark_date(state)
+    records = load_data(
+        path, data_type=data_type, provider_id=provider_id,
+        start_date=max(filter(None, (since, start_date)), default=None), end_date=end_date,
+        cache_dir=cache_dir, use_index=use_index,
+        name_filter=_name_filter(file_pattern, provider_id),
+    )
+    new_records = filter_unseen(records, state, data_type)
+    if since:
+        console.print(f"  {len(new_records)} new {data_type} since {since} "
+                      f"({len(state['runs'])} previous runs)")
+    else:
+        console.print(f"  Found {len(new_records)} {data_type} (first run)")
+
+    if not new_records:
+        return None
+
+    if data_type == "messages":
+        from .preprocessors import preprocess_messages, sample_messages
+        from .analyzers import analyze_messaging_style
+        samples = sample_messages(preprocess_messages(new_records, workers=workers), sample_size)
+        analysis = analyze_messaging_style(samples, llm=llm, concurrency=concurrency,
+                                           llm_cache=llm_cache)
+    else:
+        from .preprocessors import preprocess_notes, sample_notes
+        from .analyzers import analyze_documentation_style
+        samples = sample_notes(preprocess_notes(new_records, workers=workers), sample_size)
+        analysis = analyze_documentation_style(samples, llm=llm, concurrency=concurrency,
+                                               llm_cache=llm_cache)
+
+    timestamps = dated_timestamps(new_records, data_type)
+    window = {
+        "start": timestamps[0] if timestamps else None,
+        "end": timestamps[-1] if timestamps else None,
+        "records": len(new_records),
+    }
+    state["runs"].append(make_run(analysis, data_type, window))
+    advance_state(state, new_records, data_type)
+
+    if data_type == "messages":
+        return generate_messaging_profile(combine_messaging_runs(state["runs"]))
+    return generate_documentation_profile(combine_documentation_runs(state["runs"]))
+
+
+def _safe_filename(name: str) -> str:
+    """Make a provider ID safe to use as a file name."""
+    import re
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name) or "unknown"
+
+
+def _print_extract_all_summary(results: dict) -> None:
+    """Print per-provider results of extract-all."""
+    table = Table(title="Provider Profiles")
+    table.add_column("Provider", style="cyan")
+    table.add_column("Messages", justify="right")
+    table.add_column("Notes", justify="right")
+    table.add_column("PHI Findings", justify="right")
+    table.add_column("Status")
+
+    for pid, r in sorted(results.items()):
+        if "error" in r:
+            table.add_row(pid, "-", "-", "-", f"[red]{r['error']}[/]")
+        else:
+            table.add_row(pid, str(r["messages"]), str(r["notes"]),
+                          str(r["phi_findings"]), "[green]saved[/]")
+
+    console.print()
+    console.print(table)
+
+
+def _print_llm_stats(llm_cache: str = None) -> None:
+    """Print response cache hits and Claude prompt cache usage for the run."""
+    from .llm import shared_response_cache, usage_meter
+
+    if llm_cache:
+        stats = shared_response_cache(llm_cache).stats()
+        if stats["hits"] or stats["misses"]:
+            console.print(f"LLM response cache: {stats['hits']} hits, {stats['misses']} misses "
+                          f"({stats['entries']} entries, {stats['bytes'] / 1e6:.1f} MB)")
+
+    usage = usage_meter().summary()
+    if usage["requests"]:
+        console.print(
+            f"Claude usage: {usage['requests']} requests, "
+            f"{usage['input_tokens']} input + {usage['output_tokens']} output tokens; "
+            f"prompt cache {usage['cache_read_input_tokens']} read / "
+            f"{usage['cache_creation_input_tokens']} written "
+            f"({usage['cache_read_ratio']:.0%} of prompt tokens from cache), "
+            f"mean latency {usage['mean_latency']:.1f}s"
+        )
+
+
 def _save_json(data: dict, path: str) -> None:
     """Save data to JSON file."""
     p = Path(path)
@@ -379,14 +1333,14 @@ def _load_json(path: str) -> dict:
         return json.load(f)
 
 
-def _print_category_summary(categorized: dict, label: str = "category") -> None:
-    """Print summary of categorized data."""
+def _print_category_summary(counts: dict, label: str = "category") -> None:
+    """Print summary of record counts per category."""
     table = Table(title=f"Messages by {label}")
     table.add_column(label.title(), style="cyan")
     table.add_column("Count", justify="right")
 
-    for cat, items in sorted(categorized.items(), key=lambda x: -len(x[1])):
-        table.add_row(cat, str(len(items)))
+    for cat, count in sorted(counts.items(), key=lambda x: -x[1]):
+        table.add_row(cat, str(count))
 
     console.print(table)
 
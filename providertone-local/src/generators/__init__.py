@@ -4,11 +4,14 @@ Profile generators for creating website-compatible output.
 
 from .messaging_profile import generate_messaging_profile
 from .documentation_profile import generate_documentation_profile
-from .exporter import export_profile, validate_profile
+from .exporter import export_profile, build_export, validate_profile, load_profile, merge_profiles
 
 __all__ = [
     "generate_messaging_profile",
     "generate_documentation_profile",
     "export_profile",
+    "build_export",
     "validate_profile",
+    "load_profile",
+    "merge_profiles",
 ]
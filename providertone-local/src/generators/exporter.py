@@ -21,6 +21,31 @@ def export_profile(
         output_path: Path to output JSON file
         provider_id: Optional provider identifier to include
     """
+    export_data = build_export(profile, provider_id)
+
+    # Ensure output directory exists
+    output = Path(output_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write JSON
+    with open(output, 'w') as f:
+        json.dump(export_data, f, indent=2)
+
+
+def build_export(
+    profile: Dict[str, Any],
+    provider_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Wrap a profile in the website-compatible export envelope.
+
+    Args:
+        profile: Profile dictionary with 'messaging' and/or 'documentation' keys
+        provider_id: Optional provider identifier to include
+
+    Returns:
+        Export dictionary as written by export_profile
+    """
     export_data = {
         'exportedAt': datetime.now().isoformat(),
         'exportedBy': 'providertone-local',
@@ -44,13 +69,7 @@ def export_profile(
             'userCorrections': None,
         }
 
-    # Ensure output directory exists
-    output = Path(output_path)
-    output.parent.mkdir(parents=True, exist_ok=True)
-
-    # Write JSON
-    with open(output, 'w') as f:
-        json.dump(export_data, f, indent=2)
+    return export_data
 
 
 def validate_profile(profile: Dict[str, Any]) -> bool:
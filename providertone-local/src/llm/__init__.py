@@ -2,26 +2,44 @@
 LLM client implementations.
 """
 
+from typing import Optional
+
 from .claude_client import ClaudeClient
 from .base import BaseLLMClient
+from .cache import ResponseCache, cache_key, is_cacheable, shared_response_cache
+from .concurrency import run_concurrently, DEFAULT_CONCURRENCY
+from .rate_limit import RateLimiter, TokenBucket, call_with_retries, shared_limiter
+from .usage import UsageMeter, usage_meter
 
-__all__ = ["ClaudeClient", "BaseLLMClient", "get_llm_client"]
+__all__ = [
+    "ClaudeClient", "BaseLLMClient", "get_llm_client",
+    "RateLimiter", "TokenBucket", "call_with_retries", "shared_limiter",
+    "ResponseCache", "cache_key", "is_cacheable", "shared_response_cache",
+    "UsageMeter", "usage_meter",
+    "run_concurrently", "DEFAULT_CONCURRENCY",
+]
 
 
-def get_llm_client(llm_type: str = "claude") -> BaseLLMClient:
+def get_llm_client(llm_type: str = "claude", cache_dir: Optional[str] = None) -> BaseLLMClient:
     """
     Factory function to get appropriate LLM client.
 
     Args:
-        llm_type: "claude" or "local"
+        llm_type: "claude", "claude-batch" (Message Batches API) or "local"
+        cache_dir: Directory of the on-disk response cache to reuse earlier
+            responses from (None: no caching)
 
     Returns:
         LLM client instance
     """
+    cache = shared_response_cache(cache_dir) if cache_dir else None
     if llm_type == "claude":
-        return ClaudeClient()
+        return ClaudeClient(cache=cache)
+    elif llm_type == "claude-batch":
+        from .batch_client import BatchClaudeClient
+        return BatchClaudeClient(cache=cache)
     elif llm_type == "local":
         from .local_client import LocalLLMClient
-        return LocalLLMClient()
+        return LocalLLMClient(cache=cache)
     else:
         raise ValueError(f"Unknown LLM type: {llm_type}")
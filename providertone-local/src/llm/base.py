@@ -3,7 +3,9 @@ Base LLM client interface.
 """
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Tuple
+
+from .concurrency import DEFAULT_CONCURRENCY, run_concurrently
 
 
 class BaseLLMClient(ABC):
@@ -22,23 +24,64 @@ class BaseLLMClient(ABC):
         """
         pass
 
-    def batch_analyze(self, prompts: List[str], delay: float = 1.0) -> List[str]:
+    def analyze_with_prefix(self, prefix: str, data: str) -> str:
+        """
+        Send a prompt made of a shared prefix followed by per-call data.
+
+        Callers keep the prefix (instructions, output schema) identical
+        across calls and put everything that varies in data, so backends
+        that cache prompt prefixes can reuse it. The default sends the
+        concatenation through analyze().
+
+        Args:
+            prefix: Leading part of the prompt, the same for many calls
+            data: Trailing, call-specific part of the prompt
+
+        Returns:
+            LLM response text
+        """
+        return self.analyze(prefix + data)
+
+    def batch_analyze(
+        self,
+        prompts: List[str],
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> List[str]:
         """
-        Analyze multiple prompts with rate limiting.
+        Analyze multiple prompts concurrently.
+
+        There is no fixed delay between requests: clients pace themselves
+        against the API's rate limits and retry rate-limited calls, so a
+        batch runs as fast as the quota allows.
 
         Args:
             prompts: List of prompts
-            delay: Seconds between requests
+            concurrency: Maximum requests in flight
 
         Returns:
-            List of responses
+            List of responses, in prompt order
         """
-        import time
+        return run_concurrently(self.analyze, prompts, concurrency)
+
+    def batch_analyze_with_prefix(
+        self,
+        requests: List[Tuple[str, str]],
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> List[str]:
+        """
+        Analyze multiple (prefix, data) prompts; see analyze_with_prefix().
+
+        Runs them concurrently like batch_analyze(). Batch backends
+        override this to send all of them in one submission.
 
-        results = []
-        for i, prompt in enumerate(prompts):
-            if i > 0:
-                time.sleep(delay)
-            results.append(self.analyze(prompt))
+        Args:
+            requests: (prefix, data) pairs
+            concurrency: Maximum requests in flight
+
+        Returns:
+            List of responses, in request order
+        """
+        def analyze(request: Tuple[str, str]) -> str:
+            return self.analyze_with_prefix(*request)
 
-        return results
+        return run_concurrently(analyze, requests, concurrency)
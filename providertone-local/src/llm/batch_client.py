@@ -0,0 +1,214 @@
+"""
+Claude client that runs analyses through the Message Batches API.
+
+Batches trade latency for cost and throughput: requests are billed at
+half price and are not subject to the interactive rate limits, but
+results arrive when the whole batch has been processed (usually well
+within an hour, at most 24). Suited to overnight practice-wide runs.
+"""
+
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from anthropic import Anthropic
+
+from .base import BaseLLMClient
+from .cache import ResponseCache, is_cacheable
+from .claude_client import ANALYSIS_SYSTEM_PROMPT, message_params, response_cache_key
+from .concurrency import DEFAULT_CONCURRENCY
+from .usage import usage_meter
+
+
+# API limits are 100,000 requests and 256 MB per batch; stay below both
+MAX_BATCH_REQUESTS = 50_000
+MAX_BATCH_BYTES = 200 * 1024 * 1024
+
+DEFAULT_POLL_INTERVAL = 30.0
+
+
+class BatchClaudeClient(BaseLLMClient):
+    """Client that submits Claude requests as Message Batches."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: str = "claude-sonnet-4-5-20250514",
+        poll_interval: Optional[float] = None,
+        cache: Optional[ResponseCache] = None
+    ):
+        """
+        Initialize batch client.
+
+        Args:
+            api_key: Anthropic API key (defaults to env var)
+            base_url: Custom API base URL (optional)
+            model: Model to use
+            poll_interval: Seconds between status checks (defaults to
+                PROVIDERTONE_BATCH_POLL_SECONDS or 30)
+            cache: Response cache consulted before submitting (optional)
+        """
+        self.client = Anthropic(
+            api_key=api_key or os.environ.get("ANTHROPIC_API_KEY"),
+            base_url=base_url or os.environ.get("ANTHROPIC_BASE_URL"),
+        )
+        self.model = model
+        self.poll_interval = (
+            poll_interval
+            if poll_interval is not None
+            else float(os.environ.get("PROVIDERTONE_BATCH_POLL_SECONDS", DEFAULT_POLL_INTERVAL))
+        )
+        self.cache = cache
+
+    def analyze(self, prompt: str) -> str:
+        """
+        Analyze one prompt as a batch of one.
+
+        Prefer batch_analyze_with_prefix() or run_batch(); a single request
+        still waits for batch processing.
+
+        Args:
+            prompt: Analysis prompt
+
+        Returns:
+            Claude's response text
+        """
+        return self.batch_analyze_with_prefix([("", prompt)])[0]
+
+    def analyze_with_prefix(self, prefix: str, data: str) -> str:
+        """Analyze one (prefix, data) prompt as a batch of one."""
+        return self.batch_analyze_with_prefix([(prefix, data)])[0]
+
+    def batch_analyze(
+        self,
+        prompts: List[str],
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> List[str]:
+        """Analyze prompts in one batch submission; concurrency is ignored."""
+        return self.batch_analyze_with_prefix([("", prompt) for prompt in prompts])
+
+    def batch_analyze_with_prefix(
+        self,
+        requests: List[Tuple[str, str]],
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> List[str]:
+        """
+        Analyze (prefix, data) prompts in one batch submission.
+
+        Args:
+            requests: (prefix, data) pairs
+            concurrency: Ignored; the API schedules batch requests itself
+
+        Returns:
+            List of responses, in request order
+
+        Raises:
+            RuntimeError: If any request did not succeed
+        """
+        results, errors = self.run_batch(dict(enumerate(requests)))
+        if errors:
+            first = min(errors)
+            raise RuntimeError(
+                f"{len(errors)} of {len(requests)} batch requests failed "
+                f"(request {first}: {errors[first]})"
+            )
+        return [results[i] for i in range(len(requests))]
+
+    def run_batch(
+        self,
+        requests: Dict[Hashable, Tuple[str, str]],
+        progress: Optional[Callable[[Any], None]] = None
+    ) -> Tuple[Dict[Hashable, str], Dict[Hashable, str]]:
+        """
+        Submit requests as Message Batches and wait for their results.
+
+        Requests answered by the response cache are not submitted. The rest
+        are split into as few batches as the API limits allow, all submitted
+        up front and then polled until their processing_status is "ended".
+
+        Args:
+            requests: Mapping of caller key to (prefix, data) prompt
+            progress: Called with each batch object after every status check
+
+        Returns:
+            (responses, errors): response text per key that succeeded, and
+            an error description per key that errored, expired or was canceled
+        """
+        results: Dict[Hashable, str] = {}
+        errors: Dict[Hashable, str] = {}
+
+        # custom_id must match ^[a-zA-Z0-9_-]{1,64}$, so keys are numbered
+        pending: List[Tuple[str, Hashable, Dict[str, Any], Optional[str]]] = []
+        for i, (key, (prefix, data)) in enumerate(requests.items()):
+            cache_key = None
+            if self.cache is not None:
+                cache_key = response_cache_key(self.model, ANALYSIS_SYSTEM_PROMPT, prefix + data)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    results[key] = cached
+                    continue
+            params = message_params(self.model, ANALYSIS_SYSTEM_PROMPT, data, prefix)
+            pending.append((f"req-{i}", key, params, cache_key))
+
+        if not pending:
+            return results, errors
+
+        by_id = {custom_id: (key, cache_key) for custom_id, key, _, cache_key in pending}
+        batch_ids = [
+            self.client.messages.batches.create(requests=chunk).id
+            for chunk in _chunks([
+                {"custom_id": custom_id, "params": params}
+                for custom_id, _, params, _ in pending
+            ])
+        ]
+
+        for batch_id in batch_ids:
+            self._wait(batch_id, progress)
+            for entry in self.client.messages.batches.results(batch_id):
+                key, cache_key = by_id[entry.custom_id]
+                result = entry.result
+                if result.type != "succeeded":
+                    error = getattr(getattr(result, "error", None), "error", None)
+                    errors[key] = f"{result.type}: {error.message}" if error else result.type
+                    continue
+
+                text = result.message.content[0].text
+                usage_meter().record(result.message.usage)
+                results[key] = text
+                truncated = result.message.stop_reason == "max_tokens"
+                if cache_key is not None and is_cacheable(text, truncated):
+                    self.cache.put(cache_key, text)
+
+        # Requests the results never mentioned (should not happen)
+        for key, _ in by_id.values():
+            if key not in results and key not in errors:
+                errors[key] = "missing from batch results"
+
+        return results, errors
+
+    def _wait(self, batch_id: str, progress: Optional[Callable[[Any], None]] = None) -> None:
+        """Poll a batch until its processing has ended."""
+        while True:
+            batch = self.client.messages.batches.retrieve(batch_id)
+            if progress:
+                progress(batch)
+            if batch.processing_status == "ended":
+                return
+            time.sleep(self.poll_interval)
+
+
+def _chunks(requests: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Split batch requests so each submission stays under the API limits."""
+    chunks: List[List[Dict[str, Any]]] = [[]]
+    size = 0
+    for request in requests:
+        request_size = len(json.dumps(request))
+        if chunks[-1] and (len(chunks[-1]) >= MAX_BATCH_REQUESTS
+                           or size + request_size > MAX_BATCH_BYTES):
+            chunks.append([])
+            size = 0
+        chunks[-1].append(request)
+        size += request_size
+    return chunks
@@ -0,0 +1,237 @@
+"""
+Local stand-in for the Anthropic Messages and Message Batches APIs.
+
+Answers every analysis request with a fixed, well-formed analysis, so the
+claude and claude-batch backends can be exercised end to end without
+network access or an API key:
+
+    python -m src.llm.batch_stub_server --port 8765 --delay 2
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=stub \\
+        PROVIDERTONE_BATCH_POLL_SECONDS=1 \\
+        providertone extract-all --messages messages.csv --llm claude-batch ...
+
+Batches stay "in_progress" for --delay seconds after creation, then end
+with every request succeeded. Nothing is persisted; state lives in memory.
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+
+# Canned analyses in the shape the prompt templates ask for
+MESSAGING_ANALYSIS = {
+    "surface_patterns": {
+        "greetings": ["Hi"],
+        "closings": ["Best"],
+        "length_tendency": "short",
+        "typical_paragraph_count": 2,
+        "uses_bullet_points": False,
+        "punctuation_notes": "stub",
+    },
+    "tone_dimensions": {
+        name: {"score": 6, "evidence": "stub"}
+        for name in ("warmth", "directiveness", "formality", "certainty", "thoroughness")
+    },
+    "distinctive_phrases": {"frequent": ["let me know"], "signature": [], "avoided": []},
+    "behavioral_patterns": {
+        "acknowledges_emotions": True,
+        "provides_education": True,
+        "sets_clear_expectations": True,
+        "uses_patient_name": False,
+        "asks_follow_up_questions": False,
+    },
+}
+
+DOCUMENTATION_ANALYSIS = {
+    "structural_patterns": {
+        "overall_organization": "SOAP",
+        "hpi_style": {"format": "narrative", "typical_length": "moderate"},
+        "assessment_style": {"format": "with_rationale", "typical_length": "moderate"},
+        "plan_style": {"organization": "numbered", "specificity": "moderate"},
+        "physical_exam_style": {"format": "focused", "documentation_of_normals": "selective"},
+    },
+    "voice_dimensions": {
+        name: {"score": 6, "evidence": "stub"}
+        for name in ("verbosity", "reasoning_visibility", "formality", "certainty_expression",
+                     "patient_centeredness", "defensiveness")
+    },
+    "standard_phrasings": {"hpi_openings": ["Patient presents with"], "safety_net_phrases": []},
+    "distinctive_patterns": {"signature_moves": [], "consistent_inclusions": [],
+                             "avoided_patterns": []},
+}
+
+
+def _prompt_text(params: Dict[str, Any]) -> str:
+    """All user-turn text of a Messages API request."""
+    parts = []
+    for message in params.get("messages", []):
+        content = message.get("content", "")
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get("text", "") for block in content)
+    return "".join(parts)
+
+
+def stub_message(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Messages API response for a request."""
+    prompt = _prompt_text(params)
+    analysis = DOCUMENTATION_ANALYSIS if "NOTES TO ANALYZE" in prompt else MESSAGING_ANALYSIS
+    text = json.dumps(analysis)
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": params.get("model", "stub"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": len(prompt) // 4 + 1,
+            "output_tokens": len(text) // 4 + 1,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        },
+    }
+
+
+class _Batches:
+    """In-memory batch store."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._batches: Dict[str, Dict[str, Any]] = {}
+
+    def create(self, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+        with self._lock:
+            self._batches[batch_id] = {"created": time.time(), "requests": requests}
+        return batch_id
+
+    def get(self, batch_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return self._batches.get(batch_id)
+
+    def describe(self, batch_id: str, base_url: str) -> Dict[str, Any]:
+        """MessageBatch object for a stored batch."""
+        batch = self.get(batch_id)
+        created = datetime.fromtimestamp(batch["created"], tz=timezone.utc)
+        ended = time.time() >= batch["created"] + self.delay
+        count = len(batch["requests"])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else count,
+                "succeeded": count if ended else 0,
+                "errored": 0, "canceled": 0, "expired": 0,
+            },
+            "created_at": created.isoformat(),
+            "expires_at": (created + timedelta(hours=24)).isoformat(),
+            "ended_at": (created + timedelta(seconds=self.delay)).isoformat() if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+
+def _handler(batches: _Batches):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _base_url(self) -> str:
+            host, port = self.server.server_address[:2]
+            return f"http://{host}:{port}"
+
+        def _send(self, status: int, body: Any, content_type: str = "application/json") -> None:
+            data = body if isinstance(body, bytes) else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("content-type", content_type)
+            self.send_header("content-length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _not_found(self) -> None:
+            self._send(404, {"type": "error",
+                             "error": {"type": "not_found_error", "message": self.path}})
+
+        def do_POST(self):
+            length = int(self.headers.get("content-length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            path = self.path.split("?")[0]
+            if path == "/v1/messages":
+                self._send(200, stub_message(body))
+            elif path == "/v1/messages/batches":
+                batch_id = batches.create(body.get("requests", []))
+                self._send(200, batches.describe(batch_id, self._base_url()))
+            else:
+                self._not_found()
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            match = re.fullmatch(r"/v1/messages/batches/([\w-]+)(/results)?", path)
+            if not match or batches.get(match.group(1)) is None:
+                return self._not_found()
+
+            batch_id = match.group(1)
+            batch = batches.describe(batch_id, self._base_url())
+            if not match.group(2):
+                return self._send(200, batch)
+            if batch["processing_status"] != "ended":
+                return self._not_found()
+
+            lines = [
+                json.dumps({
+                    "custom_id": request["custom_id"],
+                    "result": {"type": "succeeded", "message": stub_message(request["params"])},
+                })
+                for request in batches.get(batch_id)["requests"]
+            ]
+            self._send(200, ("\n".join(lines) + "\n").encode(), "application/binary")
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, delay: float = 2.0) -> ThreadingHTTPServer:
+    """
+    Create the stub server (call serve_forever() on it, e.g. in a thread).
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        delay: Seconds each batch stays in progress
+
+    Returns:
+        The bound server
+    """
+    return ThreadingHTTPServer((host, port), _handler(_Batches(delay)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=2.0,
+                        help="Seconds each batch stays in progress (default: 2)")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.delay)
+    print(f"Stub Anthropic API on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
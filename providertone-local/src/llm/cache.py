@@ -0,0 +1,273 @@
+"""
+Persistent, content-addressed cache of LLM responses.
+
+Responses are stored in SQLite under a hash of everything that determines
+them (backend, model, system prompt, user prompt and generation
+parameters), so re-running an analysis over the same samples reads the
+earlier answers back instead of paying for the same prompts again.
+
+Responses can quote the PHI in their prompts, so the cache is opt-in: it
+is only used when a directory is given (`--llm-cache`), and entries
+expire after a week by default.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Cached responses can quote patient text, so they don't outlive a week
+DEFAULT_TTL = 7 * 24 * 3600
+
+CACHE_FILE = "llm_responses.sqlite"
+
+# Eviction trims the cache to this fraction of its limit, so it doesn't
+# run again on the very next write
+_EVICT_TO = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+def cache_key(**parts: Any) -> str:
+    """
+    Hash the inputs of an LLM call into a cache key.
+
+    Args:
+        **parts: Everything the response depends on (model, system,
+            prompt, generation parameters, ...); values must be JSON-serializable
+
+    Returns:
+        Hex SHA-256 digest, independent of argument order
+    """
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(response: str, truncated: bool = False) -> bool:
+    """
+    Check whether a response is worth keeping in the cache.
+
+    A reply cut off at the token limit, or one without a parsable JSON
+    object, would fail the same way every time it was read back, so it
+    is never stored and the next run asks again.
+
+    Args:
+        response: Response text
+        truncated: The model stopped at its output token limit
+
+    Returns:
+        True if the response is complete and holds a JSON object
+    """
+    if truncated:
+        return False
+    start, end = response.find("{"), response.rfind("}")
+    if start < 0 or end < start:
+        return False
+    try:
+        json.loads(response[start:end + 1])
+    except ValueError:
+        return False
+    return True
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache with size-based LRU eviction and optional TTL.
+
+    Safe to share between threads; separate processes may open the same file.
+
+    Args:
+        path: Database file (created with its directory if missing)
+        max_bytes: Total response size kept; least recently used entries
+            are evicted beyond it
+        ttl: Seconds an entry stays valid (None: forever)
+
+    Raises:
+        ValueError: If ttl is zero or negative
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: Optional[float] = None
+    ):
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f"Cache TTL must be positive (got {ttl}); "
+                             "use None to keep entries forever")
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use (and again in a forked child)."""
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a response.
+
+        Args:
+            key: Key from cache_key()
+
+        Returns:
+            Cached response, or None if absent or expired
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl is not None and row[1] < now - self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        """
+        Store a response, evicting old entries if over the size limit.
+
+        Args:
+            key: Key from cache_key()
+            response: Response text
+        """
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop expired entries, then least recently used ones beyond max_bytes."""
+        if self.ttl is not None:
+            conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - int(self.max_bytes * _EVICT_TO)
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts for this process, and the cache's size on disk."""
+        with self._lock:
+            entries, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+_shared: Dict[str, ResponseCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_response_cache(cache_dir: str) -> ResponseCache:
+    """
+    Process-wide response cache stored in cache_dir, opened on first use.
+
+    Entries expire after DEFAULT_TTL; PROVIDERTONE_LLM_CACHE_TTL sets
+    another lifetime in seconds (0: never expire) and
+    PROVIDERTONE_LLM_CACHE_MAX_MB the size limit (default 512).
+
+    Args:
+        cache_dir: Directory holding the cache database
+
+    Returns:
+        The cache every client given this directory shares
+
+    Raises:
+        ValueError: If PROVIDERTONE_LLM_CACHE_TTL is negative or not a number
+    """
+    path = Path(cache_dir).expanduser() / CACHE_FILE
+    with _shared_lock:
+        key = str(path.resolve())
+        if key not in _shared:
+            max_mb = os.environ.get("PROVIDERTONE_LLM_CACHE_MAX_MB")
+            ttl = os.environ.get("PROVIDERTONE_LLM_CACHE_TTL")
+            _shared[key] = ResponseCache(
+                str(path),
+                max_bytes=int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES,
+                ttl=_env_ttl(ttl),
+            )
+        return _shared[key]
+
+
+def _env_ttl(value: Optional[str]) -> Optional[float]:
+    """Parse PROVIDERTONE_LLM_CACHE_TTL: unset is DEFAULT_TTL, 0 is no expiry."""
+    if not value:
+        return DEFAULT_TTL
+    try:
+        ttl = float(value)
+    except ValueError:
+        ttl = -1.0
+    if ttl < 0:
+        raise ValueError(f"PROVIDERTONE_LLM_CACHE_TTL must be a number of seconds >= 0, "
+                         f"got '{value}'")
+    return ttl or None
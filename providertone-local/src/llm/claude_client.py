@@ -3,10 +3,35 @@ Claude API client for analysis.
 """
 
 import os
-from typing import Optional
-from anthropic import Anthropic
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+from anthropic import Anthropic, APIConnectionError, APIStatusError
 
 from .base import BaseLLMClient
+from .cache import ResponseCache, cache_key, is_cacheable
+from .rate_limit import (
+    DEFAULT_MAX_RETRIES,
+    RETRYABLE_STATUS,
+    call_with_retries,
+    estimate_tokens,
+    shared_limiter,
+)
+from .usage import usage_meter
+
+
+MAX_TOKENS = 4096
+
+# Shortest prefix, in tokens, the API will cache (Haiku models need 2048)
+MIN_CACHEABLE_TOKENS = 1024
+
+ANALYSIS_SYSTEM_PROMPT = """You are analyzing healthcare provider communication patterns.
+Your goal is to extract style patterns that can be used to generate content in their voice.
+
+Important:
+- Be specific and evidence-based
+- Quote exact phrases when relevant
+- Provide numerical scores (1-10) with justification
+- Respond with valid JSON only - no markdown, no explanation"""
 
 
 class ClaudeClient(BaseLLMClient):
@@ -16,7 +41,9 @@ class ClaudeClient(BaseLLMClient):
         self,
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
-        model: str = "claude-sonnet-4-5-20250514"
+        model: str = "claude-sonnet-4-5-20250514",
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        cache: Optional[ResponseCache] = None
     ):
         """
         Initialize Claude client.
@@ -25,12 +52,21 @@ class ClaudeClient(BaseLLMClient):
             api_key: Anthropic API key (defaults to env var)
             base_url: Custom API base URL (optional)
             model: Model to use
+            max_retries: Retries for rate-limited or overloaded requests
+            cache: Response cache consulted before calling the API (optional)
         """
+        base_url = base_url or os.environ.get("ANTHROPIC_BASE_URL")
+        # Retries are handled here, so the SDK's own are turned off
         self.client = Anthropic(
             api_key=api_key or os.environ.get("ANTHROPIC_API_KEY"),
-            base_url=base_url or os.environ.get("ANTHROPIC_BASE_URL"),
+            base_url=base_url,
+            max_retries=0,
         )
         self.model = model
+        self.max_retries = max_retries
+        self.cache = cache
+        # Clients of the same endpoint and model draw on one quota
+        self.limiter = shared_limiter(f"anthropic:{base_url or ''}:{model}")
 
     def analyze(self, prompt: str) -> str:
         """
@@ -42,26 +78,7 @@ class ClaudeClient(BaseLLMClient):
         Returns:
             Claude's response text
         """
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=4096,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            system="""You are analyzing healthcare provider communication patterns.
-Your goal is to extract style patterns that can be used to generate content in their voice.
-
-Important:
-- Be specific and evidence-based
-- Quote exact phrases when relevant
-- Provide numerical scores (1-10) with justification
-- Respond with valid JSON only - no markdown, no explanation"""
-        )
-
-        return response.content[0].text
+        return self._create(prompt, ANALYSIS_SYSTEM_PROMPT)
 
     def analyze_with_system(self, prompt: str, system: str) -> str:
         """
@@ -74,16 +91,126 @@ Important:
         Returns:
             Claude's response text
         """
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=4096,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            system=system
+        return self._create(prompt, system)
+
+    def analyze_with_prefix(self, prefix: str, data: str) -> str:
+        """
+        Send a shared prompt prefix and per-call data, caching the prefix.
+
+        The prefix block carries a cache_control marker; the cached prefix
+        is everything up to it, i.e. the system prompt plus the prefix.
+        Later calls that share both can read them from Anthropic's prompt
+        cache once they reach MIN_CACHEABLE_TOKENS (1024 tokens, 2048 on
+        Haiku models). The shipped analysis prompts (about 525 and 725
+        tokens) don't, so they are sent and billed in full every time.
+
+        Args:
+            prefix: Instructions and output schema, identical across calls
+            data: Call-specific content, sent after the prefix
+
+        Returns:
+            Claude's response text
+        """
+        return self._create(data, ANALYSIS_SYSTEM_PROMPT, prefix=prefix)
+
+    def _create(self, prompt: str, system: str, prefix: str = "") -> str:
+        """
+        Make one Messages API call, paced by the shared rate limiter.
+
+        Rate-limit and overload errors are retried with jittered backoff;
+        every response's rate-limit headers resize the limiter. Answers
+        found in the response cache skip the API entirely.
+        """
+        key = None
+        if self.cache is not None:
+            key = response_cache_key(self.model, system, prefix + prompt)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        params = message_params(self.model, system, prompt, prefix)
+        estimated_input = estimate_tokens(system) + estimate_tokens(prefix + prompt)
+
+        def send():
+            reserved = self.limiter.acquire(estimated_input)
+            headers = None
+            usage = None
+            started = time.monotonic()
+            try:
+                raw = self.client.messages.with_raw_response.create(**params)
+                headers = raw.headers
+                response = raw.parse()
+                usage = response.usage
+                usage_meter().record(usage, time.monotonic() - started)
+                return response
+            finally:
+                # Cache writes count against the input-token limit, reads don't
+                self.limiter.record_usage(
+                    reserved,
+                    input_tokens=(usage.input_tokens
+                                  + (getattr(usage, "cache_creation_input_tokens", 0) or 0)
+                                  if usage else None),
+                    output_tokens=usage.output_tokens if usage else None,
+                    estimated_input=estimated_input,
+                )
+                # Applied after settling: the server's remaining quota already
+                # includes this request, so it replaces the settled level
+                # instead of being charged a second time
+                if headers is not None:
+                    self.limiter.update_from_headers(headers)
+
+        response = call_with_retries(
+            send, _classify_error, limiter=self.limiter, max_retries=self.max_retries
         )
+        text = response.content[0].text
+        if key is not None and is_cacheable(text, response.stop_reason == "max_tokens"):
+            self.cache.put(key, text)
+        return text
+
+
+def message_params(model: str, system: str, prompt: str, prefix: str = "") -> Dict[str, Any]:
+    """
+    Messages API parameters for one analysis request.
+
+    With a prefix, the user turn is the prefix block followed by prompt.
+    Only the prefix block carries cache_control; the system prompt is not
+    marked itself but, coming before the marker, is part of the prefix the
+    API caches. Nothing is cached unless the system prompt and prefix
+    together are at least MIN_CACHEABLE_TOKENS long (2048 on Haiku models).
+    """
+    if prefix:
+        content = [
+            {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt},
+        ]
+    else:
+        content = prompt
+
+    return {
+        "model": model,
+        "max_tokens": MAX_TOKENS,
+        "messages": [
+            {
+                "role": "user",
+                "content": content
+            }
+        ],
+        "system": system,
+    }
+
+
+def response_cache_key(model: str, system: str, prompt: str) -> str:
+    """Response cache key of a Claude request, whether sent directly or batched."""
+    return cache_key(backend="anthropic", model=model, system=system,
+                     prompt=prompt, max_tokens=MAX_TOKENS)
+
 
-        return response.content[0].text
+def _classify_error(error: Exception) -> Tuple[bool, Optional[Mapping[str, str]]]:
+    """Whether an Anthropic SDK error is worth retrying, and its response headers."""
+    if isinstance(error, APIStatusError):
+        # 429 rate limits and 529 overloaded among them
+        return error.status_code in RETRYABLE_STATUS, error.response.headers
+    if isinstance(error, APIConnectionError):
+        # Includes APITimeoutError
+        return True, None
+    return False, None
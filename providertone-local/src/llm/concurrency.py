@@ -0,0 +1,42 @@
+"""
+Concurrent dispatch of independent LLM calls.
+
+Each category is analyzed by an independent, network-bound LLM request,
+so the requests run on a thread pool and a provider's analysis takes
+about as long as its slowest request instead of the sum of all of them.
+BaseLLMClient's batch methods use this for every client.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Requests in flight per analysis; 1 runs the categories one after another
+DEFAULT_CONCURRENCY = 8
+
+
+def run_concurrently(
+    func: Callable[[T], R],
+    items: Sequence[T],
+    concurrency: int = DEFAULT_CONCURRENCY
+) -> List[R]:
+    """
+    Call func on every item, at most concurrency calls at a time.
+
+    Args:
+        func: Function to call; must be safe to run from several threads
+        items: Arguments, one call each
+        concurrency: Maximum calls in flight
+
+    Returns:
+        Results in the order of items. If any call raises, the first
+        failure in item order is re-raised once all calls have finished.
+    """
+    items = list(items)
+    if concurrency <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(items))) as pool:
+        return list(pool.map(func, items))
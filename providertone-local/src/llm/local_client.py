@@ -5,9 +5,11 @@ Local LLM client (Ollama) for air-gapped environments.
 import os
 import json
 import requests
-from typing import Optional
+from typing import Mapping, Optional, Tuple
 
 from .base import BaseLLMClient
+from .cache import ResponseCache, cache_key, is_cacheable
+from .rate_limit import DEFAULT_MAX_RETRIES, RETRYABLE_STATUS, call_with_retries
 
 
 class LocalLLMClient(BaseLLMClient):
@@ -16,7 +18,9 @@ class LocalLLMClient(BaseLLMClient):
     def __init__(
         self,
         endpoint: Optional[str] = None,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        cache: Optional[ResponseCache] = None
     ):
         """
         Initialize local LLM client.
@@ -24,6 +28,8 @@ class LocalLLMClient(BaseLLMClient):
         Args:
             endpoint: Ollama API endpoint (defaults to env var or localhost)
             model: Model name (defaults to env var or llama3)
+            max_retries: Retries when the server is busy (HTTP 429/5xx)
+            cache: Response cache consulted before calling the model (optional)
         """
         self.endpoint = (
             endpoint
@@ -35,6 +41,8 @@ class LocalLLMClient(BaseLLMClient):
             or os.environ.get("LOCAL_LLM_MODEL")
             or "llama3"
         )
+        self.max_retries = max_retries
+        self.cache = cache
 
     def analyze(self, prompt: str) -> str:
         """
@@ -68,11 +76,21 @@ Important:
             }
         }
 
-        try:
+        key = None
+        if self.cache is not None:
+            key = cache_key(backend="ollama", model=self.model, system=system,
+                            prompt=prompt, options=payload["options"])
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        def send():
             response = requests.post(url, json=payload, timeout=300)
             response.raise_for_status()
-            result = response.json()
-            return result.get("response", "")
+            return response.json()
+
+        try:
+            result = call_with_retries(send, _classify_error, max_retries=self.max_retries)
         except requests.exceptions.ConnectionError:
             raise ConnectionError(
                 f"Could not connect to local LLM at {self.endpoint}. "
@@ -83,6 +101,11 @@ Important:
                 "Local LLM request timed out. The model may be too slow for this analysis."
             )
 
+        text = result.get("response", "")
+        if key is not None and is_cacheable(text, result.get("done_reason") == "length"):
+            self.cache.put(key, text)
+        return text
+
     def check_connection(self) -> bool:
         """Check if local LLM is available."""
         try:
@@ -101,3 +124,10 @@ Important:
         except:
             pass
         return []
+
+
+def _classify_error(error: Exception) -> Tuple[bool, Optional[Mapping[str, str]]]:
+    """Retry only when the server answered busy; connection failures are reported at once."""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRYABLE_STATUS, error.response.headers
+    return False, None
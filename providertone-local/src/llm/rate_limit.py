@@ -0,0 +1,288 @@
+"""
+Client-side rate limiting and retries for LLM APIs.
+
+RateLimiter keeps one token bucket each for requests, input tokens and
+output tokens. The buckets start unlimited and take their size from the
+API's rate-limit response headers, so callers wait only when the quota
+actually runs low. Calls that still fail with a rate-limit or overload
+error are retried by call_with_retries() with jittered exponential
+backoff, honoring any retry-after the server sends.
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+R = TypeVar("R")
+
+# Statuses worth retrying: timeouts, conflicts, rate limits, server errors
+# and Anthropic's 529 "overloaded"
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+DEFAULT_MAX_RETRIES = 6
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+
+# Output tokens reserved per request until real usage has been seen
+DEFAULT_OUTPUT_ESTIMATE = 1000
+
+
+class TokenBucket:
+    """
+    Continuously refilling token bucket.
+
+    A bucket without a capacity is unlimited until set_limit() is called.
+    """
+
+    def __init__(self, capacity: Optional[float] = None, per_seconds: float = 60.0):
+        self.capacity = capacity
+        self.per_seconds = per_seconds
+        self.level = capacity or 0.0
+        self.updated = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second."""
+        return (self.capacity or 0.0) / self.per_seconds
+
+    def _refill(self, now: float) -> None:
+        if self.capacity is not None:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount tokens are available (0 if they are now)."""
+        self._refill(now)
+        if self.capacity is None or not self.rate:
+            return 0.0
+        # A request bigger than the whole bucket goes through once it is full
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        """Remove tokens; the level may go negative to record overuse."""
+        if self.capacity is not None:
+            self.level -= amount
+
+    def set_limit(self, limit: float, remaining: Optional[float], now: float) -> None:
+        """Resize the bucket to the server's limit and current remaining quota."""
+        self._refill(now)
+        self.capacity = float(limit)
+        if remaining is not None:
+            self.level = min(float(remaining), self.capacity)
+        else:
+            self.level = min(self.level, self.capacity)
+
+
+class RateLimiter:
+    """
+    Shared request and token budget for one API quota.
+
+    Thread-safe; every client using the same quota should share one
+    instance (see shared_limiter()).
+    """
+
+    # Header name part -> bucket attribute
+    _HEADER_BUCKETS = {
+        "requests": "requests",
+        "input-tokens": "input_tokens",
+        "output-tokens": "output_tokens",
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = TokenBucket()
+        self.input_tokens = TokenBucket()
+        self.output_tokens = TokenBucket()
+        self.output_estimate = float(DEFAULT_OUTPUT_ESTIMATE)
+        self._paused_until = 0.0
+
+    def acquire(self, input_tokens: int) -> float:
+        """
+        Block until a request with this many input tokens fits the quota.
+
+        Args:
+            input_tokens: Estimated prompt tokens
+
+        Returns:
+            Output tokens reserved; pass to record_usage() afterwards
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                reserve = self.output_estimate
+                wait = max(
+                    self._paused_until - now,
+                    self.requests.wait_time(1, now),
+                    self.input_tokens.wait_time(input_tokens, now),
+                    self.output_tokens.wait_time(reserve, now),
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.input_tokens.take(input_tokens)
+                    self.output_tokens.take(reserve)
+                    return reserve
+            # Jitter so waiting threads don't all wake at the same instant
+            time.sleep(wait * random.uniform(1.0, 1.1))
+
+    def record_usage(
+        self,
+        reserved_output: float,
+        input_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+        estimated_input: Optional[int] = None
+    ) -> None:
+        """Settle a request's reservations against its actual usage."""
+        with self._lock:
+            if output_tokens is not None:
+                self.output_tokens.take(output_tokens - reserved_output)
+                # Moving average, so reservations track typical response size
+                self.output_estimate = 0.8 * self.output_estimate + 0.2 * output_tokens
+            else:
+                self.output_tokens.take(-reserved_output)
+            if input_tokens is not None and estimated_input is not None:
+                self.input_tokens.take(input_tokens - estimated_input)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Resize the buckets from anthropic-ratelimit-* response headers.
+
+        Args:
+            headers: Response headers (case-insensitive mapping)
+        """
+        now = time.monotonic()
+        with self._lock:
+            for name, attr in self._HEADER_BUCKETS.items():
+                limit = _number(headers.get(f"anthropic-ratelimit-{name}-limit"))
+                if not limit:
+                    continue
+                remaining = _number(headers.get(f"anthropic-ratelimit-{name}-remaining"))
+                getattr(self, attr).set_limit(limit, remaining, now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for the given time (e.g. after a 429)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def shared_limiter(key: str) -> RateLimiter:
+    """
+    Process-wide limiter for a quota, created on first use.
+
+    Args:
+        key: Identifies the quota, e.g. API endpoint and model
+
+    Returns:
+        The limiter every client with this key shares
+    """
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter()
+        return _limiters[key]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for rate budgeting (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float = DEFAULT_BASE_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY
+) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(max, base * 2**attempt)]."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """
+    Read how long the server asked us to wait.
+
+    Understands retry-after (seconds or an HTTP date) and falls back to
+    the earliest anthropic-ratelimit-*-reset time.
+    """
+    if not headers:
+        return None
+
+    value = headers.get("retry-after")
+    if value:
+        seconds = _number(value)
+        if seconds is not None:
+            return max(0.0, seconds)
+        try:
+            from email.utils import parsedate_to_datetime
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+
+    resets = []
+    for name in RateLimiter._HEADER_BUCKETS:
+        reset = headers.get(f"anthropic-ratelimit-{name}-reset")
+        remaining = _number(headers.get(f"anthropic-ratelimit-{name}-remaining"))
+        if reset and remaining == 0:
+            try:
+                at = datetime.fromisoformat(reset.replace("Z", "+00:00"))
+                resets.append((at - datetime.now(timezone.utc)).total_seconds())
+            except ValueError:
+                continue
+    return max(0.0, min(resets)) if resets else None
+
+
+def call_with_retries(
+    send: Callable[[], R],
+    classify: Callable[[Exception], Tuple[bool, Optional[Mapping[str, str]]]],
+    limiter: Optional[RateLimiter] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    base_delay: float = DEFAULT_BASE_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY
+) -> R:
+    """
+    Call send(), retrying transient failures with jittered exponential backoff.
+
+    Args:
+        send: Makes one request
+        classify: Maps an exception to (retryable, response headers or None)
+        limiter: Updated from error headers and paused on retry-after
+        max_retries: Retries before the last error is raised
+        base_delay: First backoff ceiling in seconds
+        max_delay: Largest backoff ceiling in seconds
+
+    Returns:
+        Result of the first successful call
+    """
+    attempt = 0
+    while True:
+        try:
+            return send()
+        except Exception as e:
+            retryable, headers = classify(e)
+            if not retryable or attempt >= max_retries:
+                raise
+
+            retry_after = retry_after_seconds(headers)
+            if limiter is not None and headers:
+                limiter.update_from_headers(headers)
+            if limiter is not None and retry_after:
+                limiter.pause(retry_after)
+
+            time.sleep(max(backoff_delay(attempt, base_delay, max_delay), retry_after or 0.0))
+            attempt += 1
+
+
+def _number(value: Any) -> Optional[float]:
+    """Parse a numeric header value, or None."""
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,70 @@
+"""
+Token usage accounting for API-backed LLM clients.
+
+Clients record each response's usage here, including Anthropic prompt
+cache reads and writes, so a run can report how much of its input was
+served from the prompt cache and what the requests cost in latency.
+"""
+
+import threading
+from typing import Any, Dict
+
+
+# Usage fields summed across responses
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+
+class UsageMeter:
+    """Thread-safe running totals of API usage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.seconds = 0.0
+        self.totals = dict.fromkeys(USAGE_FIELDS, 0)
+
+    def record(self, usage: Any, seconds: float = 0.0) -> None:
+        """
+        Add one response's usage.
+
+        Args:
+            usage: Response usage object (fields missing or None count as 0)
+            seconds: Request latency
+        """
+        with self._lock:
+            self.requests += 1
+            self.seconds += seconds
+            for field in USAGE_FIELDS:
+                self.totals[field] += getattr(usage, field, None) or 0
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Totals so far, with the share of prompt tokens read from the cache.
+
+        Returns:
+            Dictionary of the USAGE_FIELDS totals plus requests,
+            mean_latency (seconds) and cache_read_ratio
+        """
+        with self._lock:
+            summary = dict(self.totals)
+            summary["requests"] = self.requests
+            summary["mean_latency"] = self.seconds / self.requests if self.requests else 0.0
+        prompt_tokens = (summary["input_tokens"] + summary["cache_creation_input_tokens"]
+                         + summary["cache_read_input_tokens"])
+        summary["cache_read_ratio"] = (
+            summary["cache_read_input_tokens"] / prompt_tokens if prompt_tokens else 0.0
+        )
+        return summary
+
+
+_meter = UsageMeter()
+
+
+def usage_meter() -> UsageMeter:
+    """Process-wide meter the API clients record into."""
+    return _meter
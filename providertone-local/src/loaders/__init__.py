@@ -2,38 +2,177 @@
 Data loaders for various export formats.
 """
 
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
 from .base import BaseLoader
+from .records import MessageRecord, NoteRecord
 from .csv_loader import CSVLoader
 from .json_loader import JSONLoader
+from .ndjson_loader import NDJSONLoader
+from .cache import CacheLoader, ingest, is_ingested
 from .text_loader import TextLoader
+from .offset_index import IndexedLoader, build_index, supports_index
+from .compression import split_compression
+from .timestamps import DateIndex, normalize_timestamp
+from .sections import segment_note, split_sections, note_sections
 
-__all__ = ["BaseLoader", "CSVLoader", "JSONLoader", "TextLoader", "load_data"]
+__all__ = [
+    "BaseLoader",
+    "MessageRecord",
+    "NoteRecord",
+    "CSVLoader",
+    "JSONLoader",
+    "NDJSONLoader",
+    "CacheLoader",
+    "TextLoader",
+    "IndexedLoader",
+    "DateIndex",
+    "normalize_timestamp",
+    "segment_note",
+    "split_sections",
+    "note_sections",
+    "get_loader",
+    "load_data",
+    "iter_data",
+    "group_by_provider",
+    "ingest",
+    "build_index",
+]
 
 
-def load_data(path: str, data_type: str = "messages") -> list:
+def get_loader(
+    path: str,
+    data_type: str = "messages",
+    cache_dir: Optional[str] = None,
+    use_index: bool = False,
+    name_filter: Optional[str] = None
+) -> BaseLoader:
     """
-    Load data from file or directory, auto-detecting format.
+    Pick the loader for a file or directory based on its format.
 
     Args:
         path: Path to file or directory
         data_type: "messages" or "notes"
+        cache_dir: Ingestion cache to read from if this export was ingested
+        use_index: Seek via a sidecar provider offset index (CSV and JSONL only)
+        name_filter: Glob on file names for text directories; files that
+            don't match are never opened
 
     Returns:
-        List of message or note dictionaries
+        Loader instance
     """
     from pathlib import Path
 
     p = Path(path)
+    # Compound suffixes like .csv.gz resolve to the inner format
+    suffix, _ = split_compression(path)
 
-    if p.is_dir():
+    if cache_dir and is_ingested(path, data_type, cache_dir):
+        return CacheLoader(cache_dir)
+    elif use_index and supports_index(path):
+        return IndexedLoader()
+    elif p.is_dir():
         # Directory of text files
-        loader = TextLoader()
-        return loader.load(path, data_type=data_type)
-    elif p.suffix.lower() == ".csv":
-        loader = CSVLoader()
-        return loader.load(path, data_type=data_type)
-    elif p.suffix.lower() == ".json":
-        loader = JSONLoader()
-        return loader.load(path, data_type=data_type)
+        return TextLoader(name_filter=name_filter)
+    elif suffix == ".csv":
+        return CSVLoader()
+    elif suffix == ".json":
+        return JSONLoader()
+    elif suffix in (".jsonl", ".ndjson"):
+        return NDJSONLoader()
     else:
-        raise ValueError(f"Unsupported file format: {p.suffix}")
+        raise ValueError(f"Unsupported file format: {''.join(p.suffixes) or p.suffix}")
+
+
+def load_data(
+    path: str,
+    data_type: str = "messages",
+    provider_id: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    use_index: bool = False,
+    name_filter: Optional[str] = None,
+) -> list:
+    """
+    Load data from file or directory, auto-detecting format.
+
+    Args:
+        path: Path to file or directory
+        data_type: "messages" or "notes"
+        provider_id: Only return records for this provider (optional)
+        start_date: Only return records on/after this date, YYYY-MM-DD (optional)
+        end_date: Only return records on/before this date, YYYY-MM-DD (optional)
+        cache_dir: Read from the ingestion cache when this export has been ingested
+        use_index: Build/reuse a sidecar provider offset index and seek to
+            only this provider's records (CSV and JSONL, needs provider_id)
+        name_filter: Glob on file names in a text directory, e.g.
+            "*_dr-smith_*.txt"; non-matching files are skipped unopened
+
+    Returns:
+        List of message or note dictionaries
+    """
+    loader = get_loader(path, data_type=data_type, cache_dir=cache_dir, use_index=use_index,
+                        name_filter=name_filter)
+    return loader.load(
+        path,
+        data_type=data_type,
+        provider_id=provider_id,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+def iter_data(
+    path: str,
+    data_type: str = "messages",
+    provider_id: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    use_index: bool = False,
+    name_filter: Optional[str] = None,
+) -> Iterator[dict]:
+    """
+    Stream records from file or directory, auto-detecting format.
+
+    Same arguments as load_data(), but yields records one at a time so
+    callers never need the whole export in memory.
+    """
+    loader = get_loader(path, data_type=data_type, cache_dir=cache_dir, use_index=use_index,
+                        name_filter=name_filter)
+    yield from loader.iter_load(
+        path,
+        data_type=data_type,
+        provider_id=provider_id,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+def group_by_provider(
+    records: Iterable[dict],
+    provider_ids: Optional[Set[str]] = None
+) -> Dict[str, List[dict]]:
+    """
+    Group records by provider_id in a single pass.
+
+    Keys are provider IDs as strings, whatever type the source stored.
+
+    Args:
+        records: Records from load_data() or iter_data()
+        provider_ids: Only keep these providers (optional)
+
+    Returns:
+        Dictionary mapping provider_id to that provider's records
+    """
+    groups: Dict[str, List[dict]] = {}
+    for record in records:
+        value = record.get("provider_id")
+        provider_id = "" if value is None else str(value)
+        if not provider_id:
+            continue
+        if provider_ids is not None and provider_id not in provider_ids:
+            continue
+        groups.setdefault(provider_id, []).append(record)
+    return groups
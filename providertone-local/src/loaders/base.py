@@ -3,51 +3,133 @@ Base loader class.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
+
+from .records import MessageRecord, NoteRecord
+from .sections import segment_note
+from .timestamps import date_key, normalize_timestamp
 
 
 class BaseLoader(ABC):
     """Abstract base class for data loaders."""
 
     @abstractmethod
-    def load(self, path: str, data_type: str = "messages") -> List[Dict[str, Any]]:
+    def load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Load data from path.
 
         Args:
             path: Path to file or directory
             data_type: "messages" or "notes"
+            provider_id: Only return records for this provider (optional)
+            start_date: Only return records on/after this date, YYYY-MM-DD (optional)
+            end_date: Only return records on/before this date, YYYY-MM-DD (optional)
 
         Returns:
             List of dictionaries with standardized keys
         """
         pass
 
-    def validate_message(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+    def iter_load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield records one at a time.
+
+        Loaders that can stream their input override this; the default
+        simply iterates over the result of load().
+        """
+        yield from self.load(
+            path,
+            data_type=data_type,
+            provider_id=provider_id,
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+    def matches_filters(
+        self,
+        record: Dict[str, Any],
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> bool:
+        """
+        Check a validated record against provider and date filters.
+
+        Provider IDs are compared as strings, so a numeric JSON provider_id
+        matches the same filter as the CSV loader's string column.
+        """
+        if provider_id is not None:
+            value = record.get("provider_id")
+            if value is None or str(value) != str(provider_id):
+                return False
+
+        if start_date or end_date:
+            date_field = "sent_at" if data_type == "messages" else "created_at"
+            date_str = date_key(record.get(date_field))
+            if not date_str:
+                return False
+            if start_date and date_str < start_date:
+                return False
+            if end_date and date_str > end_date:
+                return False
+
+        return True
+
+    def validate_message(self, msg: Dict[str, Any]) -> MessageRecord:
         """Ensure message has required fields."""
-        return {
-            "message_id": msg.get("message_id", msg.get("id", "")),
-            "provider_id": msg.get("provider_id", ""),
-            "patient_id": msg.get("patient_id", ""),
-            "direction": msg.get("direction", "outbound"),
-            "sent_at": msg.get("sent_at", msg.get("date", "")),
-            "subject": msg.get("subject", ""),
-            "body": msg.get("body", msg.get("content", msg.get("text", ""))),
-        }
-
-    def validate_note(self, note: Dict[str, Any]) -> Dict[str, Any]:
-        """Ensure note has required fields."""
+        return MessageRecord(
+            message_id=msg.get("message_id", msg.get("id", "")),
+            provider_id=msg.get("provider_id", ""),
+            patient_id=msg.get("patient_id", ""),
+            direction=msg.get("direction", "outbound"),
+            sent_at=normalize_timestamp(msg.get("sent_at", msg.get("date", ""))),
+            subject=msg.get("subject", ""),
+            body=msg.get("body", msg.get("content", msg.get("text", ""))),
+        )
+
+    def validate_note(self, note: Dict[str, Any]) -> NoteRecord:
+        """
+        Ensure note has required fields.
+
+        Free text is segmented into sections here, once per note, and the
+        section offsets are kept on the record.
+        """
         content = note.get("content", {})
         if isinstance(content, str):
             content = {"full_text": content}
 
-        return {
-            "note_id": note.get("note_id", note.get("id", "")),
-            "provider_id": note.get("provider_id", ""),
-            "patient_id": note.get("patient_id", ""),
-            "note_type": note.get("note_type", "progress_note"),
-            "visit_type": note.get("visit_type", ""),
-            "created_at": note.get("created_at", note.get("date", "")),
-            "chief_complaint": note.get("chief_complaint", ""),
-            "content": content,
-        }
+        record = NoteRecord(
+            note_id=note.get("note_id", note.get("id", "")),
+            provider_id=note.get("provider_id", ""),
+            patient_id=note.get("patient_id", ""),
+            note_type=note.get("note_type", "progress_note"),
+            visit_type=note.get("visit_type", ""),
+            created_at=normalize_timestamp(note.get("created_at", note.get("date", ""))),
+            chief_complaint=note.get("chief_complaint", ""),
+            content=content,
+        )
+
+        if set(content) == {"full_text"}:
+            text = str(content["full_text"] or "")
+            spans = segment_note(text)
+            record.section_spans = spans
+            if not record.chief_complaint and "chief_complaint" in spans:
+                start, end = spans["chief_complaint"][0]
+                record.chief_complaint = text[start:end]
+
+        return record
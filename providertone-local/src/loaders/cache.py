@@ -0,0 +1,279 @@
+"""
+Columnar ingestion cache partitioned by provider.
+
+An export is parsed once by `ingest()` and written as Parquet files under
+`<cache_dir>/<fingerprint>/<data_type>/provider=<id>/`. Later loads read
+only the partition for the requested provider. Rows in each part file are
+sorted by date and carry that date, normalized to YYYY-MM-DD, in a
+`_date` column, so a date window is read as a slice found with
+`Series.searchsorted` without re-parsing any timestamps.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional
+from urllib.parse import quote
+
+from .base import BaseLoader
+from .timestamps import date_key
+from .watermark import TIMESTAMP_FIELDS
+
+
+CACHE_VERSION = 3
+DEFAULT_CACHE_DIR = ".providertone-cache"
+
+# Normalized date (date_key of the timestamp field) stored with every row
+DATE_COLUMN = "_date"
+
+# Bytes hashed from each end of a file when fingerprinting
+_SAMPLE_BYTES = 1 << 20
+
+
+def _require_parquet() -> None:
+    """Fail early with an install hint if no Parquet engine is available."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "The ingestion cache requires pyarrow. "
+            "Install it with: pip install 'providertone-local[cache]'"
+        )
+
+
+def fingerprint(path: str) -> str:
+    """
+    Compute a cheap fingerprint for a source file or directory.
+
+    Files hash their size, mtime and the first and last megabyte; directories
+    hash the name, size and mtime of every entry. Any edit to the export
+    therefore produces a new cache key without reading the whole file.
+    """
+    h = hashlib.sha256()
+    p = Path(path)
+
+    if p.is_dir():
+        with os.scandir(path) as entries:
+            stats = sorted((e.name, e.stat()) for e in entries if e.is_file())
+        for name, st in stats:
+            h.update(f"{name}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    else:
+        st = p.stat()
+        h.update(f"{st.st_size}\0{st.st_mtime_ns}\n".encode())
+        with open(p, "rb") as f:
+            h.update(f.read(_SAMPLE_BYTES))
+            if st.st_size > _SAMPLE_BYTES:
+                f.seek(max(_SAMPLE_BYTES, st.st_size - _SAMPLE_BYTES))
+                h.update(f.read())
+
+    return h.hexdigest()[:32]
+
+
+def cache_root(path: str, data_type: str, cache_dir: str = DEFAULT_CACHE_DIR) -> Path:
+    """Directory holding the cached partitions for one export and data type."""
+    return Path(cache_dir) / fingerprint(path) / data_type
+
+
+def is_ingested(path: str, data_type: str, cache_dir: str = DEFAULT_CACHE_DIR) -> bool:
+    """Check whether an up-to-date cache exists for this export."""
+    return _read_manifest(cache_root(path, data_type, cache_dir)) is not None
+
+
+def _read_manifest(root: Path) -> Optional[Dict[str, Any]]:
+    """Manifest of a cache written by this CACHE_VERSION, or None."""
+    try:
+        with open(root / "manifest.json", "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == CACHE_VERSION else None
+
+
+def _partition_name(provider_id: str) -> str:
+    """Filesystem-safe partition directory name for a provider."""
+    return "provider=" + quote(str(provider_id), safe="")
+
+
+def ingest(
+    path: str,
+    data_type: str = "messages",
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    flush_rows: int = 200_000,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Parse an export once and write it to the provider-partitioned cache.
+
+    Records are streamed from the source and buffered per provider; buffers
+    are flushed to a new Parquet part whenever flush_rows records are held,
+    so memory stays bounded regardless of export size.
+
+    Args:
+        path: Source file or directory (any format load_data accepts)
+        data_type: "messages" or "notes"
+        cache_dir: Root directory for the cache
+        flush_rows: Records buffered in memory before writing parts
+        force: Rebuild even if a cache for this fingerprint exists
+
+    Returns:
+        Cache manifest
+    """
+    from . import iter_data
+    import pandas as pd
+
+    _require_parquet()
+
+    root = cache_root(path, data_type, cache_dir)
+    existing = _read_manifest(root)
+    if existing is not None and not force:
+        return existing
+
+    # Build into a scratch directory and swap it in at the end
+    tmp_root = root.with_name(root.name + ".tmp")
+    if tmp_root.exists():
+        shutil.rmtree(tmp_root)
+    tmp_root.mkdir(parents=True)
+
+    buffers: Dict[str, List[Dict[str, Any]]] = {}
+    counts: Dict[str, int] = {}
+    parts: Dict[str, int] = {}
+    buffered = 0
+    ts_field = TIMESTAMP_FIELDS[data_type]
+
+    def flush() -> None:
+        for provider_id, rows in buffers.items():
+            if not rows:
+                continue
+            rows.sort(key=lambda row: row[DATE_COLUMN])
+            part_dir = tmp_root / _partition_name(provider_id)
+            part_dir.mkdir(exist_ok=True)
+            part = parts.get(provider_id, 0)
+            pd.DataFrame(rows).to_parquet(part_dir / f"part-{part:05d}.parquet", index=False)
+            parts[provider_id] = part + 1
+        buffers.clear()
+
+    for record in iter_data(path, data_type=data_type):
+        # Store scalars as strings so mixed-type source columns stay writable
+        row = {
+            key: json.dumps(value) if key == "content" else ("" if value is None else str(value))
+            for key, value in dict(record).items()
+        }
+        row[DATE_COLUMN] = date_key(record.get(ts_field))
+        provider_id = str(row.get("provider_id", ""))
+        buffers.setdefault(provider_id, []).append(row)
+        counts[provider_id] = counts.get(provider_id, 0) + 1
+        buffered += 1
+        if buffered >= flush_rows:
+            flush()
+            buffered = 0
+    flush()
+
+    manifest = {
+        "version": CACHE_VERSION,
+        "source": str(Path(path).resolve()),
+        "fingerprint": root.parent.name,
+        "data_type": data_type,
+        "created_at": datetime.now().isoformat(),
+        "sorted_by": DATE_COLUMN,
+        "providers": {
+            provider_id: {"partition": _partition_name(provider_id), "count": count}
+            for provider_id, count in sorted(counts.items())
+        },
+    }
+    with open(tmp_root / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    if root.exists():
+        shutil.rmtree(root)
+    tmp_root.rename(root)
+
+    return manifest
+
+
+class CacheLoader(BaseLoader):
+    """Load records from the provider-partitioned ingestion cache."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        Initialize cache loader.
+
+        Args:
+            cache_dir: Root directory passed to ingest()
+        """
+        self.cache_dir = cache_dir
+
+    def load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Load cached records for the export at path.
+
+        Only the partition for provider_id is read when one is given.
+
+        Raises:
+            ValueError: If the export has not been ingested
+        """
+        return list(self.iter_load(
+            path,
+            data_type=data_type,
+            provider_id=provider_id,
+            start_date=start_date,
+            end_date=end_date,
+        ))
+
+    def iter_load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield cached records part file by part file."""
+        import pandas as pd
+
+        _require_parquet()
+
+        root = cache_root(path, data_type, self.cache_dir)
+        manifest = _read_manifest(root)
+        if manifest is None:
+            raise ValueError(f"No ingestion cache for {path}; run `providertone ingest` first")
+
+        if provider_id is not None:
+            entry = manifest["providers"].get(provider_id)
+            partitions = [entry["partition"]] if entry else []
+        else:
+            partitions = [p["partition"] for p in manifest["providers"].values()]
+
+        validate = self.validate_message if data_type == "messages" else self.validate_note
+
+        for partition in partitions:
+            for part in sorted((root / partition).glob("part-*.parquet")):
+                df = pd.read_parquet(part)
+                if start_date or end_date:
+                    df = _date_slice(df, start_date, end_date)
+                for row in df.drop(columns=DATE_COLUMN).to_dict("records"):
+                    if data_type != "messages":
+                        row["content"] = json.loads(row["content"])
+                    record = validate(row)
+                    if self.matches_filters(record, data_type, None, start_date, end_date):
+                        yield record
+
+
+def _date_slice(df, start_date: Optional[str], end_date: Optional[str]):
+    """Rows of a date-sorted part inside [start_date, end_date], found by bisection."""
+    dates = df[DATE_COLUMN]
+    # Undated rows sort first, under ""
+    lo = int(dates.searchsorted("", side="right"))
+    if start_date:
+        lo = max(lo, int(dates.searchsorted(start_date, side="left")))
+    hi = int(dates.searchsorted(end_date, side="right")) if end_date else len(dates)
+    return df.iloc[lo:hi]
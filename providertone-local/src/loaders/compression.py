@@ -0,0 +1,81 @@
+"""
+Transparent streaming decompression for compressed exports.
+
+Recognizes compound suffixes such as `.csv.gz`, `.jsonl.zst` and
+`.json.bz2`, and opens them as decompressing streams so the parsers read
+straight from the compressed file without an intermediate copy on disk.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+from pathlib import Path
+from typing import BinaryIO, Optional, TextIO, Tuple
+
+
+COMPRESSION_SUFFIXES = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+
+
+def split_compression(path: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a path's suffix into the data format and the compression codec.
+
+    Args:
+        path: Path to a file, e.g. "export.csv.gz"
+
+    Returns:
+        (format suffix, codec) such as (".csv", "gzip"), or (".csv", None)
+        for an uncompressed file
+    """
+    p = Path(path)
+    suffix = p.suffix.lower()
+    codec = COMPRESSION_SUFFIXES.get(suffix)
+    if codec is None:
+        return suffix, None
+    return Path(p.stem).suffix.lower(), codec
+
+
+def is_compressed(path: str) -> bool:
+    """Check whether a path has a recognized compression suffix."""
+    return split_compression(path)[1] is not None
+
+
+def open_binary(path: str) -> BinaryIO:
+    """Open a file for binary reading, decompressing on the fly if needed."""
+    _, codec = split_compression(path)
+
+    if codec is None:
+        return open(path, "rb")
+    if codec == "gzip":
+        return gzip.open(path, "rb")
+    if codec == "bz2":
+        return bz2.open(path, "rb")
+    if codec == "xz":
+        return lzma.open(path, "rb")
+
+    # zstd is not in the standard library before Python 3.14
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "Reading .zst exports requires zstandard. "
+            "Install it with: pip install 'providertone-local[compression]'"
+        )
+    raw = open(path, "rb")
+    # The zstd reader has no readline(); buffer it like the stdlib codecs
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+
+
+def open_text(path: str, encoding: Optional[str] = None) -> TextIO:
+    """Open a file for text reading, decompressing on the fly if needed."""
+    if not is_compressed(path):
+        return open(path, "r", encoding=encoding)
+    return io.TextIOWrapper(open_binary(path), encoding=encoding)
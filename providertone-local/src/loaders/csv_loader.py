@@ -2,17 +2,53 @@
 CSV data loader.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 from pathlib import Path
 import pandas as pd
 
 from .base import BaseLoader
+from .compression import open_binary
+from .timestamps import normalize_series
+
+
+# Columns each record type actually uses; everything else is never materialized
+MESSAGE_COLUMNS = {
+    "message_id", "id", "provider_id", "patient_id", "direction",
+    "sent_at", "date", "subject", "body", "content", "text",
+}
+
+NOTE_COLUMNS = {
+    "note_id", "id", "provider_id", "patient_id", "note_type", "visit_type",
+    "created_at", "date", "chief_complaint", "hpi", "physical_exam", "ros",
+    "assessment", "plan", "content", "full_text", "note_text",
+}
+
+
+def normalize_column(name: str) -> str:
+    """Normalize a CSV header to the snake_case keys used by the loaders."""
+    return str(name).lower().strip().replace(" ", "_")
 
 
 class CSVLoader(BaseLoader):
     """Load data from CSV files."""
 
-    def load(self, path: str, data_type: str = "messages") -> List[Dict[str, Any]]:
+    def __init__(self, chunksize: int = 100_000):
+        """
+        Initialize CSV loader.
+
+        Args:
+            chunksize: Rows parsed per chunk when streaming
+        """
+        self.chunksize = chunksize
+
+    def load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Load messages or notes from CSV.
 
@@ -23,17 +59,89 @@ class CSVLoader(BaseLoader):
             note_id, provider_id, patient_id, note_type, visit_type, created_at,
             chief_complaint, hpi, physical_exam, assessment, plan
         """
-        df = pd.read_csv(path)
+        return list(self.iter_load(
+            path,
+            data_type=data_type,
+            provider_id=provider_id,
+            start_date=start_date,
+            end_date=end_date,
+        ))
+
+    def iter_load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream messages or notes from CSV in fixed-size chunks.
+
+        Only the columns used by the record type are parsed, and provider
+        and date filters are applied to each chunk before any rows are
+        converted to dictionaries, so memory stays proportional to the
+        chunk size rather than the file size.
+        """
+        wanted = MESSAGE_COLUMNS if data_type == "messages" else NOTE_COLUMNS
+
+        # Read everything as strings: IDs must compare equal to CLI arguments,
+        # and empty cells should be "" rather than NaN. Compressed exports
+        # are decompressed as a stream straight into the parser.
+        with open_binary(path) as f:
+            reader = pd.read_csv(
+                f,
+                usecols=lambda c: normalize_column(c) in wanted,
+                dtype=str,
+                keep_default_na=False,
+                chunksize=self.chunksize,
+            )
+
+            for chunk in reader:
+                chunk.columns = [normalize_column(c) for c in chunk.columns]
+                for col in ("sent_at", "created_at", "date"):
+                    if col in chunk.columns:
+                        chunk[col] = normalize_series(chunk[col])
+                chunk = self._filter_chunk(chunk, data_type, provider_id, start_date, end_date)
+                if chunk.empty:
+                    continue
+
+                for record in chunk.to_dict("records"):
+                    if data_type == "messages":
+                        yield self.validate_message(record)
+                    else:
+                        yield self._parse_note_row(record)
+
+    def _filter_chunk(
+        self,
+        chunk: pd.DataFrame,
+        data_type: str,
+        provider_id: Optional[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+    ) -> pd.DataFrame:
+        """Apply provider and date filters to a chunk with vectorized comparisons."""
+        if provider_id is not None:
+            if "provider_id" not in chunk.columns:
+                return chunk.iloc[0:0]
+            chunk = chunk[chunk["provider_id"] == provider_id]
 
-        # Normalize column names
-        df.columns = [c.lower().strip().replace(" ", "_") for c in df.columns]
+        if start_date or end_date:
+            primary = "sent_at" if data_type == "messages" else "created_at"
+            date_col = primary if primary in chunk.columns else "date"
+            if date_col not in chunk.columns:
+                return chunk.iloc[0:0]
 
-        records = df.to_dict("records")
+            # Timestamps are already normalized; anything else is undated
+            dates = chunk[date_col].str[:10]
+            mask = dates.str.match(r"\d{4}-\d{2}-\d{2}$")
+            if start_date:
+                mask &= dates >= start_date
+            if end_date:
+                mask &= dates <= end_date
+            chunk = chunk[mask]
 
-        if data_type == "messages":
-            return [self.validate_message(r) for r in records]
-        else:
-            return [self._parse_note_row(r) for r in records]
+        return chunk
 
     def _parse_note_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """Parse a CSV row into note format."""
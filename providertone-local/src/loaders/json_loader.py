@@ -3,16 +3,146 @@ JSON data loader.
 """
 
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, TextIO
 from pathlib import Path
 
 from .base import BaseLoader
+from .compression import open_text
+
+
+class _JSONStream:
+    """
+    Minimal pull parser for walking large JSON documents.
+
+    Containers are entered one token at a time and their elements are
+    decoded individually with json.JSONDecoder.raw_decode, so only the
+    current element (plus a read buffer) is ever held in memory.
+    """
+
+    WHITESPACE = " \t\r\n"
+
+    # Characters that can continue a JSON number
+    NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+    def __init__(self, f: TextIO, chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer, discarding consumed text."""
+        if self.eof:
+            return False
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in self.WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume the next non-whitespace character, which must be char."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON stream, found '{found or 'EOF'}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode and consume the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut by the buffer edge decodes as a shorter number
+            # ("12" of "12.5", "1.5" of "1.5e3"); read on and decode again
+            if self._may_continue(obj, end) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def _may_continue(self, obj: Any, end: int) -> bool:
+        """Check whether a decoded value could extend past the buffer edge."""
+        if end == len(self.buf):
+            return True
+        if isinstance(obj, bool) or not isinstance(obj, (int, float)):
+            return False
+        return all(char in self.NUMBER_CHARS for char in self.buf[end:])
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yield the elements of the array starting at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, found '{char or 'EOF'}'")
+
+    def iter_keys(self) -> Iterator[str]:
+        """
+        Yield the keys of the object starting at the current position.
+
+        After each key is yielded the caller must consume its value, either
+        with value()/iter_array() or with skip().
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or '}}' in JSON object, found '{char or 'EOF'}'")
+
+    def skip(self) -> None:
+        """Consume the next value, streaming through arrays element by element."""
+        if self.peek() == "[":
+            for _ in self.iter_array():
+                pass
+        else:
+            self.value()
 
 
 class JSONLoader(BaseLoader):
     """Load data from JSON files."""
 
-    def load(self, path: str, data_type: str = "messages") -> List[Dict[str, Any]]:
+    def load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Load messages or notes from JSON.
 
@@ -22,28 +152,86 @@ class JSONLoader(BaseLoader):
         }
         or just a list: [...]
         """
-        with open(path, "r") as f:
-            data = json.load(f)
-
-        # Handle different JSON structures
-        if isinstance(data, list):
-            records = data
-        elif isinstance(data, dict):
-            if data_type == "messages" and "messages" in data:
-                records = data["messages"]
-            elif data_type == "notes" and "notes" in data:
-                records = data["notes"]
-            elif "data" in data:
-                records = data["data"]
-            elif "records" in data:
-                records = data["records"]
-            else:
-                # Assume the dict values are the records
-                records = list(data.values())[0] if data else []
-        else:
-            raise ValueError(f"Unexpected JSON structure in {path}")
+        return list(self.iter_load(
+            path,
+            data_type=data_type,
+            provider_id=provider_id,
+            start_date=start_date,
+            end_date=end_date,
+        ))
 
-        if data_type == "messages":
-            return [self.validate_message(r) for r in records]
-        else:
-            return [self.validate_note(r) for r in records]
+    def iter_load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream messages or notes from JSON one record at a time.
+
+        Accepts the same envelope shapes as load(). Records are decoded
+        individually, so peak memory depends on the largest record rather
+        than on the size of the file.
+        """
+        validate = self.validate_message if data_type == "messages" else self.validate_note
+
+        for raw in self._iter_records(path, data_type):
+            record = validate(raw)
+            if self.matches_filters(record, data_type, provider_id, start_date, end_date):
+                yield record
+
+    def _iter_records(self, path: str, data_type: str) -> Iterator[Dict[str, Any]]:
+        """Yield raw records from whichever envelope the document uses."""
+        with open_text(path) as f:
+            stream = _JSONStream(f)
+            first = stream.peek()
+
+            if first == "[":
+                yield from stream.iter_array()
+                return
+            if first != "{":
+                raise ValueError(f"Unexpected JSON structure in {path}")
+
+            # Fast path: the key for this data type always wins, so stream it
+            # as soon as it is seen. Otherwise remember which key to use.
+            preferred = data_type if data_type in ("messages", "notes") else None
+            chosen = None
+            for key in stream.iter_keys():
+                if key == preferred:
+                    yield from self._iter_value(stream, path)
+                    return
+                chosen = self._rank_key(key, chosen)
+                stream.skip()
+
+        if chosen is None:
+            return
+
+        # Second pass: stream the envelope key picked during the scan
+        with open_text(path) as f:
+            stream = _JSONStream(f)
+            for key in stream.iter_keys():
+                if key == chosen:
+                    yield from self._iter_value(stream, path)
+                    return
+                stream.skip()
+
+    @staticmethod
+    def _rank_key(key: str, current: Optional[str]) -> str:
+        """Pick between envelope keys: "data", then "records", then the first key."""
+        if current is None:
+            return key
+        for candidate in ("data", "records"):
+            if current == candidate:
+                return current
+            if key == candidate:
+                return key
+        return current
+
+    @staticmethod
+    def _iter_value(stream: _JSONStream, path: str) -> Iterator[Dict[str, Any]]:
+        """Yield records from the envelope value at the stream's position."""
+        if stream.peek() != "[":
+            raise ValueError(f"Unexpected JSON structure in {path}")
+        yield from stream.iter_array()
@@ -0,0 +1,189 @@
+"""
+Newline-delimited JSON (JSON Lines) data loader.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+from .base import BaseLoader
+from .compression import is_compressed, open_binary
+
+
+class NDJSONLoader(BaseLoader):
+    """Load data from .jsonl / .ndjson files, one record per line."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        min_parallel_bytes: int = 8 * 1024 * 1024
+    ):
+        """
+        Initialize NDJSON loader.
+
+        Args:
+            workers: Worker processes for parsing (defaults to CPU count)
+            min_parallel_bytes: Files smaller than this are parsed in-process
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_bytes = min_parallel_bytes
+
+    def load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Load messages or notes from a JSON Lines file.
+
+        Each non-blank line must be a single JSON object using the same
+        field names as the JSON loader. Large files are split into byte
+        ranges on line boundaries and parsed on a process pool.
+        """
+        return list(self.iter_load(
+            path,
+            data_type=data_type,
+            provider_id=provider_id,
+            start_date=start_date,
+            end_date=end_date,
+        ))
+
+    def iter_load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield records in file order.
+
+        Small files (or workers=1) are read line by line in-process. Larger
+        files are parsed range by range on the pool; each range's records
+        are yielded as soon as that range and all earlier ones are done.
+        """
+        filters = (provider_id, start_date, end_date)
+
+        # Compressed streams can't be split into byte ranges; decode serially
+        if is_compressed(path):
+            yield from _iter_stream(path, data_type, filters)
+            return
+
+        size = os.path.getsize(path)
+        if self.workers <= 1 or size < self.min_parallel_bytes:
+            yield from _iter_range(path, 0, size, data_type, filters)
+            return
+
+        # Several ranges per worker keeps the pool busy when record density varies
+        ranges = _split_ranges(path, size, self.workers * 4)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            chunks = pool.map(
+                _parse_range,
+                [path] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges],
+                [data_type] * len(ranges),
+                [filters] * len(ranges),
+            )
+            for records in chunks:
+                yield from records
+
+
+def _split_ranges(path: str, size: int, parts: int) -> List[Tuple[int, int]]:
+    """Split a file into byte ranges that each start at the beginning of a line."""
+    boundaries = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            target = size * i // parts
+            if target <= boundaries[-1]:
+                continue
+            # Back up one byte so a target that already sits on a line start is kept
+            f.seek(target - 1)
+            f.readline()
+            offset = f.tell()
+            if boundaries[-1] < offset < size:
+                boundaries.append(offset)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _parse_range(
+    path: str,
+    start: int,
+    end: int,
+    data_type: str,
+    filters: Tuple[Optional[str], Optional[str], Optional[str]],
+) -> List[Dict[str, Any]]:
+    """
+    Parse the lines in [start, end) into validated, filtered records.
+
+    Runs inside pool workers, so it is a module-level function and only
+    records that pass the filters are sent back to the parent process.
+    """
+    return list(_iter_range(path, start, end, data_type, filters))
+
+
+def _iter_range(
+    path: str,
+    start: int,
+    end: int,
+    data_type: str,
+    filters: Tuple[Optional[str], Optional[str], Optional[str]],
+) -> Iterator[Dict[str, Any]]:
+    """Yield validated, filtered records for the lines in [start, end)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+
+        def lines() -> Iterator[bytes]:
+            offset = start
+            while offset < end:
+                line = f.readline()
+                if not line:
+                    return
+                offset += len(line)
+                yield line
+
+        yield from _iter_lines(lines(), path, start, data_type, filters)
+
+
+def _iter_stream(
+    path: str,
+    data_type: str,
+    filters: Tuple[Optional[str], Optional[str], Optional[str]],
+) -> Iterator[Dict[str, Any]]:
+    """Yield validated, filtered records from a (possibly compressed) stream."""
+    with open_binary(path) as f:
+        yield from _iter_lines(f, path, 0, data_type, filters)
+
+
+def _iter_lines(
+    lines: Iterator[bytes],
+    path: str,
+    offset: int,
+    data_type: str,
+    filters: Tuple[Optional[str], Optional[str], Optional[str]],
+) -> Iterator[Dict[str, Any]]:
+    """Parse JSON lines into validated records, applying the filters."""
+    loader = NDJSONLoader(workers=1)
+    validate = loader.validate_message if data_type == "messages" else loader.validate_note
+    provider_id, start_date, end_date = filters
+
+    for line in lines:
+        line_offset = offset
+        offset += len(line)
+
+        if not line.strip():
+            continue
+        try:
+            raw = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON at byte {line_offset} in {path}: {e}")
+
+        record = validate(raw)
+        if loader.matches_filters(record, data_type, provider_id, start_date, end_date):
+            yield record
@@ -0,0 +1,319 @@
+"""
+Byte-offset provider index for random access into raw exports.
+
+For CSV and JSON Lines files, a sidecar `<file>.ptidx.json` holds a small
+directory mapping each provider_id to a slice of `<file>.ptidx.bin`, a
+flat array of (offset, length) runs of adjacent records. Loading one
+provider reads the directory, then only that provider's slice of runs,
+and seeks straight to those bytes in the export; nothing else is parsed.
+"""
+
+import csv
+import io
+import json
+import struct
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+from .base import BaseLoader
+from .cache import fingerprint
+from .csv_loader import CSVLoader, normalize_column, MESSAGE_COLUMNS, NOTE_COLUMNS
+
+
+INDEX_VERSION = 2
+INDEX_SUFFIX = ".ptidx.json"
+RUNS_SUFFIX = ".ptidx.bin"
+
+# One run: byte offset and length, little-endian unsigned 64-bit
+RUN = struct.Struct("<QQ")
+
+# Adjacent records are merged into one read up to this size
+MAX_RUN_BYTES = 8 * 1024 * 1024
+
+CSV_SUFFIXES = (".csv",)
+NDJSON_SUFFIXES = (".jsonl", ".ndjson")
+
+
+def supports_index(path: str) -> bool:
+    """Check whether a file format can be offset-indexed."""
+    suffix = Path(path).suffix.lower()
+    return Path(path).is_file() and suffix in CSV_SUFFIXES + NDJSON_SUFFIXES
+
+
+def index_path(path: str) -> Path:
+    """Location of the sidecar index directory for a source file."""
+    return Path(str(path) + INDEX_SUFFIX)
+
+
+def runs_path(path: str) -> Path:
+    """Location of the sidecar run offsets for a source file."""
+    return Path(str(path) + RUNS_SUFFIX)
+
+
+def _iter_csv_records(f) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (offset, raw bytes) for each physical CSV record.
+
+    Lines are joined while a quoted field is still open, so records with
+    embedded newlines are kept whole. Doubled quotes keep the parity even.
+    """
+    offset = f.tell()
+    pending = b""
+    start = offset
+    for line in iter(f.readline, b""):
+        if not pending:
+            start = offset
+        pending += line
+        offset += len(line)
+        if pending.count(b'"') % 2 == 0:
+            yield start, pending
+            pending = b""
+    if pending:
+        yield start, pending
+
+
+def _parse_csv_row(raw: bytes) -> List[str]:
+    """Parse a single raw CSV record into its fields."""
+    rows = list(csv.reader(io.StringIO(raw.decode("utf-8"))))
+    return rows[0] if rows else []
+
+
+def _add_span(runs: List[List[int]], offset: int, length: int) -> None:
+    """Append a record's byte span, extending the last run when they touch."""
+    if runs:
+        last = runs[-1]
+        if last[0] + last[1] == offset and last[1] + length <= MAX_RUN_BYTES:
+            last[1] += length
+            return
+    runs.append([offset, length])
+
+
+def build_index(path: str) -> Dict[str, Any]:
+    """
+    Scan a CSV or JSON Lines file and write its provider offset index.
+
+    If the sidecars can't be written (read-only directory, full disk), the
+    index is still returned and used from memory for this run.
+
+    Args:
+        path: Source file
+
+    Returns:
+        The index directory, with every provider's runs under "runs"
+    """
+    suffix = Path(path).suffix.lower()
+    providers: Dict[str, List[List[int]]] = {}
+    header: Optional[List[str]] = None
+
+    with open(path, "rb") as f:
+        if suffix in CSV_SUFFIXES:
+            records = _iter_csv_records(f)
+            first = next(records, None)
+            if first is None:
+                header = []
+            else:
+                header = next(csv.reader(io.StringIO(first[1].decode("utf-8-sig"))), [])
+            columns = [normalize_column(c) for c in header]
+            provider_col = columns.index("provider_id") if "provider_id" in columns else None
+
+            for offset, raw in records:
+                if not raw.strip():
+                    continue
+                fields = _parse_csv_row(raw)
+                if provider_col is None or provider_col >= len(fields):
+                    provider_id = ""
+                else:
+                    provider_id = fields[provider_col]
+                _add_span(providers.setdefault(provider_id, []), offset, len(raw))
+
+        elif suffix in NDJSON_SUFFIXES:
+            offset = 0
+            for line in iter(f.readline, b""):
+                if line.strip():
+                    provider_id = str(json.loads(line).get("provider_id", ""))
+                    _add_span(providers.setdefault(provider_id, []), offset, len(line))
+                offset += len(line)
+
+        else:
+            raise ValueError(f"Cannot index file format: {suffix}")
+
+    directory: Dict[str, List[int]] = {}
+    position = 0
+    for provider_id, runs in providers.items():
+        directory[provider_id] = [position, len(runs)]
+        position += len(runs)
+
+    index = {
+        "version": INDEX_VERSION,
+        "fingerprint": fingerprint(path),
+        "format": "csv" if suffix in CSV_SUFFIXES else "ndjson",
+        "header": header,
+        "runs_total": position,
+        "providers": directory,
+    }
+
+    try:
+        # Runs first: the directory is only written once its runs are there
+        with open(runs_path(path), "wb") as f:
+            for runs in providers.values():
+                f.write(b"".join(RUN.pack(offset, length) for offset, length in runs))
+        with open(index_path(path), "w") as f:
+            json.dump(index, f, separators=(",", ":"))
+    except OSError:
+        pass
+
+    index["runs"] = providers
+    return index
+
+
+def load_index(path: str, rebuild: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Load the sidecar index directory for a file, rebuilding it if missing or stale.
+
+    Args:
+        path: Source file
+        rebuild: Build a fresh index when none matches the file
+
+    Returns:
+        Index directory, or None if there is none and rebuild is False
+    """
+    sidecar = index_path(path)
+    runs_file = runs_path(path)
+    try:
+        with open(sidecar, "r") as f:
+            index = json.load(f)
+        runs_size = runs_file.stat().st_size
+    except (OSError, ValueError):
+        index = None
+    if (
+        index is not None
+        and index.get("version") == INDEX_VERSION
+        and index.get("fingerprint") == fingerprint(path)
+        and runs_size == index.get("runs_total", -1) * RUN.size
+    ):
+        return index
+
+    return build_index(path) if rebuild else None
+
+
+def provider_runs(path: str, index: Dict[str, Any], provider_id: str) -> List[Tuple[int, int]]:
+    """
+    Byte runs holding one provider's records.
+
+    Args:
+        path: Source file
+        index: Index from load_index()
+        provider_id: Provider to look up
+
+    Returns:
+        (offset, length) pairs in file order
+    """
+    if "runs" in index:
+        return [tuple(run) for run in index["runs"].get(provider_id, [])]
+
+    entry = index["providers"].get(provider_id)
+    if not entry:
+        return []
+    start, count = entry
+    with open(runs_path(path), "rb") as f:
+        f.seek(start * RUN.size)
+        data = f.read(count * RUN.size)
+    return list(RUN.iter_unpack(data))
+
+
+class IndexedLoader(BaseLoader):
+    """Load one provider's records by seeking through a sidecar offset index."""
+
+    def load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Load records for provider_id from a CSV or JSON Lines file.
+
+        The index is built on first use and reused while the file is
+        unchanged. Without a provider_id the whole file has to be read, so
+        the regular loader for the format is used instead.
+        """
+        return list(self.iter_load(
+            path,
+            data_type=data_type,
+            provider_id=provider_id,
+            start_date=start_date,
+            end_date=end_date,
+        ))
+
+    def iter_load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield records for provider_id, reading only their byte ranges."""
+        if provider_id is None:
+            from . import get_loader
+            yield from get_loader(path, data_type=data_type).iter_load(
+                path, data_type=data_type, start_date=start_date, end_date=end_date
+            )
+            return
+
+        index = load_index(path)
+        runs = provider_runs(path, index, provider_id)
+
+        if index["format"] == "csv":
+            parse = self._csv_parser(index["header"], data_type)
+            split = _split_csv_run
+        else:
+            validate = self.validate_message if data_type == "messages" else self.validate_note
+
+            def parse(raw: bytes) -> Dict[str, Any]:
+                return validate(json.loads(raw))
+
+            split = _split_ndjson_run
+
+        with open(path, "rb") as f:
+            for offset, length in runs:
+                f.seek(offset)
+                for raw in split(f.read(length)):
+                    record = parse(raw)
+                    if self.matches_filters(record, data_type, provider_id, start_date, end_date):
+                        yield record
+
+    def _csv_parser(self, header: List[str], data_type: str):
+        """Build a function turning raw CSV bytes into a record, like CSVLoader does."""
+        csv_loader = CSVLoader()
+        wanted = MESSAGE_COLUMNS if data_type == "messages" else NOTE_COLUMNS
+        columns = [
+            (i, normalize_column(name))
+            for i, name in enumerate(header)
+            if normalize_column(name) in wanted
+        ]
+
+        def parse(raw: bytes) -> Dict[str, Any]:
+            fields = _parse_csv_row(raw)
+            row = {name: fields[i] if i < len(fields) else "" for i, name in columns}
+            if data_type == "messages":
+                return csv_loader.validate_message(row)
+            return csv_loader._parse_note_row(row)
+
+        return parse
+
+
+def _split_csv_run(chunk: bytes) -> Iterator[bytes]:
+    """Split a run of adjacent CSV records back into single records."""
+    for _, raw in _iter_csv_records(io.BytesIO(chunk)):
+        if raw.strip():
+            yield raw
+
+
+def _split_ndjson_run(chunk: bytes) -> Iterator[bytes]:
+    """Split a run of adjacent JSON Lines records back into single lines."""
+    for line in chunk.split(b"\n"):
+        if line.strip():
+            yield line
@@ -0,0 +1,126 @@
+"""
+Compact record types for loaded messages and notes.
+
+Records use __slots__ instead of a per-instance dict and intern the
+low-cardinality string fields, which cuts per-record memory several
+times on large corpora. They implement the read-only Mapping protocol,
+so existing code using .get(), [], `in`, dict(record) or **record keeps
+working unchanged.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+
+def _intern(value: Any) -> Any:
+    """Intern strings so repeated values share one object."""
+    return sys.intern(value) if type(value) is str else value
+
+
+class Record(Mapping):
+    """Base class for slot-based records with dict-style access."""
+
+    __slots__ = ()
+
+    # Overridden by subclasses: field names in output order, and as a set
+    FIELDS = ()
+    _FIELD_SET = frozenset()
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELD_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self._FIELD_SET:
+            raise KeyError(f"{type(self).__name__} has no field '{key}'")
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._FIELD_SET
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._FIELD_SET:
+            return getattr(self, key)
+        return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a plain dict copy of the record."""
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class MessageRecord(Record):
+    """A single portal message."""
+
+    FIELDS = (
+        "message_id", "provider_id", "patient_id", "direction",
+        "sent_at", "subject", "body",
+    )
+    _FIELD_SET = frozenset(FIELDS)
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        message_id: Any = "",
+        provider_id: Any = "",
+        patient_id: Any = "",
+        direction: Any = "outbound",
+        sent_at: Any = "",
+        subject: Any = "",
+        body: Any = "",
+    ):
+        self.message_id = message_id
+        self.provider_id = _intern(provider_id)
+        self.patient_id = _intern(patient_id)
+        self.direction = _intern(direction)
+        self.sent_at = sent_at
+        self.subject = subject
+        self.body = body
+
+
+class NoteRecord(Record):
+    """
+    A single clinical note; content holds the section texts.
+
+    Free-text notes also carry section_spans, the section offsets into
+    content["full_text"] found at load time. It is not one of FIELDS, so
+    it never appears in dict(record) or the ingestion cache.
+    """
+
+    FIELDS = (
+        "note_id", "provider_id", "patient_id", "note_type", "visit_type",
+        "created_at", "chief_complaint", "content",
+    )
+    _FIELD_SET = frozenset(FIELDS)
+    __slots__ = FIELDS + ("section_spans",)
+
+    def __init__(
+        self,
+        note_id: Any = "",
+        provider_id: Any = "",
+        patient_id: Any = "",
+        note_type: Any = "progress_note",
+        visit_type: Any = "",
+        created_at: Any = "",
+        chief_complaint: Any = "",
+        content: Any = None,
+    ):
+        self.note_id = note_id
+        self.provider_id = _intern(provider_id)
+        self.patient_id = _intern(patient_id)
+        self.note_type = _intern(note_type)
+        self.visit_type = _intern(visit_type)
+        self.created_at = created_at
+        self.chief_complaint = chief_complaint
+        self.content = content if content is not None else {}
+        self.section_spans = None
@@ -0,0 +1,189 @@
+"""
+Section segmentation for free-text notes.
+
+Notes from text files, or CSVs without per-section columns, arrive as one
+{"full_text": ...} blob. segment_note() finds the section headers in a
+single scan with one compiled pattern and returns the character span of
+each section, so the HPI, ROS, exam, assessment and plan can be read out
+of the blob without copying it.
+"""
+
+import re
+from typing import Dict, List, Any, Optional, Tuple
+
+
+# Header spellings per section, longest first within each. Text under a
+# header in "other" (medications, vitals, ...) ends the previous section
+# but is not kept.
+SECTION_HEADERS: Dict[str, List[str]] = {
+    "chief_complaint": ["chief complaint", "reason for visit", "cc"],
+    "hpi": ["history of present illness", "history of presenting illness", "interval history",
+            "subjective", "hpi"],
+    "ros": ["review of systems", "ros"],
+    "physical_exam": ["physical examination", "physical exam", "examination", "objective",
+                      "exam", "pe"],
+    "assessment": ["assessment and plan", "assessment & plan", "assessment/plan", "assessment",
+                   "impression", "diagnoses", "diagnosis", "a/p", "a&p"],
+    "plan": ["recommendations", "plan"],
+    "other": ["past medical history", "past surgical history", "family history",
+              "social history", "medications", "allergies", "vital signs", "vitals", "labs",
+              "results", "pmh", "psh", "fhx", "shx", "meds"],
+}
+
+# SOAP single-letter headers, only recognized with a colon ("S:", "A:")
+_SOAP_LETTERS = {"hpi": "s", "physical_exam": "o", "assessment": "a", "plan": "p"}
+
+# Sections kept in the output, in note order
+SECTIONS = ("chief_complaint", "hpi", "ros", "physical_exam", "assessment", "plan")
+
+
+# Section for each header spelling, after lowercasing and collapsing spaces
+_SECTION_FOR: Dict[str, str] = {
+    name: section for section, names in SECTION_HEADERS.items() for name in names
+}
+_SECTION_FOR.update({letter: section for section, letter in _SOAP_LETTERS.items()})
+
+
+def _trie(words) -> str:
+    """
+    Case-insensitive regex alternation of words following their shared prefixes.
+
+    Letters become [Xx] classes instead of using re.IGNORECASE, which
+    roughly halves the cost of the scan.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [_char(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+def _char(ch: str) -> str:
+    """Pattern for one header character, matching either case."""
+    if ch == " ":
+        return r"\s+"
+    if ch.isalpha():
+        return f"[{ch.upper()}{ch.lower()}]"
+    return re.escape(ch)
+
+
+def _header_pattern() -> "re.Pattern":
+    """
+    Compile all headers into one line-anchored pattern.
+
+    The spellings share a trie, so each line start is checked in one walk
+    rather than against every spelling in turn; the matched spelling is
+    mapped back to its section afterwards.
+    """
+    names = _trie(_SECTION_FOR.keys() - _SOAP_LETTERS.values())
+    letters = "[" + "".join(sorted(_SOAP_LETTERS.values())).upper() + \
+        "".join(sorted(_SOAP_LETTERS.values())) + r"](?=[ \t]*:)"
+
+    # A header starts a line (optionally as markdown "## Plan" or "**Plan**")
+    # and is followed by a colon or the end of its line
+    return re.compile(
+        r"^[ \t]*[#*]*[ \t]*(" + names + "|" + letters + r")[ \t]*\**[ \t]*(?::[ \t]*\**|$)",
+        re.MULTILINE,
+    )
+
+
+_HEADER_RE = _header_pattern()
+
+
+def _section_for(header: str) -> str:
+    """Section a matched header spelling belongs to."""
+    name = header.lower()
+    section = _SECTION_FOR.get(name)
+    if section is None:
+        # Spelled with extra or unusual whitespace
+        section = _SECTION_FOR[" ".join(name.split())]
+    return section
+
+
+def segment_note(text: str) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Find the section spans in a free-text note.
+
+    A section runs from the end of its header to the next header. Text
+    before the first header and under "other" headers is left out. A
+    section that appears more than once gets one span per occurrence.
+
+    Args:
+        text: Note text
+
+    Returns:
+        Mapping of section name to (start, end) offsets into text, with
+        surrounding whitespace trimmed and empty sections omitted
+    """
+    spans: Dict[str, List[Tuple[int, int]]] = {}
+    headers = [(_section_for(m.group(1)), m.start(), m.end()) for m in _HEADER_RE.finditer(text)]
+
+    for i, (section, _, body_start) in enumerate(headers):
+        if section == "other":
+            continue
+        body_end = headers[i + 1][1] if i + 1 < len(headers) else len(text)
+        body = text[body_start:body_end]
+        start = body_start + len(body) - len(body.lstrip())
+        end = body_start + len(body.rstrip())
+        if start < end:
+            spans.setdefault(section, []).append((start, end))
+
+    return spans
+
+
+def split_sections(
+    text: str,
+    spans: Optional[Dict[str, List[Tuple[int, int]]]] = None
+) -> Dict[str, str]:
+    """
+    Cut a free-text note into its sections.
+
+    Args:
+        text: Note text
+        spans: Offsets from segment_note(), computed if not given
+
+    Returns:
+        Mapping of section name to its text, in SECTIONS order
+    """
+    if spans is None:
+        spans = segment_note(text)
+    return {
+        section: "\n".join(text[start:end] for start, end in spans[section])
+        for section in SECTIONS
+        if section in spans
+    }
+
+
+def note_sections(note: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Section texts of a note, whether it was loaded sectioned or as free text.
+
+    Free-text notes use the offsets stored on the record at load time when
+    present. A free-text note with no recognizable headers comes back as
+    {"full_text": ...}.
+
+    Args:
+        note: Note record or dictionary
+
+    Returns:
+        Mapping of section name to text
+    """
+    content = note.get("content", {})
+    if isinstance(content, str):
+        content = {"full_text": content}
+    if set(content) != {"full_text"}:
+        return content
+
+    text = str(content["full_text"] or "")
+    sections = split_sections(text, getattr(note, "section_spans", None))
+    return sections or {"full_text": text}
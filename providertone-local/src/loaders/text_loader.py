@@ -2,8 +2,12 @@
 Text file loader for directories of notes/messages.
 """
 
+import os
 import re
-from typing import List, Dict, Any
+import fnmatch
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Iterator, Optional, Callable, Union
 from pathlib import Path
 from datetime import datetime
 
@@ -13,7 +17,34 @@ from .base import BaseLoader
 class TextLoader(BaseLoader):
     """Load data from directory of text files."""
 
-    def load(self, path: str, data_type: str = "messages") -> List[Dict[str, Any]]:
+    def __init__(
+        self,
+        workers: int = 16,
+        name_filter: Optional[Union[str, Callable[[str], bool]]] = None,
+        ordered: bool = True
+    ):
+        """
+        Initialize text loader.
+
+        Args:
+            workers: Threads used to read and parse files concurrently
+            name_filter: Glob pattern or predicate on the filename; files that
+                don't match are never opened (e.g. "*_dr-smith_*.txt")
+            ordered: Yield records in filename order (False yields them as
+                soon as each file has been read)
+        """
+        self.workers = max(1, workers)
+        self.name_filter = name_filter
+        self.ordered = ordered
+
+    def load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Load messages or notes from directory of text files.
 
@@ -28,29 +59,113 @@ class TextLoader(BaseLoader):
             date: 2024-06-15
             ---
         """
+        return list(self.iter_load(
+            path,
+            data_type=data_type,
+            provider_id=provider_id,
+            start_date=start_date,
+            end_date=end_date,
+        ))
+
+    def iter_load(
+        self,
+        path: str,
+        data_type: str = "messages",
+        provider_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream records from a directory of text files.
+
+        Files are listed with os.scandir and read on a bounded thread pool,
+        so slow opens overlap instead of queueing behind each other. At most
+        a few files per worker are in flight at any time.
+        """
         p = Path(path)
         if not p.is_dir():
             raise ValueError(f"Expected directory, got file: {path}")
 
-        records = []
-        for file_path in sorted(p.glob("*.txt")):
-            content = file_path.read_text()
-            metadata = self._extract_metadata(content, file_path.name)
-
-            if data_type == "messages":
-                records.append(self.validate_message({
-                    "message_id": file_path.stem,
-                    "body": self._get_body(content),
-                    **metadata
-                }))
+        names = self._list_files(path)
+        if self.ordered:
+            names.sort()
+
+        def read(name: str) -> Optional[Dict[str, Any]]:
+            record = self._read_record(os.path.join(path, name), name, data_type)
+            if self.matches_filters(record, data_type, provider_id, start_date, end_date):
+                return record
+            return None
+
+        max_in_flight = self.workers * 4
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            for name in names:
+                pending.append(pool.submit(read, name))
+                if len(pending) >= max_in_flight:
+                    yield from self._drain(pending, block_all=False)
+            yield from self._drain(pending, block_all=True)
+
+    def _drain(self, pending: deque, block_all: bool) -> Iterator[Dict[str, Any]]:
+        """Yield finished records, waiting for the next read (or for all of them)."""
+        while pending:
+            if self.ordered:
+                done = [pending.popleft()]
             else:
-                records.append(self.validate_note({
-                    "note_id": file_path.stem,
-                    "content": {"full_text": self._get_body(content)},
-                    **metadata
-                }))
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = list(finished)
+                for future in done:
+                    pending.remove(future)
+
+            for future in done:
+                record = future.result()
+                if record is not None:
+                    yield record
+
+            if not block_all:
+                return
+
+    def _list_files(self, path: str) -> List[str]:
+        """List .txt files in a directory, applying the filename filter."""
+        name_filter = self.name_filter
+        if isinstance(name_filter, str):
+            pattern = name_filter
+
+            def name_filter(name: str) -> bool:
+                return fnmatch.fnmatch(name, pattern)
+
+        names = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                name = entry.name
+                # Same selection as Path.glob("*.txt"), minus subdirectories
+                if not name.endswith(".txt"):
+                    continue
+                if not entry.is_file():
+                    continue
+                if name_filter and not name_filter(name):
+                    continue
+                names.append(name)
+        return names
+
+    def _read_record(self, file_path: str, name: str, data_type: str) -> Dict[str, Any]:
+        """Read one file and build a validated record from it."""
+        with open(file_path, "r") as f:
+            content = f.read()
+        metadata = self._extract_metadata(content, name)
+        stem = name[:-len(".txt")]
 
-        return records
+        if data_type == "messages":
+            return self.validate_message({
+                "message_id": stem,
+                "body": self._get_body(content),
+                **metadata
+            })
+        else:
+            return self.validate_note({
+                "note_id": stem,
+                "content": {"full_text": self._get_body(content)},
+                **metadata
+            })
 
     def _extract_metadata(self, content: str, filename: str) -> Dict[str, Any]:
         """Extract metadata from content header or filename."""
@@ -0,0 +1,196 @@
+"""
+Timestamp normalization and sorted date indexes.
+
+EHR exports disagree on timestamp formats: ISO 8601 with or without a
+'T' or zone, US-style dates with 12-hour clocks, compact HL7-style
+digits, Unix epochs. Loaders pass every timestamp through
+normalize_timestamp() once, so downstream code can compare the first ten
+characters as a YYYY-MM-DD date. DateIndex keeps records sorted by that
+date so a date window is a bisect range instead of a scan.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+from .watermark import TIMESTAMP_FIELDS
+
+
+# Output of normalize_timestamp(): a date, optionally with time and zone
+_CANONICAL_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}:\d{2}(?:[+-]\d{2}:\d{2})?)?$"
+)
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}$")
+_ISO_PREFIX_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_EPOCH_RE = re.compile(r"\d{10}(?:\d{3})?(?:\.\d+)?$")
+
+# strptime formats tried in order, with whether they carry a time of day
+_FORMATS: Tuple[Tuple[str, bool], ...] = (
+    ("%m/%d/%Y %I:%M:%S %p", True),
+    ("%m/%d/%Y %I:%M %p", True),
+    ("%m/%d/%Y %H:%M:%S", True),
+    ("%m/%d/%Y %H:%M", True),
+    ("%m/%d/%Y", False),
+    ("%m/%d/%y", False),
+    ("%Y/%m/%d %H:%M:%S", True),
+    ("%Y/%m/%d", False),
+    ("%Y%m%d%H%M%S", True),
+    ("%Y%m%d%H%M", True),
+    ("%Y%m%d", False),
+    ("%d-%b-%Y %H:%M:%S", True),
+    ("%d-%b-%Y", False),
+    ("%b %d, %Y %I:%M %p", True),
+    ("%b %d, %Y", False),
+    ("%B %d, %Y", False),
+)
+
+
+def _format(dt: datetime, has_time: bool = True) -> str:
+    """Render a datetime in the canonical form."""
+    if not has_time:
+        return dt.strftime("%Y-%m-%d")
+    return dt.replace(microsecond=0).isoformat()
+
+
+def normalize_timestamp(value: Any) -> str:
+    """
+    Convert a timestamp in any supported format to ISO 8601.
+
+    Dates become YYYY-MM-DD and timestamps YYYY-MM-DDTHH:MM:SS, followed
+    by the UTC offset when the source had one. Wall-clock times are kept
+    as written (not shifted to UTC), so the date part is the local date.
+    Unix epochs are read as UTC.
+
+    Args:
+        value: Timestamp string, datetime, epoch number, or None
+
+    Returns:
+        Normalized timestamp, "" for empty values, or the stripped input
+        unchanged if no format matched
+    """
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return _format(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return _epoch(float(value))
+
+    text = str(value).strip()
+    if not text or _CANONICAL_RE.match(text):
+        return text
+
+    if _ISO_PREFIX_RE.match(text):
+        try:
+            return _format(datetime.fromisoformat(_iso_compatible(text)))
+        except ValueError:
+            pass
+
+    if _EPOCH_RE.match(text):
+        return _epoch(float(text))
+
+    for fmt, has_time in _FORMATS:
+        try:
+            return _format(datetime.strptime(text, fmt), has_time)
+        except ValueError:
+            continue
+
+    return text
+
+
+def _iso_compatible(text: str) -> str:
+    """Rewrite ISO 8601 variants that older fromisoformat() rejects."""
+    if text.endswith(("Z", "z")):
+        text = text[:-1] + "+00:00"
+    # Fractions other than 3 or 6 digits; seconds are all we keep anyway
+    return re.sub(r"(:\d{2})\.\d+", r"\1", text, count=1)
+
+
+def _epoch(seconds: float) -> str:
+    """Render Unix seconds (or milliseconds) since the epoch as UTC."""
+    if seconds > 1e11:
+        seconds /= 1000
+    return _format(datetime.fromtimestamp(seconds, tz=timezone.utc))
+
+
+def date_key(value: Any) -> str:
+    """
+    Date part (YYYY-MM-DD) of a normalized timestamp.
+
+    Returns "" for empty or unparseable timestamps, which date filters
+    treat as undated.
+    """
+    date = str(value or "")[:10]
+    return date if _DATE_RE.match(date) else ""
+
+
+def normalize_series(series):
+    """
+    Normalize a pandas Series of timestamps, parsing each distinct value once.
+
+    Args:
+        series: Series of timestamp strings
+
+    Returns:
+        Series of normalized timestamps
+    """
+    mapping = {value: normalize_timestamp(value) for value in series.unique()}
+    return series.map(mapping)
+
+
+class DateIndex:
+    """
+    Records sorted by date, for repeated date-range lookups.
+
+    Building the index sorts once; each between() call is then two
+    bisections and a slice. Records keep their load order within a day.
+
+    Args:
+        records: Loaded messages or notes
+        data_type: "messages" or "notes"
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]], data_type: str = "messages"):
+        field = TIMESTAMP_FIELDS[data_type]
+        keyed = sorted(
+            ((date_key(record.get(field)), record) for record in records),
+            key=lambda pair: pair[0],
+        )
+        self._dates = [date for date, _ in keyed]
+        self._records = [record for _, record in keyed]
+        # Undated records sort first, under ""
+        self._first_dated = bisect_right(self._dates, "")
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def between(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Records dated within [start_date, end_date], in date order.
+
+        Args:
+            start_date: First day, YYYY-MM-DD, inclusive (optional)
+            end_date: Last day, YYYY-MM-DD, inclusive (optional)
+
+        Returns:
+            Matching records; with neither bound, every record including
+            undated ones
+        """
+        if not start_date and not end_date:
+            return list(self._records)
+
+        lo = self._first_dated
+        if start_date:
+            lo = max(lo, bisect_left(self._dates, start_date[:10]))
+        hi = bisect_right(self._dates, end_date[:10]) if end_date else len(self._dates)
+        return self._records[lo:hi]
+
+    def date_range(self) -> Tuple[Optional[str], Optional[str]]:
+        """First and last dated day, or (None, None) if nothing is dated."""
+        if self._first_dated == len(self._dates):
+            return None, None
+        return self._dates[self._first_dated], self._dates[-1]
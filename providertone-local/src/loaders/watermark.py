@@ -0,0 +1,181 @@
+"""
+Per-provider watermarks for incremental ingestion.
+
+A state file records, for one provider and data type, the latest
+timestamp already processed, the IDs seen on that final day, and the
+per-run analyses produced so far. A refresh then only loads records from
+the watermark day onwards and skips IDs it has already seen.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional
+from urllib.parse import quote
+
+
+STATE_VERSION = 1
+DEFAULT_STATE_DIR = ".providertone-state"
+
+TIMESTAMP_FIELDS = {"messages": "sent_at", "notes": "created_at"}
+ID_FIELDS = {"messages": "message_id", "notes": "note_id"}
+
+
+def state_path(state_dir: str, provider_id: str, data_type: str) -> Path:
+    """Location of the state file for one provider and data type."""
+    return Path(state_dir) / f"{quote(provider_id, safe='')}.{data_type}.json"
+
+
+def load_state(state_dir: str, provider_id: str, data_type: str) -> Dict[str, Any]:
+    """
+    Load a provider's incremental state, or an empty state if none exists.
+
+    Args:
+        state_dir: Directory holding state files
+        provider_id: Provider identifier
+        data_type: "messages" or "notes"
+
+    Returns:
+        State dictionary with 'watermark', 'seen_ids' and 'runs'
+    """
+    path = state_path(state_dir, provider_id, data_type)
+    if path.exists():
+        with open(path, "r") as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION:
+            return state
+
+    return {
+        "version": STATE_VERSION,
+        "provider_id": provider_id,
+        "data_type": data_type,
+        "watermark": None,
+        "seen_ids": [],
+        "runs": [],
+    }
+
+
+def save_state(state_dir: str, state: Dict[str, Any]) -> None:
+    """Atomically write a provider's incremental state."""
+    path = state_path(state_dir, state["provider_id"], state["data_type"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, default=str)
+    os.replace(tmp, path)
+
+
+def watermark_date(state: Dict[str, Any]) -> Optional[str]:
+    """Day (YYYY-MM-DD) to start loading from, or None for a first run."""
+    from .timestamps import date_key
+
+    return date_key(state.get("watermark")) or None
+
+
+def dated_timestamps(records: Iterable[Dict[str, Any]], data_type: str) -> List[str]:
+    """
+    Timestamps of the records that carry a parseable date, earliest first.
+
+    Undated or unparseable values ("", "unknown", ...) are left out, so
+    they can never become a watermark or a run's start or end.
+
+    Args:
+        records: Messages or notes
+        data_type: "messages" or "notes"
+
+    Returns:
+        Timestamps sorted by day, then by the full value
+    """
+    from .timestamps import date_key
+
+    ts_field = TIMESTAMP_FIELDS[data_type]
+    keyed = []
+    for record in records:
+        ts = str(record.get(ts_field, "") or "")
+        day = date_key(ts)
+        if day:
+            keyed.append((day, ts))
+    return [ts for _, ts in sorted(keyed)]
+
+
+def record_key(record: Dict[str, Any], data_type: str) -> str:
+    """Stable identifier for a record: its ID, or a content hash if it has none."""
+    record_id = record.get(ID_FIELDS[data_type], "")
+    if record_id not in ("", None):
+        return str(record_id)
+
+    content = record.get("body") if data_type == "messages" else record.get("content")
+    raw = f"{record.get(TIMESTAMP_FIELDS[data_type], '')}\0{content}"
+    return "sha1:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def filter_unseen(
+    records: Iterable[Dict[str, Any]],
+    state: Dict[str, Any],
+    data_type: str
+) -> List[Dict[str, Any]]:
+    """
+    Drop records already covered by the watermark.
+
+    The loaders filter by day, so records on the watermark day itself are
+    read again; those are matched against the stored IDs. Records without
+    a parseable date can't be placed after the watermark and are skipped.
+    """
+    from .timestamps import date_key
+
+    day = watermark_date(state)
+    if not day:
+        return list(records)
+
+    ts_field = TIMESTAMP_FIELDS[data_type]
+    seen = set(state.get("seen_ids", []))
+
+    new = []
+    for record in records:
+        record_day = date_key(record.get(ts_field))
+        if not record_day or record_day < day:
+            continue
+        if record_day == day and record_key(record, data_type) in seen:
+            continue
+        new.append(record)
+    return new
+
+
+def advance_state(
+    state: Dict[str, Any],
+    new_records: List[Dict[str, Any]],
+    data_type: str
+) -> Dict[str, Any]:
+    """
+    Move the watermark past newly processed records.
+
+    Only IDs on the new watermark day are kept, so the seen set stays the
+    size of one day's records rather than the whole history. Only
+    timestamps date_key() accepts are considered.
+    """
+    from .timestamps import date_key
+
+    timestamps = dated_timestamps(new_records, data_type)
+    if not timestamps:
+        return state
+
+    old_watermark = state.get("watermark")
+    old_day = watermark_date(state)
+    watermark = timestamps[-1]
+    if old_day and (old_day, old_watermark) > (date_key(watermark), watermark):
+        watermark = old_watermark
+    day = date_key(watermark)
+
+    ts_field = TIMESTAMP_FIELDS[data_type]
+    seen = {
+        record_key(r, data_type)
+        for r in new_records
+        if date_key(r.get(ts_field)) == day
+    }
+    if old_day == day:
+        seen.update(state.get("seen_ids", []))
+
+    state["watermark"] = watermark
+    state["seen_ids"] = sorted(seen)
+    return state
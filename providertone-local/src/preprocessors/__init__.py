@@ -2,15 +2,36 @@
 Preprocessors for categorizing and filtering data.
 """
 
-from .message_preprocessor import preprocess_messages, categorize_message
-from .note_preprocessor import preprocess_notes, categorize_note
-from .sampler import sample_messages, sample_notes
+from .message_preprocessor import (
+    preprocess_messages, categorize_message, categorize_messages, group_indices,
+)
+from .note_preprocessor import preprocess_notes, categorize_note, categorize_notes
+from .sampler import sample_messages, sample_notes, sample_messages_stream, sample_notes_stream
+from .keyword_matcher import KeywordMatcher, RegexSetMatcher
+from .dedup import dedupe_messages, dedupe_records, NearDuplicateIndex
+from .diversity import sample_messages_diverse, sample_notes_diverse
+from .token_budget import sample_messages_by_tokens, sample_notes_by_tokens, TokenCounter
 
 __all__ = [
     "preprocess_messages",
     "preprocess_notes",
     "categorize_message",
     "categorize_note",
+    "categorize_messages",
+    "categorize_notes",
+    "group_indices",
     "sample_messages",
     "sample_notes",
+    "sample_messages_stream",
+    "sample_notes_stream",
+    "KeywordMatcher",
+    "RegexSetMatcher",
+    "dedupe_messages",
+    "dedupe_records",
+    "NearDuplicateIndex",
+    "sample_messages_diverse",
+    "sample_notes_diverse",
+    "sample_messages_by_tokens",
+    "sample_notes_by_tokens",
+    "TokenCounter",
 ]
@@ -0,0 +1,198 @@
+"""
+Near-duplicate suppression for templated messages.
+
+Messages are reduced to MinHash signatures over word shingles and
+bucketed with locality-sensitive hashing (LSH), so each new message is
+only compared with the few earlier messages that share a band with it.
+Each cluster of near-identical messages is collapsed to its first
+message plus a count. Only one signature per cluster is kept, never the
+duplicate texts themselves, so memory grows with the number of distinct
+templates rather than with the number of messages.
+"""
+
+import re
+import zlib
+from typing import List, Dict, Any, Iterable, Tuple
+
+import numpy as np
+
+
+# Smallest prime above 2**32; hashes are 32-bit, so (a * x + b) fits in uint64
+_PRIME = np.uint64(4294967311)
+
+_TOKEN_RE = re.compile(r"\w+")
+_DIGIT_RE = re.compile(r"\d")
+
+
+def shingles(text: str, size: int = 3) -> List[str]:
+    """
+    Split text into overlapping word n-grams.
+
+    Text is lowercased and digits are masked, so messages that differ only
+    in dates, times or doses still look alike.
+
+    Args:
+        text: Message text
+        size: Words per shingle
+
+    Returns:
+        List of shingles (a single one for texts shorter than size words)
+    """
+    tokens = _TOKEN_RE.findall(_DIGIT_RE.sub("0", text.lower()))
+    if len(tokens) <= size:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+
+def _choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Pick (bands, rows) whose LSH threshold (1/b)**(1/r) is closest to threshold."""
+    options = [
+        (num_perm // rows, rows)
+        for rows in range(1, num_perm + 1)
+        if num_perm % rows == 0
+    ]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class NearDuplicateIndex:
+    """
+    Incremental MinHash/LSH index of near-duplicate clusters.
+
+    Args:
+        threshold: Estimated Jaccard similarity at which two texts count
+            as duplicates
+        num_perm: Hash functions per signature
+        shingle_size: Words per shingle
+        seed: Seed for the hash functions
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        shingle_size: int = 3,
+        seed: int = 1
+    ):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _choose_bands(num_perm, threshold)
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2**32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2**32, size=num_perm, dtype=np.uint64)
+
+        # One signature and count per cluster; band tables map band hashes
+        # to the clusters that have them
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._size = 0
+        self.counts: List[int] = []
+        self._tables: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text."""
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+
+        hashes = np.fromiter(
+            (zlib.crc32(g.encode("utf-8")) for g in grams),
+            dtype=np.uint64,
+            count=len(grams),
+        )
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def add(self, text: str) -> Tuple[int, bool]:
+        """
+        Assign a text to a cluster, creating one if it has no near-duplicate.
+
+        Args:
+            text: Text to add
+
+        Returns:
+            (cluster index, whether the cluster is new)
+        """
+        sig = self.signature(text)
+        keys = [
+            sig[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+        # Candidates share at least one band; confirm on the full signature
+        candidates = set()
+        for table, key in zip(self._tables, keys):
+            candidates.update(table.get(key, ()))
+        for cluster in sorted(candidates):
+            if np.mean(self._signatures[cluster] == sig) >= self.threshold:
+                self.counts[cluster] += 1
+                return cluster, False
+
+        cluster = self._append(sig)
+        for table, key in zip(self._tables, keys):
+            table.setdefault(key, []).append(cluster)
+        return cluster, True
+
+    def _append(self, sig: np.ndarray) -> int:
+        """Store a new cluster's signature, growing the array geometrically."""
+        if self._size == len(self._signatures):
+            grown = np.empty((max(64, 2 * self._size), self.num_perm), dtype=np.uint32)
+            grown[:self._size] = self._signatures[:self._size]
+            self._signatures = grown
+        self._signatures[self._size] = sig
+        self._size += 1
+        self.counts.append(1)
+        return self._size - 1
+
+
+def dedupe_records(
+    records: Iterable[Dict[str, Any]],
+    text_key: str = "body",
+    threshold: float = 0.8,
+    num_perm: int = 64
+) -> List[Dict[str, Any]]:
+    """
+    Collapse near-duplicate records to one representative each.
+
+    Args:
+        records: Records to deduplicate
+        text_key: Field holding the text to compare
+        threshold: Estimated Jaccard similarity treated as a duplicate
+        num_perm: Hash functions per MinHash signature
+
+    Returns:
+        The first record of each cluster, as a dict with a
+        'duplicate_count' field giving the cluster size
+    """
+    index = NearDuplicateIndex(threshold=threshold, num_perm=num_perm)
+    representatives = []
+    for record in records:
+        cluster, is_new = index.add(str(record.get(text_key, "") or ""))
+        if is_new:
+            representatives.append(dict(record))
+
+    for cluster, rep in enumerate(representatives):
+        rep["duplicate_count"] = index.counts[cluster]
+    return representatives
+
+
+def dedupe_messages(
+    categorized: Dict[str, List[Dict[str, Any]]],
+    threshold: float = 0.8,
+    num_perm: int = 64
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Collapse near-duplicate messages within each category.
+
+    Args:
+        categorized: Messages grouped by category (from preprocess_messages)
+        threshold: Estimated Jaccard similarity treated as a duplicate
+        num_perm: Hash functions per MinHash signature
+
+    Returns:
+        Representative messages by category, each with 'duplicate_count'
+    """
+    return {
+        category: dedupe_records(messages, "body", threshold, num_perm)
+        for category, messages in categorized.items()
+    }
@@ -0,0 +1,305 @@
+"""
+Diversity sampling: cover the distinct kinds of text in each category.
+
+Length quartiles only spread a sample over short and long records. Here
+each category is embedded as a sparse TF-IDF matrix, clustered with
+mini-batch k-means into as many clusters as there are sample slots, and
+the medoid of each cluster is picked, so every recurring kind of reply
+or note gets a representative. Everything runs on NumPy/SciPy on the
+CPU, and the same seed always gives the same selection.
+"""
+
+import re
+from typing import List, Dict, Any, Callable
+
+import numpy as np
+
+
+_TOKEN_RE = re.compile(r"[a-z][a-z']+")
+
+# Vocabulary limits: terms in fewer documents than MIN_DF or in more than
+# MAX_DF_RATIO of them carry little signal
+MIN_DF = 2
+MAX_DF_RATIO = 0.5
+MAX_FEATURES = 20_000
+
+KMEANS_BATCH_SIZE = 1024
+KMEANS_MAX_ITER = 100
+KMEANS_TOL = 1e-4
+
+# Points k-means++ seeding draws its initial centers from
+KMEANS_INIT_SAMPLE = 4096
+
+
+def _require_scipy():
+    try:
+        import scipy.sparse  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "Diversity sampling requires scipy. "
+            "Install it with: pip install 'providertone-local[diversity]'"
+        )
+
+
+def tfidf_matrix(texts: List[str]):
+    """
+    Build an L2-normalized TF-IDF matrix.
+
+    Term frequencies are log-scaled and idf is smoothed. Digits are
+    dropped so dates and doses do not split otherwise identical replies.
+
+    Args:
+        texts: Documents to embed
+
+    Returns:
+        scipy.sparse CSR matrix with one row per text
+    """
+    _require_scipy()
+    import scipy.sparse as sp
+
+    docs = [_TOKEN_RE.findall(text.lower()) for text in texts]
+
+    doc_freq: Dict[str, int] = {}
+    for tokens in docs:
+        for token in set(tokens):
+            doc_freq[token] = doc_freq.get(token, 0) + 1
+
+    max_df = max(MIN_DF, int(MAX_DF_RATIO * len(docs)))
+    terms = [t for t, df in doc_freq.items() if MIN_DF <= df <= max_df]
+    terms.sort(key=lambda t: (-doc_freq[t], t))
+    vocabulary = {term: i for i, term in enumerate(terms[:MAX_FEATURES])}
+
+    indptr = [0]
+    indices: List[int] = []
+    values: List[float] = []
+    for tokens in docs:
+        counts: Dict[int, int] = {}
+        for token in tokens:
+            col = vocabulary.get(token)
+            if col is not None:
+                counts[col] = counts.get(col, 0) + 1
+        indices.extend(counts)
+        values.extend(counts.values())
+        indptr.append(len(indices))
+
+    matrix = sp.csr_matrix(
+        (np.asarray(values, dtype=np.float64), np.asarray(indices, dtype=np.int64), indptr),
+        shape=(len(docs), len(vocabulary)),
+    )
+
+    df = np.array([doc_freq[t] for t in terms[:MAX_FEATURES]], dtype=np.float64)
+    idf = np.log((1 + len(docs)) / (1 + df)) + 1
+    matrix.data = np.log1p(matrix.data)
+    matrix = matrix @ sp.diags(idf)
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sp.csr_matrix(sp.diags(1 / norms) @ matrix)
+
+
+def _kmeans_pp(matrix, k: int, rng: np.random.RandomState) -> np.ndarray:
+    """Seed k centers with k-means++ over a random subsample of the rows."""
+    n = matrix.shape[0]
+    pool = rng.choice(n, size=min(n, KMEANS_INIT_SAMPLE), replace=False)
+    points = matrix[pool].toarray()
+
+    centers = [points[rng.randint(len(points))]]
+    closest = ((points - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = closest.sum()
+        if total <= 0:
+            # Fewer distinct points than clusters; duplicates stay empty
+            idx = rng.randint(len(points))
+        else:
+            idx = int(np.searchsorted(np.cumsum(closest), rng.random_sample() * total))
+            idx = min(idx, len(points) - 1)
+        centers.append(points[idx])
+        closest = np.minimum(closest, ((points - points[idx]) ** 2).sum(axis=1))
+    return np.vstack(centers)
+
+
+def _assign(matrix, centers: np.ndarray) -> np.ndarray:
+    """Index of the nearest center for each row (rows are unit length)."""
+    # ||x - c||^2 = 1 - 2 x.c + ||c||^2
+    scores = np.asarray(matrix @ centers.T) * 2 - (centers ** 2).sum(axis=1)
+    return scores.argmax(axis=1)
+
+
+def minibatch_kmeans(matrix, k: int, seed: int = 42, weights: np.ndarray = None) -> np.ndarray:
+    """
+    Cluster rows with mini-batch k-means.
+
+    Each step assigns a random batch of rows to the nearest centers and
+    moves every center toward its batch members with a per-center learning
+    rate of 1/(weight seen), so cost per step is independent of the number
+    of rows.
+
+    Args:
+        matrix: L2-normalized sparse matrix
+        k: Number of clusters
+        seed: Random seed for seeding and batch order
+        weights: Optional weight per row (e.g. how many records share it)
+
+    Returns:
+        Cluster label for every row
+    """
+    import scipy.sparse as sp
+
+    rng = np.random.RandomState(seed)
+    n = matrix.shape[0]
+    if weights is None:
+        weights = np.ones(n)
+    centers = _kmeans_pp(matrix, k, rng)
+    seen = np.zeros(k)
+    batch_size = min(n, KMEANS_BATCH_SIZE)
+
+    for _ in range(KMEANS_MAX_ITER):
+        rows = rng.choice(n, size=batch_size, replace=False)
+        batch = matrix[rows]
+        labels = _assign(batch, centers)
+
+        counts = np.bincount(labels, weights=weights[rows], minlength=k)
+        membership = sp.csr_matrix(
+            (weights[rows], (labels, np.arange(batch_size))), shape=(k, batch_size)
+        )
+        sums = np.asarray((membership @ batch).todense())
+
+        seen += counts
+        moved = counts > 0
+        rate = np.zeros(k)
+        rate[moved] = counts[moved] / seen[moved]
+        previous = centers
+        centers = centers * (1 - rate)[:, None]
+        centers[moved] += sums[moved] / seen[moved][:, None]
+
+        if ((centers - previous) ** 2).sum() < KMEANS_TOL:
+            break
+
+    return _assign(matrix, centers)
+
+
+def select_medoids(texts: List[str], k: int, seed: int = 42) -> List[int]:
+    """
+    Pick k representative texts, one per cluster.
+
+    Identical texts are clustered once, weighted by how often they occur,
+    so a canned reply sent hundreds of times fills one slot, not many.
+    The medoid of a cluster is the member with the highest total cosine
+    similarity to the other members, which for unit-length TF-IDF rows is
+    the member closest to the cluster's mean.
+
+    Args:
+        texts: Texts to choose from
+        k: Number of texts to pick
+        seed: Random seed
+
+    Returns:
+        Indices into texts, largest cluster first
+    """
+    if len(texts) <= k:
+        return list(range(len(texts)))
+
+    # First index and count of each distinct text
+    first: Dict[str, int] = {}
+    occurrences: Dict[str, int] = {}
+    for i, text in enumerate(texts):
+        first.setdefault(text, i)
+        occurrences[text] = occurrences.get(text, 0) + 1
+    distinct = list(first)
+    if len(distinct) <= k:
+        return sorted(first.values(), key=lambda i: -occurrences[texts[i]])
+
+    matrix = tfidf_matrix(distinct)
+    weights = np.array([occurrences[t] for t in distinct], dtype=np.float64)
+    if matrix.shape[1] == 0:
+        # No shared vocabulary to cluster on
+        rng = np.random.RandomState(seed)
+        return [first[distinct[i]] for i in rng.choice(len(distinct), size=k, replace=False)]
+
+    labels = minibatch_kmeans(matrix, k, seed, weights)
+    clusters = sorted(
+        (np.flatnonzero(labels == c) for c in np.unique(labels)),
+        key=lambda members: (-weights[members].sum(), members[0]),
+    )
+
+    picked = []
+    for members in clusters:
+        mean = np.asarray(matrix[members].T @ weights[members]).ravel()
+        similarity = matrix[members] @ mean
+        picked.append(int(members[int(np.argmax(similarity))]))
+
+    # Empty clusters leave slots over; fill them with the members farthest
+    # from their own medoid, largest clusters first
+    if len(picked) < k:
+        taken = set(picked)
+        extra = []
+        for members, medoid in zip(clusters, picked):
+            rest = [int(i) for i in members if int(i) not in taken]
+            if rest:
+                similarity = matrix[rest] @ matrix[medoid].toarray().ravel()
+                extra.extend(rest[j] for j in np.argsort(similarity, kind="stable"))
+        picked.extend(extra[:k - len(picked)])
+
+    return [first[distinct[i]] for i in picked]
+
+
+def _sample_diverse(
+    categorized: Dict[str, List[Dict[str, Any]]],
+    text_of: Callable[[Dict[str, Any]], str],
+    sample_size: int,
+    seed: int
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Apply select_medoids to every category."""
+    sampled = {}
+    for category, records in categorized.items():
+        picked = select_medoids([text_of(r) for r in records], sample_size, seed)
+        sampled[category] = [records[i] for i in picked]
+    return sampled
+
+
+def sample_messages_diverse(
+    categorized: Dict[str, List[Dict[str, Any]]],
+    sample_size: int = 50,
+    seed: int = 42
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Sample messages that cover each category's distinct kinds of reply.
+
+    Args:
+        categorized: Messages grouped by category
+        sample_size: Max messages per category
+        seed: Random seed for reproducibility
+
+    Returns:
+        Sampled messages by category, most common kind of reply first
+    """
+    return _sample_diverse(
+        categorized, lambda m: str(m.get("body", "") or ""), sample_size, seed
+    )
+
+
+def sample_notes_diverse(
+    categorized: Dict[str, List[Dict[str, Any]]],
+    sample_size: int = 50,
+    seed: int = 42
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Sample notes that cover each visit type's distinct kinds of note.
+
+    Args:
+        categorized: Notes grouped by visit type
+        sample_size: Max notes per visit type
+        seed: Random seed for reproducibility
+
+    Returns:
+        Sampled notes by visit type, most common kind of note first
+    """
+    return _sample_diverse(categorized, _note_body, sample_size, seed)
+
+
+def _note_body(note: Dict[str, Any]) -> str:
+    """All of a note's text, sectioned or not."""
+    content = note.get("content", {})
+    if isinstance(content, dict):
+        return " ".join(str(v) for v in content.values() if v)
+    return str(content or "")
@@ -0,0 +1,291 @@
+"""
+Compiled multi-pattern matchers for categorization.
+
+KeywordMatcher handles plain keywords. All keywords are merged into a
+single trie, which is compiled into one regular expression whose
+alternations follow the trie's branches. The regex engine then walks the
+trie in C at each word start, so a text is scanned once no matter how
+many keywords there are, instead of once per keyword.
+
+Keywords only match as whole words or phrases: "test" does not match
+"latest" and "still" does not match "distill".
+
+RegexSetMatcher does the same for lists of regular expressions, with the
+same results as calling re.search() once per pattern.
+"""
+
+import re
+from typing import Any, Dict, List, Iterable, Optional, Set, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    """Match the regex definition of a word character."""
+    return ch.isalnum() or ch == "_"
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Compile keywords into a regex that follows their shared prefixes.
+
+    Optional suffix groups are greedy, so at any position the longest
+    keyword is tried first and shorter ones on backtracking.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+_REGEX_META = set("\\.^$*+?{}[]|()")
+
+
+def _split_literal_prefix(pattern: str) -> Tuple[str, str]:
+    """
+    Split a regex into its leading literal text and the rest.
+
+    The character before a quantifier belongs to the rest, so "dm2?" splits
+    into ("dm", "2?").
+    """
+    if "|" in pattern:
+        return "", pattern
+    i = 0
+    while i < len(pattern) and pattern[i] not in _REGEX_META:
+        i += 1
+    if 0 < i < len(pattern) and pattern[i] in "?*{":
+        i -= 1
+    return pattern[:i], pattern[i:]
+
+
+def _prefix_trie_pattern(patterns: Iterable[str]) -> str:
+    """
+    Combine regexes into one, sharing their literal prefixes in a trie.
+
+    The result matches wherever any of the patterns matches, but walks the
+    shared prefixes once instead of trying every pattern in turn.
+    """
+    trie: Dict[str, Any] = {}
+    for pattern in patterns:
+        prefix, rest = _split_literal_prefix(pattern)
+        node = trie
+        for ch in prefix:
+            node = node.setdefault(ch, {})
+        node.setdefault("", []).append(rest)
+
+    def build(node: Dict[str, Any]) -> str:
+        rests = node.get("", [])
+        if "" in rests:
+            # A pattern ends here, so anything longer adds no new matches
+            return ""
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        branches += [f"(?:{rest})" for rest in rests]
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Score texts against named keyword lists in a single pass.
+
+    Args:
+        keyword_map: Mapping of label (e.g. category) to its keywords.
+            Keywords are lowercased; callers should lowercase the text.
+    """
+
+    def __init__(self, keyword_map: Dict[str, List[str]]):
+        self.labels = list(keyword_map)
+
+        # Labels each keyword votes for, in keyword_map order
+        self._labels_for: Dict[str, List[str]] = {}
+        for label, keywords in keyword_map.items():
+            for keyword in keywords:
+                labels = self._labels_for.setdefault(keyword.lower(), [])
+                if label not in labels:
+                    labels.append(label)
+
+        keywords = sorted(self._labels_for)
+
+        # The scan reports the longest keyword starting at each word; any
+        # shorter keyword that is a whole-word prefix of it (e.g. "hurt" in
+        # "hurt myself") also matched there.
+        self._implied: Dict[str, List[str]] = {}
+        for keyword in keywords:
+            self._implied[keyword] = [
+                other for other in keywords
+                if keyword.startswith(other)
+                and (len(other) == len(keyword) or not _is_word_char(keyword[len(other)]))
+            ]
+
+        # The lookahead consumes nothing, so matches may overlap: "sleep" is
+        # still found inside "can't sleep"
+        self._pattern = re.compile(
+            r"(?<!\w)(?=(" + _trie_pattern(keywords) + r")(?!\w))"
+        ) if keywords else None
+
+    def find(self, text: str) -> Set[str]:
+        """
+        Find the distinct keywords that occur in text as whole words.
+
+        Args:
+            text: Lowercased text to scan
+
+        Returns:
+            Set of matched keywords
+        """
+        found: Set[str] = set()
+        if self._pattern is None:
+            return found
+
+        implied = self._implied
+        for longest in set(self._pattern.findall(text)):
+            found.update(implied[longest])
+        return found
+
+    def scores(self, text: str) -> Dict[str, int]:
+        """
+        Count the distinct keywords found for each label.
+
+        Args:
+            text: Lowercased text to scan
+
+        Returns:
+            Dictionary of label to score, in keyword_map order, omitting
+            labels with no hits
+        """
+        counts = dict.fromkeys(self.labels, 0)
+        for keyword in self.find(text):
+            for label in self._labels_for[keyword]:
+                counts[label] += 1
+        return {label: n for label, n in counts.items() if n > 0}
+
+    def best(self, text: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Return the highest-scoring label, or default if nothing matched.
+
+        Ties go to the label listed first in keyword_map.
+        """
+        scores = self.scores(text)
+        if not scores:
+            return default
+        return max(scores, key=scores.get)
+
+
+class RegexSetMatcher:
+    """
+    Score texts against named regex lists in a single pass.
+
+    Patterns that start with literal text are combined into one regex over
+    a trie of those prefixes, and the text is searched once for all of
+    them, stopping at each position where one starts. Which patterns start
+    there is read off precompiled alternations of named groups anchored at
+    that position. The few patterns without a literal prefix are searched
+    on their own. Together this gives exactly the hits of one re.search()
+    per pattern.
+
+    Args:
+        pattern_map: Mapping of label to its regex patterns
+    """
+
+    def __init__(self, pattern_map: Dict[str, List[str]]):
+        self.labels = list(pattern_map)
+        self._labels_for: List[str] = []
+
+        # (index, pattern) pairs for the combined scan, and compiled
+        # patterns searched individually
+        scanned: List[Tuple[int, str]] = []
+        self._searched: List[Tuple[int, re.Pattern]] = []
+        for label, patterns in pattern_map.items():
+            for pattern in patterns:
+                index = len(self._labels_for)
+                self._labels_for.append(label)
+                compiled = re.compile(pattern)
+                if _split_literal_prefix(pattern)[0]:
+                    scanned.append((index, pattern))
+                else:
+                    self._searched.append((index, compiled))
+
+        self._scanner = re.compile(
+            _prefix_trie_pattern(p for _, p in scanned)
+        ) if scanned else None
+
+        # _tails[k] matches any of the scanned patterns k.. and reports
+        # which one by group name
+        self._tails = [
+            re.compile("|".join(f"(?P<g{j}>{scanned[j][1]})" for j in range(k, len(scanned))))
+            for k in range(len(scanned))
+        ]
+        self._scanned_index = [index for index, _ in scanned]
+
+    def find(self, text: str) -> Set[int]:
+        """
+        Find which patterns occur anywhere in text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Set of pattern indices, in pattern_map order
+        """
+        found: Set[int] = {index for index, pattern in self._searched if pattern.search(text)}
+        if self._scanner is None:
+            return found
+
+        tails = self._tails
+        total = len(tails)
+        seen: Set[int] = set()
+        hit = self._scanner.search(text)
+        while hit is not None:
+            pos = hit.start()
+            # Each alternation reports the first pattern matching here; look
+            # for more after it at the same position
+            m = tails[0].match(text, pos)
+            while m is not None:
+                k = int(m.lastgroup[1:])
+                seen.add(k)
+                m = tails[k + 1].match(text, pos) if k + 1 < total else None
+            if len(seen) == total or pos >= len(text):
+                break
+            hit = self._scanner.search(text, pos + 1)
+
+        found.update(self._scanned_index[k] for k in seen)
+        return found
+
+    def scores(self, text: str) -> Dict[str, int]:
+        """
+        Count the patterns found for each label.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Dictionary of label to score, in pattern_map order, omitting
+            labels with no hits
+        """
+        counts = dict.fromkeys(self.labels, 0)
+        for i in self.find(text):
+            counts[self._labels_for[i]] += 1
+        return {label: n for label, n in counts.items() if n > 0}
+
+    def best(self, text: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Return the highest-scoring label, or default if nothing matched.
+
+        Ties go to the label listed first in pattern_map.
+        """
+        scores = self.scores(text)
+        if not scores:
+            return default
+        return max(scores, key=scores.get)
@@ -3,9 +3,13 @@ Preprocess and categorize portal messages.
 """
 
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Union
 from collections import defaultdict
 
+from .keyword_matcher import KeywordMatcher
+from .parallel import map_chunks
+from ..loaders.timestamps import DateIndex, date_key
+
 
 # Keywords for message categorization
 CATEGORY_KEYWORDS = {
@@ -43,81 +47,149 @@ CATEGORY_KEYWORDS = {
 }
 
 
+# Compiled once; scores every category in a single pass over the text
+_CATEGORY_MATCHER = KeywordMatcher(CATEGORY_KEYWORDS)
+
+
 def categorize_message(message: Dict[str, Any]) -> str:
     """
     Categorize a message by its content.
 
+    Each category scores one point per distinct keyword found as a whole
+    word or phrase; ties go to the category listed first.
+
     Args:
         message: Message dictionary with 'body' and optionally 'subject'
 
     Returns:
         Category string
     """
-    text = (message.get("body", "") + " " + message.get("subject", "")).lower()
+    return categorize_messages([message.get("body", "")], [message.get("subject", "")])[0]
+
+
+def categorize_messages(
+    bodies: Sequence[str],
+    subjects: Optional[Sequence[str]] = None,
+    workers: int = 1
+) -> List[str]:
+    """
+    Categorize a whole column of messages at once.
+
+    Args:
+        bodies: Message bodies, as a list or pandas Series
+        subjects: Matching subjects, or None
+        workers: Processes to categorize on; 1 runs in-process
+
+    Returns:
+        Category for each message, in input order
+    """
+    texts = _column_texts(bodies, subjects)
+    return map_chunks(_categorize_texts, texts, workers)
 
-    # Score each category
-    scores = {}
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        score = sum(1 for kw in keywords if kw in text)
-        if score > 0:
-            scores[category] = score
 
-    if not scores:
-        return "general"
+def _categorize_texts(texts: List[str]) -> List[str]:
+    """Categorize lowercased message texts (also runs in pool workers)."""
+    best = _CATEGORY_MATCHER.best
+    return [best(text, "general") for text in texts]
 
-    # Return highest scoring category
-    return max(scores, key=scores.get)
 
+def group_indices(categories: Sequence[str]) -> Dict[str, List[int]]:
+    """
+    Group positions by category.
+
+    Args:
+        categories: Category for each record
 
-def preprocess_messages(messages: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    Returns:
+        Dictionary mapping category to record positions, with categories in
+        order of first appearance
+    """
+    groups = defaultdict(list)
+    for i, category in enumerate(categories):
+        groups[category].append(i)
+    return dict(groups)
+
+
+def _column_texts(bodies: Sequence[str], subjects: Optional[Sequence[str]]) -> List[str]:
+    """Build the lowercased "body subject" text for each message."""
+    if hasattr(bodies, "str"):
+        # pandas Series: concatenate and lowercase in vectorised string ops
+        text = bodies.fillna("").astype(str) + " "
+        if hasattr(subjects, "str"):
+            text = text + subjects.fillna("").astype(str).values
+        elif subjects is not None:
+            text = text + list(subjects)
+        return text.str.lower().tolist()
+
+    if subjects is None:
+        return [(body + " ").lower() for body in bodies]
+    return [(body + " " + subject).lower() for body, subject in zip(bodies, subjects)]
+
+
+def preprocess_messages(
+    messages: List[Dict[str, Any]],
+    workers: int = 1
+) -> Dict[str, List[Dict[str, Any]]]:
     """
     Categorize all messages into groups.
 
+    With workers > 1, only the message texts are sent to the process pool
+    and only categories come back; the records stay in this process.
+
     Args:
         messages: List of message dictionaries
+        workers: Processes to categorize on; 1 runs in-process
 
     Returns:
         Dictionary mapping category to list of messages
     """
-    categorized = defaultdict(list)
+    # Only process outbound messages (provider responses), skipping empty ones
+    kept = [
+        msg for msg in messages
+        if msg.get("direction", "outbound") == "outbound" and msg.get("body", "").strip()
+    ]
 
-    for msg in messages:
-        # Only process outbound messages (provider responses)
-        if msg.get("direction", "outbound") != "outbound":
-            continue
-
-        # Skip empty messages
-        if not msg.get("body", "").strip():
-            continue
+    categories = categorize_messages(
+        [msg.get("body", "") for msg in kept],
+        [msg.get("subject", "") for msg in kept],
+        workers=workers,
+    )
 
-        category = categorize_message(msg)
-        categorized[category].append(msg)
-
-    return dict(categorized)
+    return {
+        category: [kept[i] for i in indices]
+        for category, indices in group_indices(categories).items()
+    }
 
 
 def filter_by_date(
-    messages: List[Dict[str, Any]],
+    messages: Union[List[Dict[str, Any]], DateIndex],
     start_date: str = None,
     end_date: str = None
 ) -> List[Dict[str, Any]]:
     """
     Filter messages by date range.
 
+    The loaders already normalize sent_at and accept the same range, so
+    this is for messages that are already in memory. Pass a DateIndex
+    when filtering the same messages by several windows: each window is
+    then a bisect lookup instead of a scan.
+
     Args:
-        messages: List of messages
+        messages: List of messages, or a DateIndex built over them
         start_date: Start date (YYYY-MM-DD), inclusive
         end_date: End date (YYYY-MM-DD), inclusive
 
     Returns:
-        Filtered list of messages
+        Filtered list of messages (in date order when given a DateIndex)
     """
+    if isinstance(messages, DateIndex):
+        return messages.between(start_date, end_date)
     if not start_date and not end_date:
         return messages
 
     filtered = []
     for msg in messages:
-        date_str = msg.get("sent_at", "")[:10]  # Get just date part
+        date_str = date_key(msg.get("sent_at"))
         if not date_str:
             continue
 
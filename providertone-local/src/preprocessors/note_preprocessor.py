@@ -2,9 +2,12 @@
 Preprocess and categorize clinical notes.
 """
 
-import re
-from typing import List, Dict, Any
-from collections import defaultdict
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence
+
+from .keyword_matcher import RegexSetMatcher
+from .message_preprocessor import group_indices
+from .parallel import map_chunks
+from ..loaders.sections import note_sections
 
 
 # Visit type detection patterns
@@ -36,6 +39,10 @@ VISIT_TYPE_PATTERNS = {
 }
 
 
+# Compiled once; scores every visit type in a single pass over the text
+_VISIT_TYPE_MATCHER = RegexSetMatcher(VISIT_TYPE_PATTERNS)
+
+
 def categorize_note(note: Dict[str, Any]) -> str:
     """
     Categorize a note by visit type.
@@ -46,51 +53,110 @@ def categorize_note(note: Dict[str, Any]) -> str:
     Returns:
         Visit type string
     """
-    # First check explicit visit_type field
-    explicit_type = note.get("visit_type", "").lower()
-    if explicit_type:
-        for visit_type in VISIT_TYPE_PATTERNS:
-            if visit_type in explicit_type or explicit_type in visit_type:
-                return visit_type
+    return categorize_notes([note_text(note)], [note.get("visit_type", "")])[0]
 
-    # Build searchable text
-    content = note.get("content", {})
-    if isinstance(content, str):
-        text = content
+
+def categorize_notes(
+    texts: Sequence[str],
+    visit_types: Optional[Sequence[str]] = None,
+    workers: int = 1
+) -> List[str]:
+    """
+    Categorize a whole column of notes at once.
+
+    Args:
+        texts: Searchable text of each note (see note_text), as a list or
+            pandas Series
+        visit_types: Explicit visit_type of each note, or None
+        workers: Processes to categorize on; 1 runs in-process
+
+    Returns:
+        Visit type for each note, in input order
+    """
+    if hasattr(texts, "str"):
+        texts = texts.fillna("").astype(str).str.lower().tolist()
+    else:
+        texts = [text.lower() for text in texts]
+
+    if visit_types is None:
+        explicit = [None] * len(texts)
     else:
-        text = " ".join([
-            note.get("chief_complaint", ""),
-            content.get("hpi", ""),
-            content.get("assessment", ""),
-            note.get("note_type", ""),
-        ])
-    text = text.lower()
+        # Explicit types have few distinct values, so resolve each once
+        resolved = {}
+        explicit = []
+        for value in visit_types:
+            if value not in resolved:
+                resolved[value] = _explicit_visit_type(value)
+            explicit.append(resolved[value])
 
-    # Score each type
-    scores = {}
-    for visit_type, patterns in VISIT_TYPE_PATTERNS.items():
-        score = sum(1 for p in patterns if re.search(p, text))
-        if score > 0:
-            scores[visit_type] = score
+    # Only notes without a recognised explicit type need the matcher
+    pending = [i for i, known in enumerate(explicit) if known is None]
+    matched = map_chunks(_categorize_texts, [texts[i] for i in pending], workers)
+
+    result = list(explicit)
+    for i, visit_type in zip(pending, matched):
+        result[i] = visit_type
+    return result
+
+
+def _categorize_texts(texts: List[str]) -> List[str]:
+    """Score lowercased note texts by visit type (also runs in pool workers)."""
+    best = _VISIT_TYPE_MATCHER.best
+    return [best(text, "general") for text in texts]
+
+
+def note_text(note: Dict[str, Any]) -> str:
+    """
+    Build the text a note is categorized by.
 
-    if not scores:
-        return "general"
+    Args:
+        note: Note dictionary
 
-    return max(scores, key=scores.get)
+    Returns:
+        The chief complaint, HPI, assessment and note type; free text
+        without section headers is used whole
+    """
+    content = note.get("content", {})
+    if isinstance(content, str):
+        return content
+    sections = note_sections(note)
+    return " ".join([
+        note.get("chief_complaint", ""),
+        sections.get("full_text", ""),
+        sections.get("hpi", ""),
+        sections.get("assessment", ""),
+        note.get("note_type", ""),
+    ])
+
+
+def _explicit_visit_type(value: Any) -> Optional[str]:
+    """Map an explicit visit_type field onto a known visit type, if any."""
+    explicit_type = (value or "").lower()
+    if explicit_type:
+        for visit_type in VISIT_TYPE_PATTERNS:
+            if visit_type in explicit_type or explicit_type in visit_type:
+                return visit_type
+    return None
 
 
-def preprocess_notes(notes: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+def preprocess_notes(
+    notes: List[Dict[str, Any]],
+    workers: int = 1
+) -> Dict[str, List[Dict[str, Any]]]:
     """
     Categorize all notes by visit type.
 
+    With workers > 1, only the note texts are sent to the process pool and
+    only visit types come back; the records stay in this process.
+
     Args:
         notes: List of note dictionaries
+        workers: Processes to categorize on; 1 runs in-process
 
     Returns:
         Dictionary mapping visit type to list of notes
     """
-    categorized = defaultdict(list)
-
+    kept = []
     for note in notes:
         # Skip notes without content
         content = note.get("content", {})
@@ -99,13 +165,19 @@ def preprocess_notes(notes: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, An
         else:
             has_content = bool(content)
 
-        if not has_content:
-            continue
+        if has_content:
+            kept.append(note)
 
-        visit_type = categorize_note(note)
-        categorized[visit_type].append(note)
+    visit_types = categorize_notes(
+        [note_text(note) for note in kept],
+        [note.get("visit_type", "") for note in kept],
+        workers=workers,
+    )
 
-    return dict(categorized)
+    return {
+        visit_type: [kept[i] for i in indices]
+        for visit_type, indices in group_indices(visit_types).items()
+    }
 
 
 def filter_by_note_type(
@@ -125,9 +197,29 @@ def filter_by_note_type(
     if not note_types:
         return notes
 
+    return list(iter_by_note_type(notes, note_types))
+
+
+def iter_by_note_type(
+    notes: Iterable[Dict[str, Any]],
+    note_types: List[str]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily filter notes by note type, for streaming pipelines.
+
+    Args:
+        notes: Iterable of notes
+        note_types: List of note types to include (e.g., ["progress", "visit"])
+
+    Yields:
+        Notes whose note_type contains one of note_types
+    """
+    if not note_types:
+        yield from notes
+        return
+
     note_types_lower = [t.lower() for t in note_types]
 
-    return [
-        n for n in notes
-        if any(t in n.get("note_type", "").lower() for t in note_types_lower)
-    ]
+    for n in notes:
+        if any(t in n.get("note_type", "").lower() for t in note_types_lower):
+            yield n
@@ -0,0 +1,58 @@
+"""
+Chunked process-pool mapping for CPU-bound preprocessing.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Below this many items the pool start-up costs more than it saves
+MIN_PARALLEL_ITEMS = 20_000
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Turn a --workers value into a process count (0 or None: all CPUs)."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+def map_chunks(
+    func: Callable[[List[T]], List[R]],
+    items: Sequence[T],
+    workers: int = 1,
+    min_parallel: int = MIN_PARALLEL_ITEMS
+) -> List[R]:
+    """
+    Apply func to contiguous chunks of items on a process pool.
+
+    func must be a module-level function taking a list and returning one
+    result per element. Results come back in input order, so the output
+    is the same as func(list(items)).
+
+    Args:
+        func: Chunk function run inside the pool workers
+        items: Items to process; only these and the results are pickled
+        workers: Worker processes; 1 runs in-process
+        min_parallel: Inputs shorter than this are processed in-process
+
+    Returns:
+        One result per item, in input order
+    """
+    items = list(items)
+    if workers <= 1 or len(items) < min_parallel:
+        return func(items)
+
+    # A few chunks per worker keeps the pool busy when chunks run unevenly
+    n_chunks = workers * 4
+    size = -(-len(items) // n_chunks)
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+
+    results: List[R] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_result in pool.map(func, chunks):
+            results.extend(chunk_result)
+    return results
@@ -1,9 +1,18 @@
 """
 Strategic sampling for representative analysis.
+
+sample_messages/sample_notes work on fully categorized lists. The
+*_stream variants categorize and sample in one pass over a record
+iterator, keeping only bounded reservoirs per category in memory.
 """
 
+import heapq
+import math
 import random
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+from ..loaders.sections import note_sections
 
 
 def sample_messages(
@@ -27,7 +36,7 @@ def sample_messages(
     Returns:
         Sampled messages by category
     """
-    random.seed(seed)
+    rng = random.Random(seed)
     sampled = {}
 
     for category, messages in categorized.items():
@@ -53,7 +62,7 @@ def sample_messages(
             sample_from_quartile = min(remaining_slots, len(quartile))
 
             if sample_from_quartile > 0:
-                selected.extend(random.sample(quartile, sample_from_quartile))
+                selected.extend(rng.sample(quartile, sample_from_quartile))
 
         # Deduplicate (in case shortest/longest were also sampled)
         seen_ids = set()
@@ -90,7 +99,7 @@ def sample_notes(
     Returns:
         Sampled notes by visit type
     """
-    random.seed(seed)
+    rng = random.Random(seed)
     sampled = {}
 
     for visit_type, notes in categorized.items():
@@ -98,17 +107,8 @@ def sample_notes(
             sampled[visit_type] = notes
             continue
 
-        # Score notes by completeness
-        def completeness_score(note):
-            content = note.get("content", {})
-            if isinstance(content, str):
-                return 1 if content else 0
-
-            sections = ["hpi", "physical_exam", "assessment", "plan"]
-            return sum(1 for s in sections if content.get(s))
-
         # Sort by completeness, then by content length
-        scored = [(n, completeness_score(n)) for n in notes]
+        scored = [(n, _completeness_score(n)) for n in notes]
         scored.sort(key=lambda x: (-x[1], -len(str(x[0].get("content", "")))))
 
         # Take top by completeness, then random sample from rest
@@ -119,8 +119,295 @@ def sample_notes(
         remaining = sample_size - len(selected)
 
         if remaining > 0 and other_notes:
-            selected.extend(random.sample(other_notes, min(remaining, len(other_notes))))
+            selected.extend(rng.sample(other_notes, min(remaining, len(other_notes))))
 
         sampled[visit_type] = selected[:sample_size]
 
     return sampled
+
+
+# Length buckets per doubling of length for the streaming message sampler
+BUCKETS_PER_OCTAVE = 4
+
+# Records categorized per batch while streaming
+STREAM_BATCH_SIZE = 10_000
+
+
+def sample_messages_stream(
+    messages: Iterable[Dict[str, Any]],
+    sample_size: int = 50,
+    seed: int = 42,
+    workers: int = 1,
+    counts: Optional[Dict[str, int]] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Categorize and sample messages in a single pass.
+
+    Applies the same filtering as preprocess_messages and keeps the same
+    guarantees as sample_messages: categories with up to sample_size
+    messages are returned whole and in order; larger ones always include
+    the shortest and longest message and spread the rest evenly over the
+    length quartiles. Quartiles are resolved from per-category reservoirs
+    over fine-grained log-length buckets, so memory stays bounded by the
+    number of categories and buckets rather than by the corpus.
+
+    Args:
+        messages: Iterable of message dictionaries
+        sample_size: Max messages per category
+        seed: Random seed for reproducibility
+        workers: Processes to categorize on; 1 runs in-process
+        counts: Optional dict filled with the number of messages seen per
+            category
+
+    Returns:
+        Sampled messages by category
+    """
+    from .message_preprocessor import categorize_messages
+
+    rng = random.Random(seed)
+    reservoirs: Dict[str, _LengthReservoir] = {}
+
+    kept = (
+        msg for msg in messages
+        if msg.get("direction", "outbound") == "outbound" and msg.get("body", "").strip()
+    )
+    for batch in _batches(kept, STREAM_BATCH_SIZE):
+        categories = categorize_messages(
+            [msg.get("body", "") for msg in batch],
+            [msg.get("subject", "") for msg in batch],
+            workers=workers,
+        )
+        for msg, category in zip(batch, categories):
+            reservoir = reservoirs.get(category)
+            if reservoir is None:
+                reservoir = reservoirs[category] = _LengthReservoir(sample_size, rng)
+            reservoir.add(msg, len(msg.get("body", "")))
+
+    if counts is not None:
+        counts.update((category, r.count) for category, r in reservoirs.items())
+    return {category: r.sample() for category, r in reservoirs.items()}
+
+
+def sample_notes_stream(
+    notes: Iterable[Dict[str, Any]],
+    sample_size: int = 50,
+    seed: int = 42,
+    workers: int = 1,
+    counts: Optional[Dict[str, int]] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Categorize and sample notes in a single pass.
+
+    Applies the same filtering as preprocess_notes and gives the same
+    selection as sample_notes: the most complete, longest notes up to
+    half the budget (kept in a bounded heap), then a random sample of the
+    less complete notes (kept in a reservoir).
+
+    Args:
+        notes: Iterable of note dictionaries
+        sample_size: Max notes per visit type
+        seed: Random seed for reproducibility
+        workers: Processes to categorize on; 1 runs in-process
+        counts: Optional dict filled with the number of notes seen per
+            visit type
+
+    Returns:
+        Sampled notes by visit type
+    """
+    from .note_preprocessor import categorize_notes, note_text
+
+    rng = random.Random(seed)
+    reservoirs: Dict[str, _CompletenessReservoir] = {}
+
+    for batch in _batches((n for n in notes if _has_content(n)), STREAM_BATCH_SIZE):
+        visit_types = categorize_notes(
+            [note_text(note) for note in batch],
+            [note.get("visit_type", "") for note in batch],
+            workers=workers,
+        )
+        for note, visit_type in zip(batch, visit_types):
+            reservoir = reservoirs.get(visit_type)
+            if reservoir is None:
+                reservoir = reservoirs[visit_type] = _CompletenessReservoir(sample_size, rng)
+            reservoir.add(note)
+
+    if counts is not None:
+        counts.update((visit_type, r.count) for visit_type, r in reservoirs.items())
+    return {visit_type: r.sample() for visit_type, r in reservoirs.items()}
+
+
+class _LengthReservoir:
+    """
+    Bounded stratified sample of one category's messages.
+
+    Holds the first sample_size messages (returned as-is for small
+    categories), the exact shortest and longest, and a uniform reservoir
+    per length bucket along with each bucket's total count.
+    """
+
+    def __init__(self, sample_size: int, rng: random.Random):
+        self.sample_size = sample_size
+        self.rng = rng
+        self.count = 0
+        self.head: List[Dict[str, Any]] = []
+        self.shortest: Optional[Tuple[int, int, Dict[str, Any]]] = None
+        self.longest: Optional[Tuple[int, int, Dict[str, Any]]] = None
+        self.buckets: Dict[int, List[Tuple[int, Dict[str, Any]]]] = {}
+        self.bucket_counts: Dict[int, int] = {}
+
+    def add(self, record: Dict[str, Any], length: int) -> None:
+        seq = self.count
+        self.count += 1
+        if len(self.head) < self.sample_size:
+            self.head.append(record)
+
+        # Ties match a stable sort by length: first shortest, last longest
+        if self.shortest is None or length < self.shortest[0]:
+            self.shortest = (length, seq, record)
+        if self.longest is None or length >= self.longest[0]:
+            self.longest = (length, seq, record)
+
+        bucket = int(BUCKETS_PER_OCTAVE * math.log2(length + 1))
+        n = self.bucket_counts.get(bucket, 0) + 1
+        self.bucket_counts[bucket] = n
+        reservoir = self.buckets.setdefault(bucket, [])
+        if len(reservoir) < self.sample_size:
+            reservoir.append((seq, record))
+        else:
+            j = self.rng.randrange(n)
+            if j < self.sample_size:
+                reservoir[j] = (seq, record)
+
+    def sample(self) -> List[Dict[str, Any]]:
+        if self.count <= self.sample_size:
+            return list(self.head)
+
+        selected = [self.shortest, self.longest]
+        taken = {self.shortest[1], self.longest[1]}
+
+        # Shuffle each bucket's reservoir once, then draw from the front
+        pools = {}
+        for bucket, reservoir in self.buckets.items():
+            pool = [item for item in reservoir if item[0] not in taken]
+            self.rng.shuffle(pool)
+            pools[bucket] = pool
+
+        order = sorted(self.bucket_counts)
+        quartile_size = self.count // 4
+        for i in range(4):
+            start = i * quartile_size
+            end = start + quartile_size if i < 3 else self.count
+            slots = min((self.sample_size - len(selected)) // (4 - i), end - start)
+            if slots <= 0:
+                continue
+
+            # Spread this quartile's slots over the buckets it covers, in
+            # proportion to how many of its ranks fall in each bucket
+            overlaps = []
+            offset = 0
+            for bucket in order:
+                n = self.bucket_counts[bucket]
+                overlap = min(end, offset + n) - max(start, offset)
+                if overlap > 0:
+                    overlaps.append((bucket, overlap))
+                offset += n
+            for bucket, k in _apportion(overlaps, slots, end - start):
+                for _ in range(min(k, len(pools[bucket]))):
+                    seq, record = pools[bucket].pop()
+                    selected.append((0, seq, record))
+
+        return [record for _, _, record in selected][:self.sample_size]
+
+
+class _CompletenessReservoir:
+    """
+    Bounded sample of one visit type's notes.
+
+    Keeps the first sample_size notes (returned as-is for small visit
+    types), the sample_size // 2 best complete notes in a min-heap, and a
+    uniform reservoir of the less complete ones.
+    """
+
+    def __init__(self, sample_size: int, rng: random.Random):
+        self.sample_size = sample_size
+        self.rng = rng
+        self.count = 0
+        self.head: List[Dict[str, Any]] = []
+        self.best: List[Tuple[int, int, int, Dict[str, Any]]] = []
+        self.others: List[Dict[str, Any]] = []
+        self.others_count = 0
+
+    def add(self, note: Dict[str, Any]) -> None:
+        seq = self.count
+        self.count += 1
+        if len(self.head) < self.sample_size:
+            self.head.append(note)
+
+        score = _completeness_score(note)
+        if score >= 3:
+            # Ranked like sample_notes' stable sort: score, length, then
+            # earlier notes first
+            key = (score, len(str(note.get("content", ""))), -seq, note)
+            if len(self.best) < self.sample_size // 2:
+                heapq.heappush(self.best, key)
+            elif self.best and key[:3] > self.best[0][:3]:
+                heapq.heapreplace(self.best, key)
+            return
+
+        self.others_count += 1
+        if len(self.others) < self.sample_size:
+            self.others.append(note)
+        else:
+            j = self.rng.randrange(self.others_count)
+            if j < self.sample_size:
+                self.others[j] = note
+
+    def sample(self) -> List[Dict[str, Any]]:
+        if self.count <= self.sample_size:
+            return list(self.head)
+
+        selected = [key[3] for key in sorted(self.best, key=lambda k: k[:3], reverse=True)]
+        remaining = self.sample_size - len(selected)
+        if remaining > 0 and self.others:
+            selected.extend(self.rng.sample(self.others, min(remaining, len(self.others))))
+        return selected[:self.sample_size]
+
+
+def _completeness_score(note: Dict[str, Any]) -> int:
+    """Count the key sections present in a note (1 for unsectioned free text)."""
+    content = note.get("content", {})
+    if isinstance(content, str):
+        return 1 if content else 0
+
+    sections = note_sections(note)
+    if "full_text" in sections:
+        return 1 if sections["full_text"] else 0
+    return sum(1 for s in ("hpi", "physical_exam", "assessment", "plan") if sections.get(s))
+
+
+def _has_content(note: Dict[str, Any]) -> bool:
+    """Match preprocess_notes' check for notes worth categorizing."""
+    content = note.get("content", {})
+    if isinstance(content, dict):
+        return any(content.values())
+    return bool(content)
+
+
+def _apportion(weights: List[Tuple[int, int]], slots: int, total: int) -> List[Tuple[int, int]]:
+    """Split slots over (key, weight) pairs by largest remainder."""
+    shares = [(key, slots * weight / total) for key, weight in weights]
+    counts = {key: int(share) for key, share in shares}
+    leftover = slots - sum(counts.values())
+    for key, share in sorted(shares, key=lambda s: s[1] - int(s[1]), reverse=True)[:leftover]:
+        counts[key] += 1
+    return [(key, counts[key]) for key, _ in weights]
+
+
+def _batches(items: Iterable[Any], size: int) -> Iterable[List[Any]]:
+    """Yield successive lists of up to size items."""
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,222 @@
+"""
+Token-budget sampling: pack each category's prompt up to a token budget.
+
+Count-based sampling either overflows the context on long notes or leaves
+most of it unused on short messages. These samplers rank records the same
+way as sample_messages/sample_notes, then greedily pack them until the
+category's token budget is spent.
+"""
+
+import random
+from functools import lru_cache
+from typing import List, Dict, Any, Callable, Optional
+
+from ..loaders.sections import note_sections
+
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# Tokens taken by the per-record headers the analyzers add to the prompt
+# ("--- Message 3 ---", "Date: ...", section titles)
+MESSAGE_OVERHEAD_TOKENS = 16
+NOTE_OVERHEAD_TOKENS = 40
+
+
+class TokenCounter:
+    """
+    Cached token counter backed by tiktoken.
+
+    The encoding is an approximation of the model's own tokenizer, which
+    is close enough for budgeting. If the encoding cannot be loaded (for
+    example on an air-gapped machine without the BPE file cached), counts
+    fall back to a 4-characters-per-token estimate.
+
+    Args:
+        encoding: tiktoken encoding name
+        cache_size: Number of distinct texts whose counts are kept
+    """
+
+    def __init__(self, encoding: str = DEFAULT_ENCODING, cache_size: int = 100_000):
+        self.encoding_name = encoding
+        self.exact = False
+        self._encode: Optional[Callable[[str], List[int]]] = None
+
+        try:
+            import tiktoken
+            self._encode = tiktoken.get_encoding(encoding).encode_ordinary
+            self.exact = True
+        except Exception:
+            self._encode = None
+
+        self.count = lru_cache(maxsize=cache_size)(self._count)
+
+    def _count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encode is not None:
+            return len(self._encode(text))
+        return (len(text) + 3) // 4
+
+
+_default_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Return the shared counter, loading the encoding on first use."""
+    global _default_counter
+    if _default_counter is None:
+        _default_counter = TokenCounter()
+    return _default_counter
+
+
+def message_tokens(message: Dict[str, Any], counter: Optional[TokenCounter] = None) -> int:
+    """Estimate the prompt tokens a message takes up."""
+    counter = counter or get_token_counter()
+    return (
+        counter.count(str(message.get("body", "") or ""))
+        + counter.count(str(message.get("subject", "") or ""))
+        + MESSAGE_OVERHEAD_TOKENS
+    )
+
+
+def note_tokens(note: Dict[str, Any], counter: Optional[TokenCounter] = None) -> int:
+    """Estimate the prompt tokens a note takes up."""
+    counter = counter or get_token_counter()
+    content = note.get("content", {})
+    if isinstance(content, dict):
+        # Free-text notes are sent as their sections only
+        text_tokens = sum(counter.count(str(v)) for v in note_sections(note).values() if v)
+    else:
+        text_tokens = counter.count(str(content or ""))
+    return (
+        text_tokens
+        + counter.count(str(note.get("chief_complaint", "") or ""))
+        + NOTE_OVERHEAD_TOKENS
+    )
+
+
+def sample_messages_by_tokens(
+    categorized: Dict[str, List[Dict[str, Any]]],
+    token_budget: int,
+    seed: int = 42,
+    counter: Optional[TokenCounter] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Sample messages from each category up to a token budget.
+
+    Candidates are ranked like sample_messages: the shortest and longest
+    message first, then alternating between the four length quartiles in
+    random order. Each candidate is added if it still fits in the budget.
+
+    Args:
+        categorized: Messages grouped by category
+        token_budget: Max prompt tokens per category
+        seed: Random seed for reproducibility
+        counter: Token counter (defaults to the shared tiktoken counter)
+
+    Returns:
+        Sampled messages by category
+    """
+    counter = counter or get_token_counter()
+    rng = random.Random(seed)
+    sampled = {}
+
+    for category, messages in categorized.items():
+        by_length = sorted(messages, key=lambda m: len(m.get("body", "")))
+        ranked = _quartile_order(by_length, rng)
+        sampled[category] = _pack(
+            ranked, lambda m: message_tokens(m, counter), token_budget, MESSAGE_OVERHEAD_TOKENS
+        )
+
+    return sampled
+
+
+def sample_notes_by_tokens(
+    categorized: Dict[str, List[Dict[str, Any]]],
+    token_budget: int,
+    seed: int = 42,
+    counter: Optional[TokenCounter] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Sample notes from each visit type up to a token budget.
+
+    Candidates are ranked like sample_notes: the most complete notes
+    first (longest first within a completeness level), interleaved with a
+    random order of the less complete ones so both are represented. Each
+    candidate is added if it still fits in the budget.
+
+    Args:
+        categorized: Notes grouped by visit type
+        token_budget: Max prompt tokens per visit type
+        seed: Random seed for reproducibility
+        counter: Token counter (defaults to the shared tiktoken counter)
+
+    Returns:
+        Sampled notes by visit type
+    """
+    from .sampler import _completeness_score
+
+    counter = counter or get_token_counter()
+    rng = random.Random(seed)
+    sampled = {}
+
+    for visit_type, notes in categorized.items():
+        scored = [(n, _completeness_score(n)) for n in notes]
+        scored.sort(key=lambda x: (-x[1], -len(str(x[0].get("content", "")))))
+
+        complete_notes = [n for n, s in scored if s >= 3]
+        other_notes = [n for n, s in scored if s < 3]
+        rng.shuffle(other_notes)
+
+        ranked = _interleave(complete_notes, other_notes)
+        sampled[visit_type] = _pack(
+            ranked, lambda n: note_tokens(n, counter), token_budget, NOTE_OVERHEAD_TOKENS
+        )
+
+    return sampled
+
+
+def _quartile_order(by_length: List[Dict[str, Any]], rng: random.Random) -> List[Dict[str, Any]]:
+    """Order records: shortest, longest, then round-robin over shuffled quartiles."""
+    if len(by_length) <= 2:
+        return list(by_length)
+
+    middle = by_length[1:-1]
+    quartile_size = max(1, len(middle) // 4)
+    quartiles = []
+    for i in range(4):
+        start = i * quartile_size
+        end = start + quartile_size if i < 3 else len(middle)
+        quartile = middle[start:end]
+        rng.shuffle(quartile)
+        quartiles.append(quartile)
+
+    return [by_length[0], by_length[-1]] + _interleave(*quartiles)
+
+
+def _interleave(*lists: List[Any]) -> List[Any]:
+    """Round-robin merge of several lists."""
+    merged = []
+    for i in range(max((len(lst) for lst in lists), default=0)):
+        merged.extend(lst[i] for lst in lists if i < len(lst))
+    return merged
+
+
+def _pack(
+    ranked: List[Dict[str, Any]],
+    cost: Callable[[Dict[str, Any]], int],
+    budget: int,
+    min_cost: int
+) -> List[Dict[str, Any]]:
+    """Greedily take ranked records that still fit in the budget."""
+    selected = []
+    used = 0
+    for record in ranked:
+        # Nothing can fit once less than a record's fixed overhead is left
+        if budget - used < min_cost:
+            break
+        tokens = cost(record)
+        if used + tokens <= budget:
+            selected.append(record)
+            used += tokens
+    return selected
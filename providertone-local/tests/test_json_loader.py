@@ -0,0 +1,46 @@
+"""
+Tests for the streaming JSON loader.
+"""
+
+import io
+import json
+
+import pytest
+
+from src.loaders.json_loader import JSONLoader, _JSONStream
+
+DOCUMENT = {
+    "version": 12.5,
+    "scale": -1.5e3,
+    "count": 1200,
+    "exported": True,
+    "messages": [
+        {"message_id": "m1", "provider_id": "dr-a", "sent_at": "2024-05-01", "body": "Hi"},
+        {"message_id": "m2", "provider_id": "dr-a", "sent_at": "2024-05-02", "score": 3.25},
+    ],
+}
+
+
+def _walk(stream):
+    """Rebuild the envelope the way JSONLoader walks it."""
+    result = {}
+    for key in stream.iter_keys():
+        if stream.peek() == "[":
+            result[key] = list(stream.iter_array())
+        else:
+            result[key] = stream.value()
+    return result
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 65))
+def test_numeric_envelope_fields_survive_buffer_boundaries(chunk_size):
+    text = json.dumps(DOCUMENT)
+    stream = _JSONStream(io.StringIO(text), chunk_size=chunk_size)
+    assert _walk(stream) == json.load(io.StringIO(text))
+
+
+def test_loader_reads_messages_after_numeric_fields(tmp_path):
+    path = tmp_path / "messages.json"
+    path.write_text(json.dumps(DOCUMENT))
+    records = JSONLoader().load(str(path), data_type="messages")
+    assert [r["message_id"] for r in records] == ["m1", "m2"]
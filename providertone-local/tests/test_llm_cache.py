@@ -0,0 +1,26 @@
+"""
+Tests for the LLM response cache.
+"""
+
+import pytest
+
+from src.llm.cache import DEFAULT_TTL, ResponseCache, _env_ttl
+
+
+def test_zero_ttl_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ResponseCache(str(tmp_path / "cache.sqlite"), ttl=0)
+
+
+def test_env_ttl_zero_means_never_expire():
+    assert _env_ttl("0") is None
+    assert _env_ttl(None) == DEFAULT_TTL
+    assert _env_ttl("3600") == 3600.0
+    with pytest.raises(ValueError):
+        _env_ttl("-5")
+
+
+def test_entries_without_ttl_are_kept(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl=None)
+    cache.put("k", '{"a": 1}')
+    assert cache.get("k") == '{"a": 1}'
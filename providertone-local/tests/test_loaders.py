@@ -0,0 +1,56 @@
+"""Tests for provider filtering across loaders."""
+
+import json
+
+from src.loaders import group_by_provider, load_data
+from src.loaders.ndjson_loader import NDJSONLoader
+
+
+def _write_messages(path, provider_id):
+    with open(path, "w") as f:
+        for i in range(4):
+            f.write(json.dumps({
+                "message_id": f"m{i}",
+                "provider_id": provider_id,
+                "sent_at": f"2024-05-0{i + 1}",
+                "body": "hello",
+            }) + "\n")
+
+
+def test_numeric_provider_id_matches_string_filter(tmp_path):
+    path = tmp_path / "messages.jsonl"
+    _write_messages(path, 12)
+
+    assert len(load_data(str(path), provider_id="12")) == 4
+    assert load_data(str(path), provider_id="13") == []
+
+
+def test_parallel_ndjson_matches_numeric_provider_id(tmp_path):
+    path = tmp_path / "messages.jsonl"
+    _write_messages(path, 12)
+
+    loader = NDJSONLoader(workers=4, min_parallel_bytes=1)
+    assert len(loader.load(str(path), provider_id="12")) == 4
+
+
+def test_numeric_provider_id_matches_csv(tmp_path):
+    jsonl = tmp_path / "messages.jsonl"
+    _write_messages(jsonl, 12)
+    csv = tmp_path / "messages.csv"
+    csv.write_text(
+        "message_id,provider_id,sent_at,body\n"
+        + "".join(f"m{i},12,2024-05-0{i + 1},hello\n" for i in range(4))
+    )
+
+    from_json = load_data(str(jsonl), provider_id="12")
+    from_csv = load_data(str(csv), provider_id="12")
+    assert [r["message_id"] for r in from_json] == [r["message_id"] for r in from_csv]
+
+
+def test_group_by_provider_uses_string_keys(tmp_path):
+    path = tmp_path / "messages.jsonl"
+    _write_messages(path, 12)
+
+    groups = group_by_provider(load_data(str(path)), provider_ids={"12"})
+    assert list(groups) == ["12"]
+    assert len(groups["12"]) == 4
@@ -0,0 +1,92 @@
+"""
+Tests for incremental refresh watermarks.
+"""
+
+import csv
+
+from src.loaders import load_data
+from src.loaders.watermark import (
+    advance_state,
+    dated_timestamps,
+    filter_unseen,
+    load_state,
+    watermark_date,
+)
+
+
+FIELDS = ["message_id", "provider_id", "sent_at", "body"]
+
+
+def _write_messages(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _message(message_id, sent_at):
+    return {"message_id": message_id, "provider_id": "dr-a", "sent_at": sent_at,
+            "body": f"Reply {message_id}"}
+
+
+def test_malformed_timestamp_does_not_become_watermark(tmp_path):
+    export = tmp_path / "messages.csv"
+    _write_messages(export, [
+        _message("m1", "2024-05-01T09:00:00"),
+        _message("m2", "unknown"),
+        _message("m3", "2024-05-03T10:30:00"),
+    ])
+
+    # First run
+    state = load_state(str(tmp_path / "state"), "dr-a", "messages")
+    records = load_data(str(export), provider_id="dr-a")
+    advance_state(state, filter_unseen(records, state, "messages"), "messages")
+    assert state["watermark"] == "2024-05-03T10:30:00"
+    assert watermark_date(state) == "2024-05-03"
+
+    # A later export adds a message; the next refresh must pick it up
+    _write_messages(export, [
+        _message("m1", "2024-05-01T09:00:00"),
+        _message("m2", "unknown"),
+        _message("m3", "2024-05-03T10:30:00"),
+        _message("m4", "2024-06-01T08:15:00"),
+    ])
+    records = load_data(str(export), provider_id="dr-a", start_date=watermark_date(state))
+    new = filter_unseen(records, state, "messages")
+    assert [r["message_id"] for r in new] == ["m4"]
+
+    advance_state(state, new, "messages")
+    assert watermark_date(state) == "2024-06-01"
+    assert state["seen_ids"] == ["m4"]
+
+
+def test_unparseable_stored_watermark_is_ignored():
+    state = {"watermark": "unknown", "seen_ids": [], "runs": []}
+    assert watermark_date(state) is None
+
+    records = [_message("m1", "2024-06-01T08:15:00")]
+    assert filter_unseen(records, state, "messages") == records
+
+    advance_state(state, records, "messages")
+    assert state["watermark"] == "2024-06-01T08:15:00"
+
+
+def test_filter_unseen_skips_undated_records():
+    state = {"watermark": "2024-05-03T10:30:00", "seen_ids": ["m3"], "runs": []}
+    records = [
+        _message("m3", "2024-05-03T10:30:00"),
+        _message("m5", "unknown"),
+        _message("m6", ""),
+        _message("m7", "2024-05-03T17:00:00"),
+    ]
+    assert [r["message_id"] for r in filter_unseen(records, state, "messages")] == ["m7"]
+
+
+def test_dated_timestamps_drops_undated_values():
+    records = [
+        _message("m1", "unknown"),
+        _message("m2", "2024-05-03T10:30:00"),
+        _message("m3", ""),
+        _message("m4", "2024-01-15"),
+    ]
+    assert dated_timestamps(records, "messages") == ["2024-01-15", "2024-05-03T10:30:00"]